@@ -16,6 +16,73 @@ load_dotenv()
 BASE_DIR = Path(__file__).parent
 ASSETS_PATH = BASE_DIR / "assets" / "img"
 DATABASE_PATH = os.getenv("DATABASE_PATH", "kadry.db")
+# Каталог SQL-миграций схемы (файлы вида 0001_описание.sql)
+MIGRATIONS_PATH = BASE_DIR / "db" / "migrations"
+# Режим пула: отдельное соединение SQLite для каждого потока
+DATABASE_POOLED = os.getenv("DATABASE_POOLED", "1") == "1"
+
+# --- Профили производительности SQLite ---
+# PRAGMA-настройки, применяемые к каждому соединению при открытии.
+# cache_size < 0 задается в КиБ, mmap_size - в байтах, busy_timeout - в мс.
+DB_PROFILES = {
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16384,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 10000,
+    },
+}
+DB_PROFILE = os.getenv("DB_PROFILE", "fast")
+
+# --- Статистика SQL-запросов ---
+# Запросы дольше порога (мс) пишутся в журнал медленных запросов; 0 - отключено
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+SLOW_QUERY_LOG_FILE = os.getenv("SLOW_QUERY_LOG_FILE", "slow_queries.log")
+# Файл для сохранения статистики запросов при выходе; пустое значение - не сохранять
+QUERY_STATS_FILE = os.getenv("QUERY_STATS_FILE", "query_stats.json")
+
+# --- Журнал изменений (ChangeLog) ---
+# Сколько последних изменений хранится в журнале
+CHANGE_LOG_RETENTION = int(os.getenv("CHANGE_LOG_RETENTION", "10000"))
+# Период проверки изменений от других процессов (мс); 0 - отключено
+CHANGE_POLL_INTERVAL_MS = int(os.getenv("CHANGE_POLL_INTERVAL_MS", "2000"))
+
+# --- Фоновая загрузка таблиц ---
+# Количество рабочих потоков для запросов вкладок
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", "2"))
+# Период проверки готовых результатов в потоке интерфейса (мс)
+BACKGROUND_POLL_INTERVAL_MS = int(os.getenv("BACKGROUND_POLL_INTERVAL_MS", "20"))
+# Пауза после ввода символа в поле поиска до запроса к БД (мс)
+SEARCH_DEBOUNCE_MS = int(os.getenv("SEARCH_DEBOUNCE_MS", "300"))
+
+# --- Кэш вкладок главного окна ---
+# Сколько созданных вкладок хранить скрытыми (давно не открытые уничтожаются); 0 - не хранить
+FRAME_CACHE_SIZE = int(os.getenv("FRAME_CACHE_SIZE", "4"))
+# Загружать изображения assets в кэш в фоне при запуске
+PREWARM_IMAGES = os.getenv("PREWARM_IMAGES", "1") == "1"
+
+# --- Виртуальные таблицы (прокрутка вместо страниц) ---
+# Включить виртуальный режим таблиц по умолчанию
+VIRTUAL_TABLES = os.getenv("VIRTUAL_TABLES", "0") == "1"
+# Количество строк в одном окне загрузки
+VIRTUAL_WINDOW_SIZE = int(os.getenv("VIRTUAL_WINDOW_SIZE", "100"))
+# Сколько окон строк хранить в памяти
+VIRTUAL_CACHE_WINDOWS = int(os.getenv("VIRTUAL_CACHE_WINDOWS", "8"))
+# Сколько соседних окон загружать заранее с каждой стороны видимой области
+VIRTUAL_PREFETCH_WINDOWS = int(os.getenv("VIRTUAL_PREFETCH_WINDOWS", "1"))
+# Период проверки позиции прокрутки (мс)
+VIRTUAL_SCROLL_POLL_MS = int(os.getenv("VIRTUAL_SCROLL_POLL_MS", "100"))
+
 DEFAULT_USERNAME = os.getenv("DEFAULT_USERNAME", "Пользователь")
 DEFAULT_USER_ROLE = os.getenv("DEFAULT_USER_ROLE", "Сотрудник")
 
@@ -54,7 +121,11 @@ TABLE_FONT = ("Arial", 14, "normal")
 TABLE_HEADER_FONT = ("Arial", 16, "bold")
 
 # --- Настройки логирования ---
-LOG_LEVEL = logging.DEBUG
+LOG_LEVEL = getattr(logging, os.getenv("LOG_LEVEL", "DEBUG").upper(), logging.DEBUG)
+# Уровни отдельных модулей: LOG_LEVELS=db=INFO,gui.reports_frame=WARNING
+LOG_LEVELS = {name.strip(): level.strip().upper()
+              for name, level in (item.split("=", 1)
+                                  for item in os.getenv("LOG_LEVELS", "").split(",") if "=" in item)}
 LOG_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(module)s:%(lineno)d - %(message)s"
 LOG_FILE = "app.log"
 MAX_LOG_SIZE = 1024 * 1024 * 5
@@ -5,7 +5,9 @@
 а также методы для получения списков, проверки данных и формирования данных для отчетов.
 """
 import logging
-from db.database import Database
+import sqlite3
+from db.database import Database, FTS_MIN_TERM_LENGTH, fts_phrase
+from db.date_codes import date_to_day
 import db.queries as q
 
 log = logging.getLogger(__name__)
@@ -14,14 +16,54 @@ log = logging.getLogger(__name__)
 class AbsenceRepository:
     """Репозиторий для управления данными об отсутствии сотрудников."""
 
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, read_db: Database | None = None):
         """
         Инициализирует репозиторий.
 
         Args:
             db (Database): Экземпляр подключения к базе данных.
+            read_db (Database | None, optional): Подключение только для чтения
+                (`Database.read_only()`) для отчетных запросов. По умолчанию - `db`.
         """
         self.db = db
+        self.read_db = read_db or db
+        self._fts_available = None  # Определяется при первом поиске
+
+    # --- Поиск ---
+
+    def has_fts(self):
+        """
+        Проверяет наличие полнотекстового индекса AbsencesFTS (миграция 0004).
+
+        Returns:
+            bool: True, если индекс есть. Без FTS5 в сборке SQLite миграция
+                  пропускается, и поиск выполняется через LIKE.
+        """
+        if self._fts_available is None:
+            self._fts_available = self.db.fetch_one(
+                q.CHECK_TABLE_EXISTS, ("AbsencesFTS",)) is not None
+            if not self._fts_available:
+                log.info("Индекс AbsencesFTS не найден, поиск отсутствий через LIKE")
+        return self._fts_available
+
+    def _add_search(self, query, params, search_term):
+        """
+        Добавляет к запросу условие поиска: по индексу FTS или через LIKE
+        (если индекса нет или строка короче трех символов).
+
+        Args:
+            query (str): Запрос, заканчивающийся условием WHERE.
+            params (dict): Параметры запроса (дополняются).
+            search_term (str): Строка поиска.
+
+        Returns:
+            str: Запрос с условием поиска.
+        """
+        if len(search_term) >= FTS_MIN_TERM_LENGTH and self.has_fts():
+            params["fts_query"] = fts_phrase(search_term)
+            return query + q.GET_ABSENCES_FTS_SEARCH
+        params["search_term"] = f"%{search_term}%"
+        return query + q.GET_ABSENCES_SEARCH
 
     # --- CRUD Операции ---
 
@@ -39,39 +81,132 @@ class AbsenceRepository:
                 - Список кортежей с данными отсутствий (включая ID).
                 - Общее количество найденных записей (с учетом поиска).
         """
-        log.debug(f"Запрос списка отсутствий: search='{search_term}'")
+        log.debug("Запрос списка отсутствий: search='%s'", search_term)
         query = q.GET_ABSENCES
         params = {}
         if search_term:
-            query += q.GET_ABSENCES_SEARCH
-            params["search_term"] = f"%{search_term}%"
+            query = self._add_search(query, params, search_term)
         query += q.GET_ABSENCES_ORDER_BY
 
-        log.debug(f"Запрос данных отсутствий: {query}, параметры: {params}")
-        data = self.db.fetch_all(query, params)
-        if data is None:
-            log.warning("Запрос данных отсутствий вернул None")
-            data = []
+        log.debug("Запрос данных отсутствий: %s, параметры: %s", query, params)
+        # Строки сразу преобразуются при потоковом чтении, без промежуточного списка
+        # (замена None на пустые строки, кроме ID)
+        processed_data = []
+        generation = self.db.write_generation
+        try:
+            for row in self.db.fetch_iter(query, params):
+                processed_data.append(
+                    [row[0]] + ["" if item is None else item for item in row[1:]])
+        except sqlite3.Error:
+            log.warning("Запрос данных отсутствий завершился ошибкой")
+            processed_data = []
+
+        # Весь список уже получен - его длина и есть количество
+        total_rows = len(processed_data)
+        self.db.set_cached_count(("absences", search_term or ""), total_rows, generation)
+        log.debug(
+            "Найдено отсутствий: %s, получено данных: %s", total_rows, len(processed_data))
+
+        return processed_data, total_rows
+
+    def count_absences(self, search_term=None):
+        """
+        Возвращает количество записей об отсутствии с учетом поиска.
+
+        Значение кэшируется до следующей записи в БД.
+
+        Args:
+            search_term (str, optional): Строка для поиска по различным полям.
+
+        Returns:
+            int: Количество найденных записей.
+        """
+        cache_key = ("absences", search_term or "")
+        cached = self.db.get_cached_count(cache_key)
+        if cached is not None:
+            return cached
 
-        # Подсчет строк
         count_query = q.GET_ABSENCES_COUNT
         count_params = {}
         if search_term:
-            count_query += q.GET_ABSENCES_COUNT_SEARCH
-            count_params["search_term"] = f"%{search_term}%"
+            count_query = self._add_search(count_query, count_params, search_term)
+        generation = self.db.write_generation
         count_result = self.db.fetch_one(count_query, count_params)
         total_rows = count_result[0] if count_result else 0
-        log.debug(
-            f"Найдено отсутствий: {total_rows}, получено данных: {len(data)}")
+        self.db.set_cached_count(cache_key, total_rows, generation)
+        return total_rows
 
-        # Замена None на пустые строки (кроме ID)
-        processed_data = []
-        for row in data:
-            processed_row = [row[0]] + \
-                ["" if item is None else item for item in row[1:]]
-            processed_data.append(processed_row)
+    def get_absences_page(self, search_term=None, after=None, page_size=10, offset=0):
+        """
+        Получает одну страницу отсутствий (keyset-пагинация по дате и ID,
+        от новых к старым).
 
-        return processed_data, total_rows
+        Первый столбец - ID записи, None в остальных столбцах заменяется
+        на пустые строки (как в `get_absences`). Отсутствия без даты идут в конце
+        списка. Первая страница запрашивается вместе с общим количеством строк,
+        которое кэшируется для `count_absences`.
+
+        Args:
+            search_term (str, optional): Строка для поиска по различным полям.
+            after (tuple, optional): Курсор (AbsenceDate или '', ID) последней строки
+                                     предыдущей страницы. None - первая страница.
+            page_size (int, optional): Количество строк на странице.
+            offset (int, optional): Сколько строк пропустить (после курсора, если он
+                задан); для чтения с произвольной позиции.
+
+        Returns:
+            tuple[list[list], tuple | None]: Кортеж (строки страницы,
+                курсор следующей страницы или None).
+        """
+        query = q.GET_ABSENCES
+        params = {"page_size": page_size}
+        if search_term:
+            query = self._add_search(query, params, search_term)
+        if after:
+            query += q.GET_ABSENCES_KEYSET
+            params["after_date"], params["after_id"] = after
+        query += q.GET_ABSENCES_ORDER_BY + q.PAGE_LIMIT
+        if offset:
+            query += q.PAGE_OFFSET
+            params["offset"] = offset
+
+        log.debug("Запрос страницы отсутствий: %s, параметры: %s", query, params)
+        if after or offset:
+            data = self.db.fetch_all(query, params)
+        else:
+            generation = self.db.write_generation
+            data, total_rows = self.db.fetch_all_with_count(query, params)
+            if data is not None:
+                self.db.set_cached_count(("absences", search_term or ""), total_rows, generation)
+        if data is None:
+            log.warning("Запрос страницы отсутствий вернул None")
+            return [], None
+        # Курсор: (AbsenceDate, ID) последней строки; пустая дата - '', как в ключе сортировки
+        next_cursor = (data[-1][3] or "", data[-1][0]) if len(data) == page_size else None
+        return [[row[0]] + ["" if item is None else item for item in row[1:]]
+                for row in data], next_cursor
+
+    def iter_absences(self, search_term=None):
+        """
+        Потоково отдает записи об отсутствии (с поиском) без загрузки всей таблицы в память.
+
+        Первый столбец - ID записи, None в остальных столбцах заменяется
+        на пустые строки (как в `get_absences`).
+
+        Args:
+            search_term (str, optional): Строка для поиска по различным полям.
+
+        Yields:
+            list: Строка с данными отсутствия (включая ID).
+        """
+        log.debug("Потоковый запрос отсутствий: search='%s'", search_term)
+        query = q.GET_ABSENCES
+        params = {}
+        if search_term:
+            query = self._add_search(query, params, search_term)
+        query += q.GET_ABSENCES_ORDER_BY
+        for row in self.db.fetch_iter(query, params):
+            yield [row[0]] + ["" if item is None else item for item in row[1:]]
 
     def get_absence_by_id(self, absence_id):
         """
@@ -83,12 +218,12 @@ class AbsenceRepository:
         Returns:
             tuple | None: Кортеж с данными записи или None, если не найдено.
         """
-        log.debug(f"Запрос записи об отсутствии по ID={absence_id}")
+        log.debug("Запрос записи об отсутствии по ID=%s", absence_id)
         result = self.db.fetch_one(q.GET_ABSENCE_BY_ID, (absence_id,))
         if result:
-            log.debug(f"Найдена запись об отсутствии ID={absence_id}.")
+            log.debug("Найдена запись об отсутствии ID=%s.", absence_id)
         else:
-            log.error(f"Запись об отсутствии с ID={absence_id} не найдена.")
+            log.error("Запись об отсутствии с ID=%s не найдена.", absence_id)
         return result
 
     def insert_absence(self, personnel_number, absence_date, full_day, start_time, end_time, reason, schedule_id):
@@ -108,7 +243,7 @@ class AbsenceRepository:
             bool: True в случае успеха, False при ошибке.
         """
         log.debug(
-            f"Добавление отсутствия: PN={personnel_number}, Date={absence_date}, FullDay={full_day}")
+            "Добавление отсутствия: PN=%s, Date=%s, FullDay=%s", personnel_number, absence_date, full_day)
         # Записываем 00:00, если время не указано (для консистентности, хотя может быть избыточно)
         actual_start_time = start_time if start_time is not None else "00:00"
         actual_end_time = end_time if end_time is not None else "00:00"
@@ -117,12 +252,38 @@ class AbsenceRepository:
         result = self.db.execute_query(q.INSERT_ABSENCE, params)
         if result:
             log.info(
-                f"Запись об отсутствии для {personnel_number} на {absence_date} успешно добавлена.")
+                "Запись об отсутствии для %s на %s успешно добавлена.", personnel_number, absence_date)
         else:
             log.error(
-                f"Ошибка добавления записи об отсутствии для {personnel_number} на {absence_date}.")
+                "Ошибка добавления записи об отсутствии для %s на %s.", personnel_number, absence_date)
         return result
 
+    def insert_absences_bulk(self, rows):
+        """
+        Добавляет набор записей об отсутствии пачками (одна транзакция на пачку).
+
+        Args:
+            rows (Iterable[tuple]): Кортежи в порядке параметров `insert_absence`:
+                (personnel_number, absence_date, full_day, start_time, end_time,
+                 reason, schedule_id). Время None заменяется на "00:00".
+
+        Returns:
+            tuple[int, list[tuple[int, tuple, str]]]: Количество добавленных записей
+                и список ошибок (индекс строки, параметры, текст ошибки).
+        """
+        log.debug("Пакетное добавление отсутствий")
+        params = (
+            (pn, absence_date, full_day,
+             start_time if start_time is not None else "00:00",
+             end_time if end_time is not None else "00:00",
+             reason, schedule_id)
+            for pn, absence_date, full_day, start_time, end_time, reason, schedule_id in rows
+        )
+        added, failed = self.db.execute_many(q.INSERT_ABSENCE, params)
+        log.info(
+            "Пакетное добавление отсутствий: добавлено %s, с ошибками %s", added, len(failed))
+        return added, failed
+
     def update_absence(self, absence_id, absence_date, full_day, start_time, end_time, reason, schedule_id, personnel_number):
         """
         Обновляет существующую запись об отсутствии.
@@ -141,7 +302,7 @@ class AbsenceRepository:
             bool: True в случае успеха, False при ошибке.
         """
         log.debug(
-            f"Обновление отсутствия ID={absence_id}: Date={absence_date}, FullDay={full_day}")
+            "Обновление отсутствия ID=%s: Date=%s, FullDay=%s", absence_id, absence_date, full_day)
         actual_start_time = start_time if start_time is not None else "00:00"
         actual_end_time = end_time if end_time is not None else "00:00"
         # Параметры должны соответствовать порядку в q.UPDATE_ABSENCE
@@ -150,10 +311,10 @@ class AbsenceRepository:
         result = self.db.execute_query(q.UPDATE_ABSENCE, params)
         if result:
             log.info(
-                f"Запись об отсутствии ID={absence_id} успешно обновлена.")
+                "Запись об отсутствии ID=%s успешно обновлена.", absence_id)
         else:
             log.error(
-                f"Ошибка при обновлении записи об отсутствии ID={absence_id}.")
+                "Ошибка при обновлении записи об отсутствии ID=%s.", absence_id)
         return result
 
     def delete_absence(self, absence_id):
@@ -166,13 +327,13 @@ class AbsenceRepository:
         Returns:
             bool: True в случае успеха, False при ошибке.
         """
-        log.debug(f"Удаление записи об отсутствии с ID={absence_id}")
+        log.debug("Удаление записи об отсутствии с ID=%s", absence_id)
         result = self.db.execute_query(q.DELETE_ABSENCE, (absence_id,))
         if result:
-            log.info(f"Запись об отсутствии ID={absence_id} успешно удалена.")
+            log.info("Запись об отсутствии ID=%s успешно удалена.", absence_id)
         else:
             log.error(
-                f"Ошибка при удалении записи об отсутствии ID={absence_id}.")
+                "Ошибка при удалении записи об отсутствии ID=%s.", absence_id)
         return result
 
     # --- Вспомогательные методы и проверки ---
@@ -189,12 +350,12 @@ class AbsenceRepository:
             bool: True, если запись существует, иначе False.
         """
         log.debug(
-            f"Проверка существования отсутствия для PN={personnel_number} на {absence_date}")
+            "Проверка существования отсутствия для PN=%s на %s", personnel_number, absence_date)
         query = q.CHECK_ABSENCE_EXISTS_BY_PN_DATE
         result = self.db.fetch_one(query, (personnel_number, absence_date))
         exists = result is not None
         log.debug(
-            f"Результат проверки отсутствия: {'Найдено' if exists else 'Не найдено'}")
+            "Результат проверки отсутствия: %s", 'Найдено' if exists else 'Не найдено')
         return exists
 
     def get_employee_list(self):
@@ -205,7 +366,9 @@ class AbsenceRepository:
             list[str]: Список строк вида "Фамилия Имя Отчество (Таб.№)".
         """
         log.debug("Запрос списка сотрудников для диалога отсутствий")
-        employees = self.db.fetch_all(q.GET_EMPLOYEE_LIST_FOR_ABSENCE)
+        employees = self.db.fetch_all(
+            q.GET_EMPLOYEE_LIST_FOR_ABSENCE,
+            {"active_state_id": self.db.references.get_id("States", q.STATE_ACTIVE)})
         if employees is None:
             log.warning(
                 "Не удалось получить список сотрудников для диалога отсутствий.")
@@ -224,15 +387,15 @@ class AbsenceRepository:
             tuple | None: Кортеж (schedule_id, start_time, end_time) или None, если график не найден.
         """
         log.debug(
-            f"Запрос рабочих часов: PosID={position_id}, DayOfWeekID={day_of_week_id}")
-        result = self.db.fetch_one(
+            "Запрос рабочих часов: PosID=%s, DayOfWeekID=%s", position_id, day_of_week_id)
+        result = self.read_db.fetch_one(
             q.GET_WORKING_HOURS_FOR_POSITION_AND_DAY, (position_id, day_of_week_id))
         if result:
             log.debug(
-                f"Найден график: SchedID={result[0]}, Start={result[1]}, End={result[2]}")
+                "Найден график: SchedID=%s, Start=%s, End=%s", result[0], result[1], result[2])
         else:
             log.warning(
-                f"График работы для PosID={position_id}, DayOfWeekID={day_of_week_id} не найден.")
+                "График работы для PosID=%s, DayOfWeekID=%s не найден.", position_id, day_of_week_id)
         return result
 
     def get_employee_position_id(self, personnel_number):
@@ -245,16 +408,16 @@ class AbsenceRepository:
         Returns:
             int | None: ID должности или None, если сотрудник или должность не найдены.
         """
-        log.debug(f"Запрос PositionID для сотрудника PN={personnel_number}")
+        log.debug("Запрос PositionID для сотрудника PN=%s", personnel_number)
         query = q.GET_EMPLOYEE_POSITION_ID_BY_PN
         result = self.db.fetch_one(query, (personnel_number,))
         if result:
             position_id = result[0]
-            log.debug(f"PositionID для PN={personnel_number}: {position_id}")
+            log.debug("PositionID для PN=%s: %s", personnel_number, position_id)
             return position_id
         else:
             log.error(
-                f"Не удалось найти PositionID для сотрудника PN={personnel_number}")
+                "Не удалось найти PositionID для сотрудника PN=%s", personnel_number)
             return None
 
     # --- Методы для отчетов --- # TODO: Перенести логику отчетов
@@ -263,22 +426,26 @@ class AbsenceRepository:
         """
         Получает детали всех записей отсутствий за заданный период для отчета.
 
+        Дата и время возвращаются целыми числами (см. `db.date_codes`), чтобы
+        длительности и диапазоны считались без разбора строк.
+
         Args:
-            start_date (str): Начальная дата периода (ГГГГ-ММ-ДД).
-            end_date (str): Конечная дата периода (ГГГГ-ММ-ДД).
+            start_date (datetime.date | str): Начальная дата периода (ГГГГ-ММ-ДД).
+            end_date (datetime.date | str): Конечная дата периода (ГГГГ-ММ-ДД).
 
         Returns:
-            list[tuple]: Список кортежей с деталями отсутствий.
+            list[tuple]: Список (Таб.№, юлианский день, FullDay, минута начала,
+                         минута окончания, ScheduleID).
         """
         log.debug(
-            f"Запрос деталей отсутствий для отчета: {start_date} - {end_date}")
-        result = self.db.fetch_all(
-            q.GET_ABSENCES_DETAILS_FOR_REPORT, (start_date, end_date))
+            "Запрос деталей отсутствий для отчета: %s - %s", start_date, end_date)
+        result = self.read_db.fetch_all(
+            q.GET_ABSENCES_DETAILS_FOR_REPORT, (date_to_day(start_date), date_to_day(end_date)))
         if result is None:
             log.warning(
                 "Запрос деталей отсутствий для отчета не вернул данных.")
             return []
-        log.debug(f"Получено {len(result)} записей отсутствий для отчета.")
+        log.debug("Получено %s записей отсутствий для отчета.", len(result))
         return result
 
     def get_employee_fio_map(self):
@@ -292,33 +459,59 @@ class AbsenceRepository:
         """
         log.debug("Запрос карты сотрудников (Таб.номер -> ФИО)")
         query = q.GET_EMPLOYEE_FIO_MAP_DATA
-        employees = self.db.fetch_all(query)
+        employees = self.read_db.fetch_all(query)
         if employees is None:
             log.error("Не удалось получить список сотрудников для карты ФИО.")
             return {}
         fio_map = {str(emp[0]): emp[1]
                    for emp in employees}  # Убедимся, что ключ - строка
-        log.debug(f"Создана карта ФИО для {len(fio_map)} сотрудников.")
+        log.debug("Создана карта ФИО для %s сотрудников.", len(fio_map))
         return fio_map
 
-    def get_raw_absence_data(self, start_date, end_date):
+    def get_absence_hours_by_employee(self, start_date, end_date):
         """
-        Получает "сырые" данные об отсутствиях за период для расчета суммарного времени.
+        Получает суммарное время отсутствия каждого сотрудника за период.
+
+        Суммы читаются из `AbsenceDailyMinutes`, которую триггеры обновляют
+        при добавлении, изменении и удалении отсутствий (миграция 0007).
 
         Args:
             start_date (str): Начальная дата периода (ГГГГ-ММ-ДД).
             end_date (str): Конечная дата периода (ГГГГ-ММ-ДД).
 
         Returns:
-            list[tuple]: Список кортежей с данными отсутствий.
+            list[tuple[str, str, float]]: Список (Таб.№, ФИО, часы), отсортированный
+                по убыванию часов. Сотрудники без отсутствий не включаются.
         """
         log.debug(
-            f"Запрос сырых данных отсутствий за период: {start_date} - {end_date}")
-        result = self.db.fetch_all(
-            q.GET_RAW_ABSENCE_DATA_FOR_SUMMATION, (start_date, end_date))
+            "Запрос сумм отсутствий за период: %s - %s", start_date, end_date)
+        result = self.read_db.fetch_all(
+            q.GET_ABSENCE_MINUTES_BY_EMPLOYEE, (start_date, end_date))
         if result is None:
-            log.warning("Запрос сырых данных отсутствий не вернул данных.")
+            log.warning("Запрос сумм отсутствий не вернул данных.")
             return []
-        log.debug(f"Получено {len(result)} сырых записей об отсутствии.")
-        # Не заменяем None на '', так как None важен для логики расчета времени.
+        log.debug("Получены суммы отсутствий для %s сотрудников.", len(result))
+        return [(pn, name, round(minutes / 60, 2)) for pn, name, minutes in result]
+
+    def rebuild_absence_minutes(self):
+        """
+        Полностью пересчитывает `AbsenceDailyMinutes` по записям об отсутствии.
+
+        Нужен после изменения графиков работы (`Schedules`/`WorkingHours`):
+        триггеры пересчитывают суммы только при изменении самих отсутствий
+        и должности сотрудника.
+
+        Returns:
+            bool: True в случае успеха, False при ошибке.
+        """
+        log.info("Пересчет сумм минут отсутствия")
+        try:
+            with self.db.transaction():
+                result = (self.db.execute_query(q.DELETE_ALL_ABSENCE_DAILY_MINUTES)
+                          and self.db.execute_query(q.REBUILD_ABSENCE_DAILY_MINUTES))
+        except sqlite3.Error as e:
+            log.error("Ошибка пересчета сумм минут отсутствия: %s", e)
+            result = False
+        if result:
+            log.info("Суммы минут отсутствия пересчитаны")
         return result
@@ -0,0 +1,184 @@
+# db/change_journal.py
+"""
+Модуль журнала изменений данных.
+
+Триггеры миграции 0008 записывают каждое изменение основных таблиц и
+справочников в таблицу `ChangeLog` (сущность, ключ, операция, версия).
+`ChangeJournal` читает новые записи журнала и рассылает их подписчикам -
+кэшам и вкладкам, которым нужно знать, что именно изменилось, вместо
+полной перезагрузки.
+
+`Database` вызывает `poll()` после каждого подтвержденного изменения
+(`execute_query`, `execute_many`, `transaction()`); изменения других
+процессов подхватываются периодическим `poll()` (см. `MainWindow`).
+Подписчики вызываются в потоке, выполнившем `poll()`.
+"""
+import logging
+import threading
+from typing import Callable, NamedTuple
+
+from config import CHANGE_LOG_RETENTION
+import db.queries as q
+
+log = logging.getLogger(__name__)
+
+
+class Change(NamedTuple):
+    """Одна запись журнала изменений."""
+    version: int
+    entity: str      # Имя таблицы
+    key: str         # PersonnelNumber для Employees, ID для остальных
+    operation: str   # insert, update, delete
+
+
+class ChangeJournal:
+    """Чтение журнала `ChangeLog` и рассылка изменений подписчикам."""
+
+    def __init__(self, db, retention: int = CHANGE_LOG_RETENTION):
+        """
+        Инициализирует журнал (последняя версия определяется при первом `poll()`).
+
+        Args:
+            db (Database): Объект базы данных с таблицей `ChangeLog`.
+            retention (int, optional): Сколько последних записей хранить в журнале.
+        """
+        self.db = db
+        self.retention = max(1, retention)
+        self._version: int | None = None  # Последняя разосланная версия
+        self._pruned_at = 0
+        self._available = False
+        self._subscribers: list[tuple[Callable[[list[Change]], None], frozenset | None]] = []
+        self._lock = threading.Lock()
+        self._polling = threading.local()
+
+    @property
+    def version(self) -> int:
+        """Последняя разосланная версия журнала (0, если журнал еще не читался)."""
+        return self._version or 0
+
+    # --- Подписка ---
+
+    def subscribe(self, callback: Callable[[list[Change]], None], entities=None) -> None:
+        """
+        Подписывает обработчик на изменения.
+
+        Args:
+            callback (Callable[[list[Change]], None]): Вызывается со списком новых
+                изменений (в порядке версий) после их подтверждения.
+            entities (Iterable[str] | None, optional): Имена таблиц, изменения которых
+                нужны обработчику; None - все изменения.
+        """
+        with self._lock:
+            self._subscribers.append(
+                (callback, frozenset(entities) if entities is not None else None))
+
+    def unsubscribe(self, callback: Callable[[list[Change]], None]) -> None:
+        """
+        Отписывает обработчик (все его подписки).
+
+        Args:
+            callback (Callable[[list[Change]], None]): Ранее подписанный обработчик.
+        """
+        with self._lock:
+            self._subscribers = [(cb, entities) for cb, entities in self._subscribers
+                                 if cb != callback]
+
+    # --- Чтение ---
+
+    def changes_since(self, version: int, entities=None) -> list[Change] | None:
+        """
+        Возвращает изменения после указанной версии.
+
+        Args:
+            version (int): Последняя известная вызывающему версия.
+            entities (Iterable[str] | None, optional): Фильтр по именам таблиц.
+
+        Returns:
+            list[Change] | None: Изменения в порядке версий или None, если часть
+                изменений уже удалена из журнала (или журнала нет) - тогда нужна
+                полная перезагрузка.
+        """
+        if not self._check_available():
+            return None
+        bounds = self.db.fetch_one(q.GET_CHANGE_LOG_BOUNDS)
+        if bounds is None:
+            return None
+        oldest = bounds[0]
+        if oldest is not None and version < oldest - 1:
+            log.debug("Версия %s уже удалена из журнала изменений (старейшая %s)", version, oldest)
+            return None
+        rows = self.db.fetch_all(q.GET_CHANGES_SINCE, (version,))
+        if rows is None:
+            return None
+        changes = [Change(*row) for row in rows]
+        if entities is not None:
+            entities = set(entities)
+            changes = [change for change in changes if change.entity in entities]
+        return changes
+
+    def poll(self) -> int:
+        """
+        Читает новые записи журнала и рассылает их подписчикам.
+
+        Returns:
+            int: Количество новых изменений.
+        """
+        if getattr(self._polling, "active", False) or not self._check_available():
+            return 0
+        self._polling.active = True
+        try:
+            with self._lock:
+                changes = self._read_new_changes()
+                subscribers = list(self._subscribers)
+            if changes:
+                self._dispatch(changes, subscribers)
+            self._prune()
+            return len(changes)
+        finally:
+            self._polling.active = False
+
+    # --- Внутренние методы ---
+
+    def _check_available(self) -> bool:
+        """Проверяет наличие таблицы `ChangeLog` (до миграции 0008 ее нет)."""
+        if not self._available:
+            self._available = self.db.fetch_one(q.CHECK_TABLE_EXISTS, ("ChangeLog",)) is not None
+        return self._available
+
+    def _read_new_changes(self) -> list[Change]:
+        """Читает изменения после последней разосланной версии и сдвигает ее."""
+        if self._version is None:
+            # Изменения до первого чтения не рассылаются
+            bounds = self.db.fetch_one(q.GET_CHANGE_LOG_BOUNDS)
+            self._version = (bounds[1] or 0) if bounds else 0
+            log.debug("Журнал изменений: начальная версия %s", self._version)
+            return []
+        rows = self.db.fetch_all(q.GET_CHANGES_SINCE, (self._version,))
+        if not rows:
+            return []
+        changes = [Change(*row) for row in rows]
+        self._version = changes[-1].version
+        return changes
+
+    def _dispatch(self, changes: list[Change],
+                  subscribers: list[tuple[Callable[[list[Change]], None], frozenset | None]]) -> None:
+        """Вызывает обработчики подписчиков; ошибка обработчика не мешает остальным."""
+        log.debug("Журнал изменений: %s новых (до версии %s)", len(changes), changes[-1].version)
+        for callback, entities in subscribers:
+            selected = changes if entities is None else [
+                change for change in changes if change.entity in entities]
+            if not selected:
+                continue
+            try:
+                callback(selected)
+            except Exception:
+                log.exception("Ошибка обработчика журнала изменений %r", callback)
+
+    def _prune(self) -> None:
+        """Удаляет из журнала записи старше `retention` последних версий."""
+        if self.db.readonly or self.version - self._pruned_at < self.retention:
+            return
+        self._pruned_at = self.version
+        threshold = self.version - self.retention
+        if self.db.execute_query(q.PRUNE_CHANGE_LOG, (threshold,)):
+            log.debug("Журнал изменений очищен до версии %s", threshold)
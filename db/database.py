@@ -5,13 +5,103 @@
 Предоставляет класс `Database` для установки соединения, выполнения
 SQL-запросов (включая SELECT, INSERT, UPDATE, DELETE), получения результатов
 и управления транзакциями (commit, rollback), а также закрытия соединения.
+
+В режиме пула (`pooled=True`) каждый поток получает собственное соединение
+и курсор, что позволяет выполнять запросы репозиториев из рабочих потоков,
+не затрагивая состояние курсора главного (Tk) потока.
+
+К каждому соединению при открытии применяется профиль PRAGMA-настроек
+(`config.DB_PROFILES`), выбранный через `DB_PROFILE`.
+
+Несколько операций можно объединить в одну транзакцию через
+`with db.transaction(): ...` (вложенные блоки реализуются через SAVEPOINT).
+
+Для каждого запроса учитываются время выполнения, число строк и вызовов
+(см. `Database.stats()` и `db.query_stats`).
+
+Результаты COUNT-запросов списков кэшируются (`get_cached_count`) до первой
+записи в БД (через этот объект или, по журналу изменений, другим процессом),
+справочники - в `Database.references` (`db.reference_cache.ReferenceCache`).
+
+Подтвержденные изменения рассылаются подписчикам через журнал изменений
+`Database.changes` (`db.change_journal.ChangeJournal`).
+
+Для отчетов и дашборда предназначено отдельное соединение только для чтения
+(`Database.read_only()`): в режиме WAL тяжелые аналитические запросы через него
+не блокируют запись и не ждут ее.
 """
 import sqlite3
 import logging
-from config import DATABASE_PATH
+import re
+import threading
+import time
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from config import (DATABASE_PATH, DATABASE_POOLED, DB_PROFILE, DB_PROFILES,
+                    SLOW_QUERY_THRESHOLD_MS)
+from db.query_stats import QueryStats
+from db.reference_cache import ReferenceCache
+from db.change_journal import ChangeJournal
 
 log = logging.getLogger(__name__)
 
+# Порядок применения важен: journal_mode переключается до остальных настроек
+PRAGMA_ORDER = ("journal_mode", "synchronous", "cache_size",
+                "mmap_size", "temp_store", "busy_timeout")
+
+# Размер пачки строк для execute_many (одна транзакция на пачку)
+DEFAULT_CHUNK_SIZE = 1000
+# Количество строк, читаемых за один fetchmany в fetch_iter
+DEFAULT_FETCH_BATCH_SIZE = 500
+
+_SELECT_RE = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+_SELECT_DISTINCT_RE = re.compile(r"^\s*SELECT\s+DISTINCT\b", re.IGNORECASE)
+
+# Токенизатор trigram не находит подстроки короче трех символов
+FTS_MIN_TERM_LENGTH = 3
+
+
+def fts_phrase(term: str) -> str:
+    """
+    Превращает строку поиска в фразу FTS5 (поиск подстроки для trigram).
+
+    Args:
+        term (str): Строка поиска, введенная пользователем.
+
+    Returns:
+        str: Фраза в двойных кавычках; кавычки внутри строки экранируются.
+    """
+    return '"' + term.replace('"', '""') + '"'
+
+
+def py_lower(value):
+    """
+    Переводит значение в нижний регистр с учетом Unicode (функция SQL `py_lower`).
+
+    Встроенные LOWER() и LIKE SQLite без ICU учитывают регистр только для ASCII,
+    поэтому поиск через LIKE сравнивает `py_lower(столбец) LIKE py_lower(:search_term)`.
+
+    Args:
+        value: Значение столбца или параметра.
+
+    Returns:
+        str | None: Строка в нижнем регистре или None для NULL.
+    """
+    if value is None:
+        return None
+    return str(value).lower()
+
+
+def register_functions(conn: sqlite3.Connection) -> None:
+    """
+    Регистрирует в соединении пользовательские SQL-функции приложения.
+
+    Args:
+        conn (sqlite3.Connection): Соединение с БД.
+    """
+    conn.create_function("py_lower", 1, py_lower, deterministic=True)
+
 
 class Database:
     """
@@ -19,33 +109,199 @@ class Database:
     к базе данных SQLite.
     """
 
-    def __init__(self, db_path: str = DATABASE_PATH):
+    def __init__(self, db_path: str = DATABASE_PATH, pooled: bool = DATABASE_POOLED,
+                 profile: str = DB_PROFILE, readonly: bool = False):
         """
         Инициализирует объект Database и устанавливает соединение с БД.
 
         Args:
             db_path (str, optional): Путь к файлу базы данных SQLite.
                                      По умолчанию используется значение из `config.DATABASE_PATH`.
+            pooled (bool, optional): Режим пула соединений: каждый поток работает
+                                     через собственное соединение и курсор.
+                                     По умолчанию используется `config.DATABASE_POOLED`.
+            profile (str, optional): Имя профиля PRAGMA-настроек из `config.DB_PROFILES`.
+                                     Неизвестное имя заменяется профилем "safe".
+            readonly (bool, optional): Открыть БД только для чтения
+                                       (URI `mode=ro` и `PRAGMA query_only`).
         """
-        log.debug(f"Инициализация Database с путем к БД: {db_path}")
+        log.debug(
+            "Инициализация Database с путем к БД: %s, режим пула: %s", db_path, pooled)
+        self.db_path = db_path
+        self.pooled = pooled
+        self.readonly = readonly
+        if profile not in DB_PROFILES:
+            log.warning(
+                "Неизвестный профиль БД '%s', используется профиль 'safe'.", profile)
+            profile = "safe"
+        self.profile = profile
+        self.pragmas: dict = {}  # Фактические значения PRAGMA главного соединения
         self.conn: sqlite3.Connection | None = None
         self.cursor: sqlite3.Cursor | None = None
-        try:
-            # connect() создает файл, если он не существует
-            self.conn = sqlite3.connect(db_path)
+        self._local = threading.local()
+        self._pool_lock = threading.Lock()
+        # Все открытые соединения (главное и потоковые) для закрытия в close()
+        self._connections: list[sqlite3.Connection] = []
+        self._closed = False
+        self.query_stats = QueryStats(SLOW_QUERY_THRESHOLD_MS)
+        # Соединение только для чтения (создается лениво в read_only())
+        self._reader: "Database | None" = None
+        # Счетчик записей: любое изменение данных делает кэш количеств устаревшим
+        self._write_generation = 0
+        self._count_cache: dict[tuple, tuple[int, int]] = {}
+        # Счетчик и кэш количеств используются из рабочих потоков загрузки
+        self._count_lock = threading.Lock()
+        self.references = ReferenceCache(self)
+        self.changes = ChangeJournal(self)
+        # Изменения из других процессов тоже делают кэш количеств устаревшим
+        self.changes.subscribe(self._on_changes)
+
+        # connect() создает файл, если он не существует
+        self.conn = self._open_connection()
+        if self.conn is not None:
+            self.pragmas = self._read_pragmas(self.conn)
+            log.info(
+                "Профиль БД '%s', фактические PRAGMA: %s", self.profile, self.pragmas)
             self.cursor = self.conn.cursor()
-            log.info(f"Успешное подключение к базе данных: {db_path}")
+            self._local.conn = self.conn
+            self._local.cursor = self.cursor
+            log.info("Успешное подключение к базе данных: %s", db_path)
+        # В случае ошибки подключения self.conn и self.cursor останутся None
+
+    # --- Управление соединениями ---
+
+    def _open_connection(self) -> sqlite3.Connection | None:
+        """
+        Открывает новое соединение с БД и регистрирует его в пуле.
+
+        Соединения пула создаются с `check_same_thread=False`, так как
+        при завершении работы их закрывает главный поток. Во время работы
+        каждое соединение используется только потоком, которому оно выдано.
+
+        Returns:
+            sqlite3.Connection | None: Новое соединение или None при ошибке.
+        """
+        try:
+            if self.readonly:
+                # mode=ro не создает файл и запрещает запись на уровне SQLite
+                uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+                conn = sqlite3.connect(
+                    uri, uri=True, check_same_thread=not self.pooled)
+            else:
+                conn = sqlite3.connect(
+                    self.db_path, check_same_thread=not self.pooled)
+            register_functions(conn)
+            self._apply_profile(conn)
+        except sqlite3.Error as e:
+            log.error(
+                "Ошибка подключения к базе данных SQLite (%s): %s", self.db_path, e, exc_info=True)
+            return None
+        with self._pool_lock:
+            self._connections.append(conn)
+        return conn
+
+    def _apply_profile(self, conn: sqlite3.Connection) -> None:
+        """
+        Применяет PRAGMA-настройки выбранного профиля к соединению.
+
+        Ошибка отдельной настройки не прерывает подключение: она
+        логируется, и соединение продолжает работу со значением по умолчанию.
+
+        Args:
+            conn (sqlite3.Connection): Только что открытое соединение.
+        """
+        settings = DB_PROFILES[self.profile]
+        for name in PRAGMA_ORDER:
+            if name not in settings:
+                continue
+            # Режим журнала задает пишущее соединение, читающее его не меняет
+            if self.readonly and name == "journal_mode":
+                continue
+            try:
+                conn.execute(f"PRAGMA {name} = {settings[name]}")
+            except sqlite3.Error as e:
+                log.warning(
+                    "Не удалось применить PRAGMA %s = %s: %s", name, settings[name], e)
+        if self.readonly:
+            conn.execute("PRAGMA query_only = ON")
+
+    def _read_pragmas(self, conn: sqlite3.Connection) -> dict:
+        """
+        Считывает фактические значения PRAGMA профиля из соединения.
+
+        Args:
+            conn (sqlite3.Connection): Соединение с БД.
+
+        Returns:
+            dict: Словарь {имя PRAGMA: значение}.
+        """
+        values = {}
+        for name in PRAGMA_ORDER:
+            try:
+                row = conn.execute(f"PRAGMA {name}").fetchone()
+                values[name] = row[0] if row else None
+            except sqlite3.Error as e:
+                log.warning("Не удалось прочитать PRAGMA %s: %s", name, e)
+        return values
+
+    def _get_handles(self) -> tuple[sqlite3.Connection | None, sqlite3.Cursor | None]:
+        """
+        Возвращает соединение и курсор для текущего потока.
+
+        Без режима пула всегда возвращается общее соединение `self.conn`.
+        В режиме пула соединение потока создается лениво при первом запросе.
+
+        Returns:
+            tuple[sqlite3.Connection | None, sqlite3.Cursor | None]:
+                Пара (соединение, курсор) или (None, None), если БД недоступна.
+        """
+        if not self.pooled or self.conn is None or self._closed:
+            return self.conn, self.cursor
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open_connection()
+            if conn is None:
+                return None, None
+            self._local.conn = conn
+            self._local.cursor = conn.cursor()
+            log.debug(
+                "Открыто соединение пула для потока '%s'", threading.current_thread().name)
+        return conn, self._local.cursor
+
+    def release_connection(self) -> None:
+        """
+        Закрывает соединение текущего рабочего потока (режим пула).
+
+        Вызывается рабочим потоком перед завершением. Соединение главного
+        потока (`self.conn`) этим методом не закрывается.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None or conn is self.conn:
+            return
+        try:
+            self._local.cursor.close()
+            conn.close()
+            log.debug(
+                "Соединение пула потока '%s' закрыто.", threading.current_thread().name)
         except sqlite3.Error as e:
             log.error(
-                f"Ошибка подключения к базе данных SQLite ({db_path}): {e}", exc_info=True)
-            # В случае ошибки подключения self.conn и self.cursor останутся None
+                "Ошибка при закрытии соединения пула: %s", e, exc_info=True)
+        finally:
+            with self._pool_lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+            self._local.conn = None
+            self._local.cursor = None
 
     def execute_query(self, query: str, params: tuple | dict | None = None) -> bool:
         """
         Выполняет SQL-запрос, изменяющий данные (INSERT, UPDATE, DELETE).
 
         Автоматически подтверждает (commit) транзакцию в случае успеха
-        или откатывает (rollback) в случае ошибки.
+        или откатывает (rollback) в случае ошибки. Внутри блока
+        `transaction()` commit откладывается до выхода из внешнего блока,
+        а ошибка помечает текущий блок для отката.
 
         Args:
             query (str): SQL-запрос для выполнения.
@@ -56,32 +312,262 @@ class Database:
         Returns:
             bool: True в случае успешного выполнения и commit, False в случае ошибки и rollback.
         """
-        if not self.conn or not self.cursor:
+        conn, cursor = self._get_handles()
+        if not conn or not cursor:
             log.error("Попытка выполнить запрос без активного соединения с БД.")
             return False
 
         log.debug(
-            f"Выполнение запроса (execute): {query} с параметрами: {params}")
+            "Выполнение запроса (execute): %s с параметрами: %s", query, params)
+        started = time.perf_counter()
         try:
             if params:
-                self.cursor.execute(query, params)
+                cursor.execute(query, params)
             else:
-                self.cursor.execute(query)
-            self.conn.commit()
+                cursor.execute(query)
+            # Счетчик меняется и до commit (это соединение уже видит запись),
+            # и после него: количество, прочитанное другим потоком до commit,
+            # не попадет в кэш (см. set_cached_count)
+            self._bump_write_generation()
+            self.references.invalidate_for_query(query)
+            if self._transaction_stack():
+                self._record(query, started, cursor.rowcount, params)
+                log.debug("Запрос выполнен, commit отложен до конца транзакции.")
+                return True
+            conn.commit()
+            self._bump_write_generation()
+            self._record(query, started, cursor.rowcount, params)
             log.debug(
                 "Запрос успешно выполнен и транзакция подтверждена (commit).")
+            self.changes.poll()
             return True
         except sqlite3.Error as e:
-            log.exception(f"Ошибка выполнения SQL запроса (execute): {e}\n" +
-                          f"Запрос: {query}\nПараметры: {params}")
+            self._record(query, started, 0, params, error=True)
+            log.exception("Ошибка выполнения SQL запроса (execute): %s\nЗапрос: %s\nПараметры: %s", e, query, params)
+            stack = self._transaction_stack()
+            if stack:
+                # Откат выполнит transaction() при выходе из блока
+                stack[-1]["failed"] = True
+                return False
             try:
-                self.conn.rollback()
+                conn.rollback()
                 log.warning("Транзакция отменена (rollback) из-за ошибки.")
             except sqlite3.Error as rb_err:
                 log.error(
-                    f"Ошибка при попытке отката транзакции: {rb_err}", exc_info=True)
+                    "Ошибка при попытке отката транзакции: %s", rb_err, exc_info=True)
             return False
 
+    def execute_many(self, query: str, rows, chunk_size: int = DEFAULT_CHUNK_SIZE) -> tuple[int, list[tuple[int, tuple | dict, str]]]:
+        """
+        Выполняет один и тот же изменяющий SQL-запрос для набора строк параметров.
+
+        Строки обрабатываются пачками по `chunk_size`: каждая пачка выполняется
+        через `cursor.executemany` в одной транзакции с одним commit
+        (внутри `transaction()` - в отдельном SAVEPOINT без commit).
+        Если пачка завершилась ошибкой, транзакция откатывается и пачка
+        повторяется построчно, чтобы сохранить корректные строки и
+        определить, какие именно строки не прошли.
+
+        Args:
+            query (str): SQL-запрос (INSERT, UPDATE, DELETE) с плейсхолдерами.
+            rows (Iterable[tuple | dict]): Параметры запроса, по одному набору на строку.
+            chunk_size (int, optional): Количество строк в одной транзакции.
+
+        Returns:
+            tuple[int, list[tuple[int, tuple | dict, str]]]: Кортеж, содержащий:
+                - Количество успешно записанных строк.
+                - Список ошибок (индекс строки во входных данных, параметры, текст ошибки).
+        """
+        conn, cursor = self._get_handles()
+        if not conn or not cursor:
+            log.error(
+                "Попытка выполнить запрос execute_many без активного соединения с БД.")
+            return 0, [(index, row, "Нет соединения с БД") for index, row in enumerate(rows)]
+
+        chunk_size = max(1, chunk_size)
+        log.debug(
+            "Выполнение запроса (execute_many): %s, размер пачки: %s", query, chunk_size)
+        started = time.perf_counter()
+        succeeded = 0
+        failed: list[tuple[int, tuple | dict, str]] = []
+        iterator = iter(rows)
+        offset = 0
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+            try:
+                with self.transaction():
+                    cursor.executemany(query, chunk)
+                succeeded += len(chunk)
+            except sqlite3.Error as e:
+                log.warning(
+                    "Ошибка пакетного выполнения (строки %s-%s): %s. Повтор пачки построчно.", offset, offset + len(chunk) - 1, e)
+                chunk_succeeded, chunk_failed = self._execute_rows(
+                    cursor, query, chunk, offset)
+                succeeded += chunk_succeeded
+                failed.extend(chunk_failed)
+            offset += len(chunk)
+
+        if succeeded:
+            self._bump_write_generation()
+            self.references.invalidate_for_query(query)
+        self._record(query, started, succeeded,
+                     f"<execute_many: {offset} строк>", error=bool(failed))
+        log.debug(
+            "Запрос execute_many выполнен: успешно %s, с ошибками %s", succeeded, len(failed))
+        return succeeded, failed
+
+    def _execute_rows(self, cursor: sqlite3.Cursor, query: str,
+                      chunk: list, offset: int) -> tuple[int, list[tuple[int, tuple | dict, str]]]:
+        """
+        Построчно выполняет пачку в одной транзакции, пропуская ошибочные строки.
+
+        Ошибка отдельного оператора в SQLite отменяет только этот оператор,
+        поэтому остальные строки пачки подтверждаются одним commit.
+
+        Args:
+            cursor (sqlite3.Cursor): Курсор текущего потока.
+            query (str): SQL-запрос.
+            chunk (list): Строки параметров пачки.
+            offset (int): Индекс первой строки пачки во входных данных.
+
+        Returns:
+            tuple[int, list[tuple[int, tuple | dict, str]]]: Количество успешных строк и список ошибок.
+        """
+        succeeded = 0
+        failed = []
+        try:
+            with self.transaction():
+                for index, row in enumerate(chunk, start=offset):
+                    try:
+                        cursor.execute(query, row)
+                        succeeded += 1
+                    except sqlite3.Error as e:
+                        log.error(
+                            "Ошибка выполнения строки #%s (execute_many): %s\nПараметры: %s", index, e, row)
+                        failed.append((index, row, str(e)))
+        except sqlite3.Error as e:
+            log.exception("Ошибка подтверждения пачки (execute_many): %s", e)
+            return 0, [(index, row, str(e)) for index, row in enumerate(chunk, start=offset)]
+        return succeeded, failed
+
+    # --- Транзакции ---
+
+    def _transaction_stack(self) -> list[dict]:
+        """
+        Возвращает стек открытых блоков `transaction()` текущего потока.
+
+        Returns:
+            list[dict]: Список состояний блоков (от внешнего к внутреннему).
+        """
+        stack = getattr(self._local, "transactions", None)
+        if stack is None:
+            stack = self._local.transactions = []
+        return stack
+
+    @contextmanager
+    def transaction(self):
+        """
+        Контекстный менеджер единицы работы, объединяющий несколько запросов.
+
+        Внешний блок открывает транзакцию (BEGIN IMMEDIATE) и подтверждает ее
+        одним commit при выходе. Вложенные блоки оформляются как SAVEPOINT.
+        Блок откатывается, если внутри возникло исключение (оно пробрасывается
+        дальше) или если `execute_query` внутри блока вернул False.
+
+        Пример:
+            with db.transaction():
+                event_repository.insert_event(...)
+                employee_repository.update_employee(...)
+
+        Raises:
+            sqlite3.Error: Если нет соединения с БД или не удалось открыть,
+                           подтвердить или откатить транзакцию.
+        """
+        conn, _ = self._get_handles()
+        if not conn:
+            log.error("Попытка открыть транзакцию без активного соединения с БД.")
+            raise sqlite3.OperationalError("Нет активного соединения с БД")
+
+        stack = self._transaction_stack()
+        depth = len(stack)
+        savepoint = f"sp_level_{depth}"
+        if depth == 0:
+            conn.execute("BEGIN IMMEDIATE")
+        else:
+            conn.execute(f"SAVEPOINT {savepoint}")
+        state = {"failed": False}
+        stack.append(state)
+        log.debug("Начало транзакции (уровень %s)", depth)
+
+        try:
+            yield
+        except BaseException:
+            stack.pop()
+            self._rollback_level(conn, depth, savepoint)
+            raise
+
+        stack.pop()
+        if state["failed"]:
+            log.warning(
+                "Транзакция (уровень %s) отменена из-за ошибки запроса.", depth)
+            self._rollback_level(conn, depth, savepoint)
+            return
+        try:
+            if depth == 0:
+                conn.commit()
+                self._bump_write_generation()
+            else:
+                conn.execute(f"RELEASE SAVEPOINT {savepoint}")
+            log.debug("Транзакция (уровень %s) подтверждена.", depth)
+        except sqlite3.Error as e:
+            log.exception(
+                "Ошибка подтверждения транзакции (уровень %s): %s", depth, e)
+            self._rollback_level(conn, depth, savepoint)
+            raise
+        if depth == 0:
+            self.changes.poll()
+
+    def _rollback_level(self, conn: sqlite3.Connection, depth: int, savepoint: str) -> None:
+        """
+        Откатывает блок транзакции: всю транзакцию для внешнего уровня
+        или изменения после SAVEPOINT для вложенного.
+
+        Args:
+            conn (sqlite3.Connection): Соединение текущего потока.
+            depth (int): Уровень вложенности блока (0 - внешний).
+            savepoint (str): Имя точки сохранения вложенного блока.
+        """
+        # Откатываемые изменения могли попасть в кэш справочников и количеств
+        self.references.invalidate()
+        self._bump_write_generation()
+        if depth == 0:
+            self._rollback_quietly(conn)
+            return
+        try:
+            conn.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+            conn.execute(f"RELEASE SAVEPOINT {savepoint}")
+            log.warning(
+                "Изменения вложенной транзакции (уровень %s) отменены.", depth)
+        except sqlite3.Error as e:
+            log.error(
+                "Ошибка отката к точке сохранения %s: %s", savepoint, e, exc_info=True)
+
+    def _rollback_quietly(self, conn: sqlite3.Connection) -> None:
+        """
+        Откатывает текущую транзакцию, логируя (но не пробрасывая) ошибку отката.
+
+        Args:
+            conn (sqlite3.Connection): Соединение, транзакцию которого нужно откатить.
+        """
+        try:
+            conn.rollback()
+            log.warning("Транзакция отменена (rollback) из-за ошибки.")
+        except sqlite3.Error as rb_err:
+            log.error(
+                "Ошибка при попытке отката транзакции: %s", rb_err, exc_info=True)
+
     def fetch_all(self, query: str, params: tuple | dict | None = None) -> list[tuple] | None:
         """
         Выполняет SQL-запрос SELECT и возвращает все найденные строки.
@@ -95,27 +581,179 @@ class Database:
                                 Возвращает пустой список [], если ничего не найдено.
                                 Возвращает None в случае ошибки выполнения запроса.
         """
-        if not self.conn or not self.cursor:
+        conn, cursor = self._get_handles()
+        if not conn or not cursor:
             log.error(
                 "Попытка выполнить запрос fetch_all без активного соединения с БД.")
             return None
 
         log.debug(
-            f"Выполнение запроса (fetch_all): {query} с параметрами: {params}")
+            "Выполнение запроса (fetch_all): %s с параметрами: %s", query, params)
+        started = time.perf_counter()
         try:
             if params:
-                self.cursor.execute(query, params)
+                cursor.execute(query, params)
             else:
-                self.cursor.execute(query)
-            result = self.cursor.fetchall()
+                cursor.execute(query)
+            result = cursor.fetchall()
+            self._record(query, started, len(result), params)
             log.debug(
-                f"Запрос fetch_all выполнен, получено строк: {len(result) if result is not None else 'None'}")
+                "Запрос fetch_all выполнен, получено строк: %s", len(result) if result is not None else 'None')
             return result  # fetchall() возвращает [] если ничего не найдено
         except sqlite3.Error as e:
-            log.exception(f"Ошибка выполнения SQL запроса (fetch_all): {e}\n" +
-                          f"Запрос: {query}\nПараметры: {params}")
+            self._record(query, started, 0, params, error=True)
+            log.exception("Ошибка выполнения SQL запроса (fetch_all): %s\nЗапрос: %s\nПараметры: %s", e, query, params)
             return None
 
+    def fetch_all_with_count(self, query: str, params: tuple | dict | None = None) -> tuple[list[tuple] | None, int]:
+        """
+        Выполняет SELECT и в том же запросе считает общее количество строк
+        результата без учета LIMIT (оконная функция `COUNT(*) OVER ()`).
+
+        Используется для первой страницы списка, чтобы не выполнять отдельный
+        COUNT-запрос с теми же соединениями и фильтрами.
+
+        Args:
+            query (str): SQL-запрос SELECT (может содержать LIMIT).
+            params (tuple | dict | None, optional): Параметры для SQL-запроса.
+
+        Returns:
+            tuple[list[tuple] | None, int]: Кортеж (строки результата или None
+                при ошибке, количество строк, удовлетворяющих WHERE).
+
+        Raises:
+            ValueError: Если запрос не начинается с SELECT (WITH, комментарий)
+                или начинается с SELECT DISTINCT: столбец количества не
+                добавить без изменения смысла запроса.
+        """
+        if _SELECT_DISTINCT_RE.match(query):
+            raise ValueError("fetch_all_with_count не поддерживает SELECT DISTINCT")
+        counted_query, replaced = _SELECT_RE.subn(
+            "SELECT COUNT(*) OVER () AS TotalRows,", query, count=1)
+        if not replaced:
+            raise ValueError("fetch_all_with_count ожидает запрос, начинающийся с SELECT")
+        rows = self.fetch_all(counted_query, params)
+        if rows is None:
+            return None, 0
+        total = rows[0][0] if rows else 0
+        return [row[1:] for row in rows], total
+
+    def _on_changes(self, changes) -> None:
+        """
+        Обработчик журнала изменений: сбрасывает кэш количеств.
+
+        Args:
+            changes (list[Change]): Новые изменения.
+        """
+        self._bump_write_generation()
+
+    def _bump_write_generation(self) -> None:
+        """Увеличивает счетчик записей: закэшированные количества становятся устаревшими."""
+        with self._count_lock:
+            self._write_generation += 1
+
+    @property
+    def write_generation(self) -> int:
+        """Счетчик записей в БД: результат, прочитанный при том же значении, актуален."""
+        return self._write_generation
+
+    def get_cached_count(self, key: tuple) -> int | None:
+        """
+        Возвращает закэшированное количество строк для ключа фильтра.
+
+        Args:
+            key (tuple): Ключ (список, параметры фильтра).
+
+        Returns:
+            int | None: Количество строк или None, если значения нет
+                        или после его сохранения были записи в БД.
+        """
+        with self._count_lock:
+            cached = self._count_cache.get(key)
+            if cached is None or cached[0] != self._write_generation:
+                return None
+            return cached[1]
+
+    def set_cached_count(self, key: tuple, value: int, generation: int) -> None:
+        """
+        Сохраняет количество строк для ключа фильтра до следующей записи в БД.
+
+        Значение, прочитанное до записи (в том числе из другого потока),
+        не сохраняется: оно уже может быть устаревшим.
+
+        Args:
+            key (tuple): Ключ (список, параметры фильтра).
+            value (int): Количество строк.
+            generation (int): `write_generation`, взятый до запроса количества.
+        """
+        with self._count_lock:
+            if generation != self._write_generation:
+                log.debug("Количество для %s прочитано до записи в БД и не кэшируется", key)
+                return
+            if len(self._count_cache) > 256:
+                self._count_cache.clear()
+            self._count_cache[key] = (generation, value)
+
+    def fetch_iter(self, query: str, params: tuple | dict | None = None,
+                   batch_size: int = DEFAULT_FETCH_BATCH_SIZE):
+        """
+        Выполняет SQL-запрос SELECT и построчно отдает результат (генератор).
+
+        Строки читаются порциями через `fetchmany(batch_size)` на отдельном
+        курсоре, поэтому итерация не сбрасывает общий курсор соединения и
+        не держит весь результат в памяти. Курсор закрывается по окончании
+        итерации или при закрытии генератора.
+
+        Args:
+            query (str): SQL-запрос SELECT.
+            params (tuple | dict, optional): Параметры для подстановки в SQL-запрос.
+            batch_size (int, optional): Количество строк в одной порции fetchmany.
+
+        Yields:
+            tuple: Очередная строка результата.
+
+        Raises:
+            sqlite3.Error: При ошибке выполнения запроса или чтения строк
+                           (частично прочитанный результат не должен
+                           приниматься за полный).
+        """
+        conn, _ = self._get_handles()
+        if not conn:
+            log.error(
+                "Попытка выполнить запрос fetch_iter без активного соединения с БД.")
+            raise sqlite3.OperationalError("Нет активного соединения с БД")
+
+        log.debug(
+            "Выполнение запроса (fetch_iter): %s с параметрами: %s, порция: %s", query, params, batch_size)
+        cursor = conn.cursor()
+        total = 0
+        # Учитывается только время работы БД, без времени обработки строк потребителем
+        db_time = 0.0
+        error = False
+        try:
+            started = time.perf_counter()
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            while True:
+                rows = cursor.fetchmany(max(1, batch_size))
+                db_time += time.perf_counter() - started
+                if not rows:
+                    break
+                total += len(rows)
+                yield from rows
+                started = time.perf_counter()
+            log.debug("Запрос fetch_iter выполнен, отдано строк: %s", total)
+        except sqlite3.Error as e:
+            error = True
+            log.exception("Ошибка выполнения SQL запроса (fetch_iter): %s\nЗапрос: %s\nПараметры: %s", e, query, params)
+            raise
+        finally:
+            cursor.close()
+            self.query_stats.record(
+                query, db_time * 1000, total, params, error=error)
+
     def fetch_one(self, query: str, params: tuple | dict | None = None) -> tuple | None:
         """
         Выполняет SQL-запрос SELECT и возвращает одну (первую) строку.
@@ -128,45 +766,136 @@ class Database:
             tuple | None: Кортеж с данными первой строки результата.
                           Возвращает None, если запрос не вернул строк или произошла ошибка.
         """
-        if not self.conn or not self.cursor:
+        conn, cursor = self._get_handles()
+        if not conn or not cursor:
             log.error(
                 "Попытка выполнить запрос fetch_one без активного соединения с БД.")
             return None
 
         log.debug(
-            f"Выполнение запроса (fetch_one): {query} с параметрами: {params}")
+            "Выполнение запроса (fetch_one): %s с параметрами: %s", query, params)
+        started = time.perf_counter()
         try:
             if params:
-                self.cursor.execute(query, params)
+                cursor.execute(query, params)
             else:
-                self.cursor.execute(query)
-            result = self.cursor.fetchone()
+                cursor.execute(query)
+            result = cursor.fetchone()
+            self._record(query, started, 1 if result else 0, params)
             log.debug(
-                f"Запрос fetch_one выполнен, результат: {'Найден' if result else 'Не найден или ошибка'}")
+                "Запрос fetch_one выполнен, результат: %s", 'Найден' if result else 'Не найден или ошибка')
             return result  # fetchone() возвращает None если ничего не найдено
         except sqlite3.Error as e:
-            log.exception(f"Ошибка выполнения SQL запроса (fetch_one): {e}\n" +
-                          f"Запрос: {query}\nПараметры: {params}")
+            self._record(query, started, 0, params, error=True)
+            log.exception("Ошибка выполнения SQL запроса (fetch_one): %s\nЗапрос: %s\nПараметры: %s", e, query, params)
             return None
 
+    # --- Статистика запросов ---
+
+    def _record(self, query: str, started: float, rows: int, params=None, error: bool = False) -> None:
+        """
+        Учитывает выполнение запроса в статистике.
+
+        Args:
+            query (str): Текст SQL-запроса.
+            started (float): Момент начала выполнения (`time.perf_counter()`).
+            rows (int): Количество прочитанных или измененных строк.
+            params (optional): Параметры запроса.
+            error (bool, optional): Завершился ли запрос ошибкой.
+        """
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.query_stats.record(query, elapsed_ms, max(rows, 0), params, error)
+
+    def stats(self) -> dict[str, dict]:
+        """
+        Возвращает снимок статистики выполнения запросов.
+
+        Returns:
+            dict[str, dict]: Словарь {нормализованный текст запроса: показатели}
+                (calls, rows, errors, total_ms, avg_ms, max_ms, histogram),
+                упорядоченный по убыванию суммарного времени.
+        """
+        return self.query_stats.snapshot()
+
+    def reset_stats(self) -> None:
+        """Очищает накопленную статистику запросов."""
+        self.query_stats.reset()
+
+    def dump_stats(self, file_path) -> bool:
+        """
+        Сохраняет снимок статистики запросов в JSON-файл.
+
+        Args:
+            file_path: Путь к файлу.
+
+        Returns:
+            bool: True при успешной записи, False при ошибке.
+        """
+        return self.query_stats.dump(file_path)
+
+    def read_only(self) -> "Database":
+        """
+        Возвращает объект Database с соединением только для чтения к той же БД.
+
+        Предназначен для отчетов и дашборда: в режиме WAL чтение через отдельное
+        соединение не блокирует запись из CRUD-форм и не ждет ее. Объект создается
+        один раз и закрывается вместе с основным; статистика запросов общая.
+        Если открыть БД только для чтения не удалось, возвращается сам объект.
+
+        Returns:
+            Database: Объект для выполнения запросов только на чтение.
+        """
+        if self.readonly:
+            return self
+        if self._reader is None:
+            reader = Database(self.db_path, pooled=self.pooled,
+                              profile=self.profile, readonly=True)
+            if reader.conn is None:
+                log.warning(
+                    "Соединение только для чтения недоступно, используется основное.")
+                return self
+            reader.query_stats = self.query_stats
+            self._reader = reader
+        return self._reader
+
     def close(self) -> None:
         """
         Закрывает курсор и соединение с базой данных, если они были установлены.
+
+        В режиме пула также закрываются соединения всех рабочих потоков,
+        а также соединение только для чтения (см. `read_only`).
         """
         log.debug("Попытка закрытия соединения с базой данных")
+        self._closed = True
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
         if self.cursor:
             try:
                 self.cursor.close()
                 log.debug("Курсор базы данных закрыт.")
             except sqlite3.Error as e:
                 log.error(
-                    f"Ошибка при закрытии курсора БД: {e}", exc_info=True)
+                    "Ошибка при закрытии курсора БД: %s", e, exc_info=True)
+        with self._pool_lock:
+            pooled_connections = [
+                c for c in self._connections if c is not self.conn]
+            self._connections.clear()
+        for conn in pooled_connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                log.error(
+                    "Ошибка при закрытии соединения пула: %s", e, exc_info=True)
+        if pooled_connections:
+            log.debug(
+                "Закрыто соединений пула: %s", len(pooled_connections))
         if self.conn:
             try:
                 self.conn.close()
                 log.info("Соединение с базой данных успешно закрыто.")
             except sqlite3.Error as e:
                 log.error(
-                    f"Ошибка при закрытии соединения с БД: {e}", exc_info=True)
+                    "Ошибка при закрытии соединения с БД: %s", e, exc_info=True)
         else:
             log.debug("Соединение с БД не было открыто или уже закрыто.")
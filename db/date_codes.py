@@ -0,0 +1,81 @@
+# db/date_codes.py
+"""
+Целочисленные представления дат и времени (миграция 0009).
+
+В БД даты хранятся текстом ГГГГ-ММ-ДД, время - ЧЧ:ММ; вычисляемые столбцы
+`*Day` и `*Minute` дают те же значения целыми числами:
+
+- день - юлианский день, `CAST(julianday(дата) + 0.5 AS INTEGER)`;
+- время - минуты от полуночи.
+
+Функции модуля переводят значения в обе стороны без разбора строк
+через `datetime.strptime`.
+"""
+import datetime
+
+# date.toordinal() + JULIAN_DAY_OFFSET = юлианский день
+JULIAN_DAY_OFFSET = 1721425
+
+
+def date_to_day(value: datetime.date | str | None) -> int | None:
+    """
+    Переводит дату в юлианский день.
+
+    Args:
+        value (datetime.date | str | None): Дата или строка ГГГГ-ММ-ДД.
+
+    Returns:
+        int | None: Юлианский день или None для пустого или некорректного значения.
+    """
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.date.fromisoformat(value)
+        except ValueError:
+            return None
+    return value.toordinal() + JULIAN_DAY_OFFSET
+
+
+def day_to_date(day: int) -> datetime.date:
+    """
+    Переводит юлианский день в дату.
+
+    Args:
+        day (int): Юлианский день.
+
+    Returns:
+        datetime.date: Дата.
+    """
+    return datetime.date.fromordinal(day - JULIAN_DAY_OFFSET)
+
+
+def time_to_minutes(value: str | None) -> int | None:
+    """
+    Переводит время ЧЧ:ММ в минуты от полуночи.
+
+    Args:
+        value (str | None): Время ЧЧ:ММ.
+
+    Returns:
+        int | None: Минуты от полуночи или None для пустого или некорректного значения.
+    """
+    if not value:
+        return None
+    hours, sep, minutes = value.partition(":")
+    if not sep or not hours.isdigit() or not minutes.isdigit():
+        return None
+    return int(hours) * 60 + int(minutes)
+
+
+def minutes_to_time(minutes: int) -> str:
+    """
+    Переводит минуты от полуночи во время ЧЧ:ММ.
+
+    Args:
+        minutes (int): Минуты от полуночи.
+
+    Returns:
+        str: Время ЧЧ:ММ.
+    """
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
@@ -5,7 +5,6 @@
 """
 import logging
 from db.database import Database
-import db.queries as q
 
 log = logging.getLogger(__name__)
 
@@ -30,9 +29,9 @@ class DepartmentRepository:
             list[tuple] | None: Список кортежей (ID, Name) или None в случае ошибки.
         """
         log.debug("Запрос всех записей из справочника Departments")
-        result = self.db.fetch_all(q.GET_DEPARTMENTS)
+        result = self.db.references.get_all("Departments")
         log.debug(
-            f"Получено {len(result) if result else 0} записей об отделах.")
+            "Получено %s записей об отделах.", len(result) if result else 0)
         return result
 
     def get_by_name(self, department_name):
@@ -44,13 +43,15 @@ class DepartmentRepository:
 
         Returns:
             int | None: ID найденного отдела или None, если отдел не найден или произошла ошибка.
-                      Примечание: В отличие от других get_by_name, этот возвращает результат fetch_all,
-                      а не fetch_one. Потенциально может вернуть несколько ID, если имена не уникальны.
+                      Примечание: В отличие от других get_by_name, этот возвращает список
+                      кортежей [(ID,)] (пустой, если отдел не найден).
                       В коде импорта (import_dialog.py) используется первый элемент списка.
         """
-        log.debug(f"Запрос ID отдела по названию: '{department_name}'")
-        result = self.db.fetch_all(
-            q.GET_DEPARTMENT_ID_BY_NAME, (department_name,))
-        # Не извлекаем [0], так как get_by_name в import_dialog ожидает список
-        log.debug(f"Результат поиска ID отдела: {result}")
+        log.debug("Запрос ID отдела по названию: '%s'", department_name)
+        if self.db.references.get_all("Departments") is None:
+            return None
+        department_id = self.db.references.get_id("Departments", department_name)
+        # Возвращаем список, так как get_by_name в import_dialog ожидает список
+        result = [(department_id,)] if department_id is not None else []
+        log.debug("Результат поиска ID отдела: %s", result)
         return result
@@ -5,7 +5,9 @@
 а также методы для формирования данных для отчетов.
 """
 import logging
-from db.database import Database
+import sqlite3
+from db.database import Database, FTS_MIN_TERM_LENGTH, fts_phrase
+from db.date_codes import date_to_day
 import db.queries as q
 import datetime
 
@@ -15,14 +17,54 @@ log = logging.getLogger(__name__)
 class EmployeeEventRepository:
     """Репозиторий для управления данными кадровых событий сотрудников."""
 
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, read_db: Database | None = None):
         """
         Инициализирует репозиторий.
 
         Args:
             db (Database): Экземпляр подключения к базе данных.
+            read_db (Database | None, optional): Подключение только для чтения
+                (`Database.read_only()`) для отчетных запросов. По умолчанию - `db`.
         """
         self.db = db
+        self.read_db = read_db or db
+        self._fts_available = None  # Определяется при первом поиске
+
+    # --- Поиск ---
+
+    def has_fts(self):
+        """
+        Проверяет наличие полнотекстового индекса EmployeeEventsFTS (миграция 0004).
+
+        Returns:
+            bool: True, если индекс есть. Без FTS5 в сборке SQLite миграция
+                  пропускается, и поиск выполняется через LIKE.
+        """
+        if self._fts_available is None:
+            self._fts_available = self.db.fetch_one(
+                q.CHECK_TABLE_EXISTS, ("EmployeeEventsFTS",)) is not None
+            if not self._fts_available:
+                log.info("Индекс EmployeeEventsFTS не найден, поиск событий через LIKE")
+        return self._fts_available
+
+    def _add_search(self, query, params, search_term):
+        """
+        Добавляет к запросу условие поиска: по индексу FTS или через LIKE
+        (если индекса нет или строка короче трех символов).
+
+        Args:
+            query (str): Запрос, заканчивающийся условием WHERE.
+            params (dict): Параметры запроса (дополняются).
+            search_term (str): Строка поиска.
+
+        Returns:
+            str: Запрос с условием поиска.
+        """
+        if len(search_term) >= FTS_MIN_TERM_LENGTH and self.has_fts():
+            params["fts_query"] = fts_phrase(search_term)
+            return query + q.GET_EMPLOYEE_EVENTS_FTS_SEARCH
+        params["search_term"] = f"%{search_term}%"
+        return query + q.GET_EMPLOYEE_EVENTS_SEARCH
 
     # --- Основные операции ---
 
@@ -30,6 +72,10 @@ class EmployeeEventRepository:
         """
         Добавляет новую запись о кадровом событии.
 
+        Прием и увольнение в той же транзакции пересчитывают периоды работы
+        сотрудника (`EmploymentSpans`) по всей его истории, поэтому событие
+        можно добавить и задним числом.
+
         Args:
             personnel_number (str): Табельный номер сотрудника.
             event_id (int): ID типа события.
@@ -42,13 +88,67 @@ class EmployeeEventRepository:
             bool: True в случае успеха, False при ошибке.
         """
         log.debug(
-            f"Добавление кадрового события: PN={personnel_number}, EventID={event_id}, Date={event_date}")
+            "Добавление кадрового события: PN=%s, EventID=%s, Date=%s", personnel_number, event_id, event_date)
         params = (personnel_number, event_id, event_date,
                   department_id, position_id, reason)
-        result = self.db.execute_query(q.INSERT_EMPLOYEE_EVENT, params)
-        log.debug(f"Результат добавления кадрового события: {result}")
+        try:
+            with self.db.transaction():
+                result = self.db.execute_query(q.INSERT_EMPLOYEE_EVENT, params)
+                if result and event_date and self.db.references.get_name("Events", event_id) in (
+                        q.EVENT_HIRE, q.EVENT_DISMISSAL):
+                    log.debug("Пересчет периодов работы: PN=%s", personnel_number)
+                    result = self._rebuild_spans(personnel_number)
+        except sqlite3.Error as e:
+            log.error("Ошибка добавления кадрового события: %s", e)
+            result = False
+        log.debug("Результат добавления кадрового события: %s", result)
+        return result
+
+    def rebuild_employment_spans(self):
+        """
+        Полностью пересчитывает `EmploymentSpans` по истории кадровых событий.
+
+        `insert_event` пересчитывает периоды сотрудника сам; полный пересчет
+        нужен после правки `EmployeeEvents` в обход репозитория.
+
+        Returns:
+            bool: True в случае успеха, False при ошибке.
+        """
+        log.info("Пересчет периодов работы")
+        try:
+            with self.db.transaction():
+                result = self._rebuild_spans()
+        except sqlite3.Error as e:
+            log.error("Ошибка пересчета периодов работы: %s", e)
+            result = False
+        if result:
+            log.info("Периоды работы пересчитаны")
         return result
 
+    def _rebuild_spans(self, personnel_number=None):
+        """
+        Пересчитывает периоды работы одного сотрудника или всех сотрудников.
+
+        Выполняется внутри транзакции вызывающего метода; ошибка запроса
+        отменяет всю транзакцию.
+
+        Args:
+            personnel_number (str | None, optional): Табельный номер; None - все сотрудники.
+
+        Returns:
+            bool: True в случае успеха, False при ошибке.
+        """
+        params = {"hire_event_id": self.db.references.get_id("Events", q.EVENT_HIRE),
+                  "dismissal_event_id": self.db.references.get_id("Events", q.EVENT_DISMISSAL)}
+        if personnel_number is None:
+            return (self.db.execute_query(q.DELETE_ALL_EMPLOYMENT_SPANS)
+                    and self.db.execute_query(q.REBUILD_CLOSED_EMPLOYMENT_SPANS, params)
+                    and self.db.execute_query(q.REBUILD_OPEN_EMPLOYMENT_SPANS, params))
+        params["pn"] = personnel_number
+        return (self.db.execute_query(q.DELETE_EMPLOYEE_EMPLOYMENT_SPANS, {"pn": personnel_number})
+                and self.db.execute_query(q.REBUILD_CLOSED_EMPLOYMENT_SPANS_FOR_EMPLOYEE, params)
+                and self.db.execute_query(q.REBUILD_OPEN_EMPLOYMENT_SPANS_FOR_EMPLOYEE, params))
+
     def get_events(self, search_term=None):
         """
         Получает список всех кадровых событий с возможностью поиска.
@@ -61,84 +161,203 @@ class EmployeeEventRepository:
                 - Список кортежей с данными событий.
                 - Общее количество найденных событий (с учетом поиска).
         """
-        log.debug(f"Запрос списка кадровых событий: search='{search_term}'")
+        log.debug("Запрос списка кадровых событий: search='%s'", search_term)
         query = q.GET_EMPLOYEE_EVENTS
         params = {}
 
         if search_term:
-            query += q.GET_EMPLOYEE_EVENTS_SEARCH
-            params["search_term"] = f"%{search_term}%"
+            query = self._add_search(query, params, search_term)
 
         query += q.GET_EMPLOYEE_EVENTS_ORDER_BY
 
-        log.debug(f"Запрос данных событий: {query}, параметры: {params}")
+        log.debug("Запрос данных событий: %s, параметры: %s", query, params)
+        generation = self.db.write_generation
         data = self.db.fetch_all(query, params)
         if data is None:
             log.warning("Запрос данных кадровых событий вернул None")
             data = []
 
-        # Подсчет количества с теми же фильтрами
+        # Весь список уже получен - его длина и есть количество
+        total_rows = len(data)
+        self.db.set_cached_count(("events", search_term or ""), total_rows, generation)
+
+        log.debug(
+            "Найдено кадровых событий: %s, получено данных: %s", total_rows, len(data))
+        return data, total_rows
+
+    def count_events(self, search_term=None):
+        """
+        Возвращает количество кадровых событий с учетом поиска.
+
+        Значение кэшируется до следующей записи в БД.
+
+        Args:
+            search_term (str, optional): Строка для поиска по различным полям события.
+
+        Returns:
+            int: Количество найденных событий.
+        """
+        cache_key = ("events", search_term or "")
+        cached = self.db.get_cached_count(cache_key)
+        if cached is not None:
+            return cached
+
         count_query = q.GET_EMPLOYEE_EVENTS_COUNT
         count_params = {}
         if search_term:
-            count_query += q.GET_EMPLOYEE_EVENTS_COUNT_SEARCH
-            count_params["search_term"] = f"%{search_term}%"
+            count_query = self._add_search(count_query, count_params, search_term)
 
         log.debug(
-            f"Запрос количества событий: {count_query}, параметры: {count_params}")
+            "Запрос количества событий: %s, параметры: %s", count_query, count_params)
+        generation = self.db.write_generation
         count_result = self.db.fetch_one(count_query, count_params)
         total_rows = count_result[0] if count_result else 0
+        self.db.set_cached_count(cache_key, total_rows, generation)
+        return total_rows
+
+    def get_events_page(self, search_term=None, after=None, page_size=10, offset=0):
+        """
+        Получает одну страницу кадровых событий (keyset-пагинация по дате и ID,
+        от новых к старым).
+
+        События без даты идут в конце списка. Первая страница
+        запрашивается вместе с общим количеством строк, которое кэшируется
+        для `count_events`.
+
+        Args:
+            search_term (str, optional): Строка для поиска по различным полям события.
+            after (tuple, optional): Курсор (EventDate или '', ID) последней строки
+                                     предыдущей страницы. None - первая страница.
+            page_size (int, optional): Количество строк на странице.
+            offset (int, optional): Сколько строк пропустить (после курсора, если он
+                задан); для чтения с произвольной позиции.
 
+        Returns:
+            tuple[list[tuple], tuple | None]: Кортеж (строки страницы в формате
+                `get_events`, курсор следующей страницы или None).
+        """
+        query = q.GET_EMPLOYEE_EVENTS_PAGE
+        params = {"page_size": page_size}
+        if search_term:
+            query = self._add_search(query, params, search_term)
+        if after:
+            query += q.GET_EMPLOYEE_EVENTS_KEYSET
+            params["after_date"], params["after_id"] = after
+        query += q.GET_EMPLOYEE_EVENTS_ORDER_BY + q.PAGE_LIMIT
+        if offset:
+            query += q.PAGE_OFFSET
+            params["offset"] = offset
+
+        log.debug("Запрос страницы событий: %s, параметры: %s", query, params)
+        if after or offset:
+            data = self.db.fetch_all(query, params)
+        else:
+            generation = self.db.write_generation
+            data, total_rows = self.db.fetch_all_with_count(query, params)
+            if data is not None:
+                self.db.set_cached_count(("events", search_term or ""), total_rows, generation)
+        if data is None:
+            log.warning("Запрос страницы кадровых событий вернул None")
+            return [], None
+        # Последний столбец (EE.ID) нужен только для курсора
+        # Пустая дата в курсоре - '', как в ключе сортировки
+        next_cursor = (data[-1][0] or "", data[-1][-1]) if len(data) == page_size else None
+        return [row[:-1] for row in data], next_cursor
+
+    def iter_events(self, search_term=None):
+        """
+        Потоково отдает кадровые события (с поиском) без загрузки всей таблицы в память.
+
+        Args:
+            search_term (str, optional): Строка для поиска по различным полям события.
+
+        Yields:
+            tuple: Строка с данными события (как в `get_events`).
+        """
         log.debug(
-            f"Найдено кадровых событий: {total_rows}, получено данных: {len(data)}")
-        return data, total_rows
+            "Потоковый запрос кадровых событий: search='%s'", search_term)
+        query = q.GET_EMPLOYEE_EVENTS
+        params = {}
+        if search_term:
+            query = self._add_search(query, params, search_term)
+        query += q.GET_EMPLOYEE_EVENTS_ORDER_BY
+        yield from self.db.fetch_iter(query, params)
 
     # --- Методы для отчетов --- # TODO: Перенести логику отчетов в отдельный модуль/сервис
 
+    def _dismissal_period_params(self, start_date, end_date):
+        """
+        Параметры отчетов по увольнениям: ID события и диапазон юлианских дней.
+
+        Args:
+            start_date (datetime.date | str): Начальная дата периода.
+            end_date (datetime.date | str): Конечная дата периода.
+
+        Returns:
+            dict: Параметры :dismissal_event_id, :start_day, :end_day.
+        """
+        return {"dismissal_event_id": self.read_db.references.get_id("Events", q.EVENT_DISMISSAL),
+                "start_day": date_to_day(start_date), "end_day": date_to_day(end_date)}
+
     def get_dismissal_counts_by_month(self, start_date, end_date):
-        """Получает количество увольнений по месяцам за период."""
-        log.debug(f"Запрос увольнений по месяцам: {start_date} - {end_date}")
-        result = self.db.fetch_all(
-            q.GET_DISMISSAL_COUNT_BY_MONTH, (start_date, end_date))
+        """
+        Получает количество увольнений по месяцам за период.
+
+        Returns:
+            list[tuple[int, int]]: Список (месяц ГГГГММ, количество).
+        """
+        log.debug("Запрос увольнений по месяцам: %s - %s", start_date, end_date)
+        result = self.read_db.fetch_all(
+            q.GET_DISMISSAL_COUNT_BY_MONTH, self._dismissal_period_params(start_date, end_date))
         if result is None:
             log.warning("Запрос увольнений по месяцам не вернул данных.")
             return []
-        log.debug(f"Получено {len(result)} записей увольнений по месяцам.")
+        log.debug("Получено %s записей увольнений по месяцам.", len(result))
         return result
 
     def get_dismissal_counts_by_day(self, start_date, end_date):
-        """Получает количество увольнений по дням за период."""
-        log.debug(f"Запрос увольнений по дням: {start_date} - {end_date}")
-        result = self.db.fetch_all(
-            q.GET_DISMISSAL_COUNT_BY_DAY, (start_date, end_date))
+        """
+        Получает количество увольнений по дням за период.
+
+        Returns:
+            list[tuple[int, int]]: Список (юлианский день, количество); дата - `db.date_codes.day_to_date`.
+        """
+        log.debug("Запрос увольнений по дням: %s - %s", start_date, end_date)
+        result = self.read_db.fetch_all(
+            q.GET_DISMISSAL_COUNT_BY_DAY, self._dismissal_period_params(start_date, end_date))
         if result is None:
             log.warning("Запрос увольнений по дням не вернул данных.")
             return []
-        log.debug(f"Получено {len(result)} записей увольнений по дням.")
+        log.debug("Получено %s записей увольнений по дням.", len(result))
         return result
 
     def get_dismissal_counts_by_year(self, start_date, end_date):
-        """Получает количество увольнений по годам за период."""
-        log.debug(f"Запрос увольнений по годам: {start_date} - {end_date}")
-        result = self.db.fetch_all(
-            q.GET_DISMISSAL_COUNT_BY_YEAR, (start_date, end_date))
+        """
+        Получает количество увольнений по годам за период.
+
+        Returns:
+            list[tuple[int, int]]: Список (год, количество).
+        """
+        log.debug("Запрос увольнений по годам: %s - %s", start_date, end_date)
+        result = self.read_db.fetch_all(
+            q.GET_DISMISSAL_COUNT_BY_YEAR, self._dismissal_period_params(start_date, end_date))
         if result is None:
             log.warning("Запрос увольнений по годам не вернул данных.")
             return []
-        log.debug(f"Получено {len(result)} записей увольнений по годам.")
+        log.debug("Получено %s записей увольнений по годам.", len(result))
         return result
 
     def get_dismissed_employees_details(self, start_date, end_date):
-        """Получает детализированную информацию об уволенных сотрудниках за период."""
+        """Получает детализированную информацию об уволенных сотрудниках за период (по `EmploymentSpans`)."""
         log.debug(
-            f"Запрос деталей уволенных сотрудников: {start_date} - {end_date}")
-        result = self.db.fetch_all(
+            "Запрос деталей уволенных сотрудников: %s - %s", start_date, end_date)
+        result = self.read_db.fetch_all(
             q.GET_DISMISSED_EMPLOYEES_DETAILS, (start_date, end_date))
         if result is None:
             log.warning(
                 "Запрос деталей уволенных сотрудников не вернул данных.")
             return []
-        log.debug(f"Получено {len(result)} записей об уволенных сотрудниках.")
+        log.debug("Получено %s записей об уволенных сотрудниках.", len(result))
         # Обработка None значений в кортежах
         processed = [tuple("" if item is None else item for item in row)
                      for row in result]
@@ -158,7 +377,7 @@ class EmployeeEventRepository:
             int: Количество событий.
         """
         log.debug(
-            f"Запрос количества событий '{event_name}' за последние {days} дней")
+            "Запрос количества событий '%s' за последние %s дней", event_name, days)
         end_date = datetime.date.today()
         start_date = end_date - \
             datetime.timedelta(days=days-1)  # Включая сегодня
@@ -166,8 +385,35 @@ class EmployeeEventRepository:
         end_date_str = end_date.strftime('%Y-%m-%d')
 
         query = q.GET_EVENT_COUNT_LAST_DAYS
-        result = self.db.fetch_one(
+        result = self.read_db.fetch_one(
             query, (event_name, start_date_str, end_date_str))
         count = result[0] if result else 0
-        log.debug(f"Найдено событий '{event_name}' за {days} дней: {count}")
+        log.debug("Найдено событий '%s' за %s дней: %s", event_name, days, count)
+        return count
+
+    def get_event_count_last_days_summary(self, event_name, days=30):
+        """
+        Возвращает количество указанных событий за последние N дней
+        по сводной таблице событий по дням (миграция 0005).
+
+        Читает не более N строк сводки вместо событий за период.
+
+        Args:
+            event_name (str): Название события (например, 'Прием', 'Увольнение').
+            days (int, optional): Количество последних дней для подсчета. По умолчанию 30.
+
+        Returns:
+            int: Количество событий.
+        """
+        event_id = self.read_db.references.get_id("Events", event_name)
+        if event_id is None:
+            log.warning("Событие '%s' не найдено в справочнике.", event_name)
+            return 0
+        end_date = datetime.date.today()
+        start_date = end_date - datetime.timedelta(days=days-1)  # Включая сегодня
+        result = self.read_db.fetch_one(
+            q.GET_EVENT_COUNT_FROM_SUMMARY,
+            (event_id, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+        count = result[0] if result else 0
+        log.debug("Событий '%s' за %s дней (сводка): %s", event_name, days, count)
         return count
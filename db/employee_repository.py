@@ -4,8 +4,9 @@
 Содержит методы для CRUD операций с сотрудниками, а также
 методы для получения агрегированных данных (статистика, списки для отчетов и т.д.).
 """
-from db.database import Database
+from db.database import Database, FTS_MIN_TERM_LENGTH, fts_phrase
 import db.queries as q
+import datetime
 import logging
 
 log = logging.getLogger(__name__)
@@ -14,14 +15,57 @@ log = logging.getLogger(__name__)
 class EmployeeRepository:
     """Репозиторий для управления данными сотрудников."""
 
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, read_db: Database | None = None):
         """
         Инициализирует репозиторий.
 
         Args:
             db (Database): Экземпляр подключения к базе данных.
+            read_db (Database | None, optional): Подключение только для чтения
+                (`Database.read_only()`) для отчетных запросов. По умолчанию - `db`.
         """
         self.db = db
+        self.read_db = read_db or db
+        self._fts_available = None  # Определяется при первом поиске
+
+    # --- Поиск ---
+
+    def has_fts(self):
+        """
+        Проверяет наличие полнотекстового индекса EmployeesFTS (миграция 0003).
+
+        Returns:
+            bool: True, если индекс есть. Без FTS5 в сборке SQLite миграция
+                  пропускается, и поиск выполняется через LIKE.
+        """
+        if self._fts_available is None:
+            self._fts_available = self.db.fetch_one(
+                q.CHECK_TABLE_EXISTS, ("EmployeesFTS",)) is not None
+            if not self._fts_available:
+                log.info("Индекс EmployeesFTS не найден, поиск сотрудников через LIKE")
+        return self._fts_available
+
+    def _use_fts(self, search_term):
+        """Возвращает True, если строку поиска можно искать по индексу FTS."""
+        return len(search_term) >= FTS_MIN_TERM_LENGTH and self.has_fts()
+
+    def _add_search(self, query, params, search_term):
+        """
+        Добавляет к запросу условие поиска: по индексу FTS или через LIKE.
+
+        Args:
+            query (str): Запрос, заканчивающийся условием WHERE.
+            params (dict): Параметры запроса (дополняются).
+            search_term (str): Строка поиска.
+
+        Returns:
+            str: Запрос с условием поиска.
+        """
+        if self._use_fts(search_term):
+            params["fts_query"] = fts_phrase(search_term)
+            return query + q.GET_EMPLOYEES_FTS_SEARCH
+        params["search_term"] = f"%{search_term}%"
+        return query + q.GET_EMPLOYEES_SEARCH
 
     # --- CRUD Операции ---
 
@@ -29,6 +73,9 @@ class EmployeeRepository:
         """
         Получает список сотрудников с поиском и фильтрацией по табельному номеру.
 
+        При поиске по индексу FTS результаты упорядочены по релевантности,
+        иначе - по табельному номеру.
+
         Args:
             search_term (str, optional): Строка для поиска по различным полям.
             employee_pn_filter (str, optional): Табельный номер для точной фильтрации.
@@ -39,44 +86,143 @@ class EmployeeRepository:
                 - Общее количество найденных строк (с учетом фильтров).
         """
         log.debug(
-            f"Запрос сотрудников: search='{search_term}', filter_pn='{employee_pn_filter}'")
-        query = q.GET_EMPLOYEES
+            "Запрос сотрудников: search='%s', filter_pn='%s'", search_term, employee_pn_filter)
         params = {}
+        ranked = bool(search_term) and self._use_fts(search_term)
+        query = q.GET_EMPLOYEES_FTS_RANKED if ranked else q.GET_EMPLOYEES
 
         if employee_pn_filter:
             query += " AND E.PersonnelNumber = :pn_filter "
             params["pn_filter"] = employee_pn_filter
 
-        if search_term:
-            query += q.GET_EMPLOYEES_SEARCH
-            params["search_term"] = f"%{search_term}%"
-
-        query += q.GET_EMPLOYEES_ORDER_BY
+        if ranked:
+            params["fts_query"] = fts_phrase(search_term)
+            query += q.GET_EMPLOYEES_FTS_RANKED_ORDER_BY
+        else:
+            if search_term:
+                query = self._add_search(query, params, search_term)
+            query += q.GET_EMPLOYEES_ORDER_BY
 
-        log.debug(f"Запрос данных: {query}, параметры: {params}")
+        log.debug("Запрос данных: %s, параметры: %s", query, params)
+        generation = self.db.write_generation
         data = self.db.fetch_all(query, params)
         if data is None:
             log.warning("Запрос данных сотрудников вернул None")
             return None, 0
 
-        # Подсчет количества с теми же фильтрами
+        # Весь список уже получен - его длина и есть количество
+        total_rows = len(data)
+        self.db.set_cached_count(
+            ("employees", search_term or "", employee_pn_filter or ""), total_rows, generation)
+
+        log.debug(
+            "Найдено сотрудников: %s, получено данных: %s", total_rows, len(data))
+        return data, total_rows
+
+    def count_employees(self, search_term=None, employee_pn_filter=None):
+        """
+        Возвращает количество сотрудников с учетом поиска и фильтра.
+
+        Значение кэшируется до следующей записи в БД, поэтому при листании
+        страниц с тем же фильтром COUNT-запрос не повторяется.
+
+        Args:
+            search_term (str, optional): Строка для поиска по различным полям.
+            employee_pn_filter (str, optional): Табельный номер для фильтрации.
+
+        Returns:
+            int: Количество найденных сотрудников.
+        """
+        cache_key = ("employees", search_term or "", employee_pn_filter or "")
+        cached = self.db.get_cached_count(cache_key)
+        if cached is not None:
+            return cached
+
         count_query = q.GET_EMPLOYEES_COUNT
         count_params = {}
         if employee_pn_filter:
             count_query += " AND E.PersonnelNumber = :pn_filter "
             count_params["pn_filter"] = employee_pn_filter
         if search_term:
-            count_query += q.GET_EMPLOYEES_COUNT_SEARCH
-            count_params["search_term"] = f"%{search_term}%"
+            count_query = self._add_search(count_query, count_params, search_term)
 
         log.debug(
-            f"Запрос количества: {count_query}, параметры: {count_params}")
+            "Запрос количества: %s, параметры: %s", count_query, count_params)
+        generation = self.db.write_generation
         count_result = self.db.fetch_one(count_query, count_params)
         total_rows = count_result[0] if count_result else 0
+        self.db.set_cached_count(cache_key, total_rows, generation)
+        return total_rows
 
-        log.debug(
-            f"Найдено сотрудников: {total_rows}, получено данных: {len(data)}")
-        return data, total_rows
+    def get_employees_page(self, search_term=None, after=None, page_size=10, employee_pn_filter=None, offset=0):
+        """
+        Получает одну страницу сотрудников (keyset-пагинация по табельному номеру).
+
+        Первая страница запрашивается вместе с общим количеством строк
+        (`COUNT(*) OVER ()`), которое кэшируется для `count_employees`.
+
+        Args:
+            search_term (str, optional): Строка для поиска по различным полям.
+            after (tuple, optional): Курсор - ключ последней строки предыдущей
+                                     страницы. None - первая страница.
+            page_size (int, optional): Количество строк на странице.
+            employee_pn_filter (str, optional): Табельный номер для фильтрации.
+            offset (int, optional): Сколько строк пропустить (после курсора, если он
+                задан); для чтения с произвольной позиции.
+
+        Returns:
+            tuple[list[tuple], tuple | None]: Кортеж (строки страницы,
+                курсор следующей страницы или None, если страница последняя).
+        """
+        query = q.GET_EMPLOYEES
+        params = {"page_size": page_size}
+        if employee_pn_filter:
+            query += " AND E.PersonnelNumber = :pn_filter "
+            params["pn_filter"] = employee_pn_filter
+        if search_term:
+            query = self._add_search(query, params, search_term)
+        if after:
+            query += q.GET_EMPLOYEES_KEYSET
+            params["after_pn"] = after[0]
+        query += q.GET_EMPLOYEES_ORDER_BY + q.PAGE_LIMIT
+        if offset:
+            query += q.PAGE_OFFSET
+            params["offset"] = offset
+
+        log.debug("Запрос страницы сотрудников: %s, параметры: %s", query, params)
+        if after or offset:
+            data = self.db.fetch_all(query, params)
+        else:
+            generation = self.db.write_generation
+            data, total_rows = self.db.fetch_all_with_count(query, params)
+            if data is not None:
+                self.db.set_cached_count(
+                    ("employees", search_term or "", employee_pn_filter or ""), total_rows, generation)
+        if data is None:
+            log.warning("Запрос страницы сотрудников вернул None")
+            return [], None
+        next_cursor = (data[-1][0],) if len(data) == page_size else None
+        return data, next_cursor
+
+    def iter_employees(self, search_term=None):
+        """
+        Потоково отдает сотрудников (с поиском) без загрузки всей таблицы в память.
+
+        Используется для экспорта больших таблиц.
+
+        Args:
+            search_term (str, optional): Строка для поиска по различным полям.
+
+        Yields:
+            tuple: Строка с данными сотрудника (как в `get_employees`).
+        """
+        log.debug("Потоковый запрос сотрудников: search='%s'", search_term)
+        query = q.GET_EMPLOYEES
+        params = {}
+        if search_term:
+            query = self._add_search(query, params, search_term)
+        query += q.GET_EMPLOYEES_ORDER_BY
+        yield from self.db.fetch_iter(query, params)
 
     def get_employee_by_personnel_number(self, personnel_number):
         """
@@ -88,11 +234,11 @@ class EmployeeRepository:
         Returns:
             tuple | None: Кортеж с данными сотрудника или None, если не найден или произошла ошибка.
         """
-        log.debug(f"Запрос сотрудника по таб. номеру: {personnel_number}")
+        log.debug("Запрос сотрудника по таб. номеру: %s", personnel_number)
         result = self.db.fetch_one(
             q.GET_EMPLOYEE_BY_PERSONNEL_NUMBER, (personnel_number,))
         log.debug(
-            f"Результат поиска сотрудника {personnel_number}: {'Найден' if result else 'Не найден'}")
+            "Результат поиска сотрудника %s: %s", personnel_number, 'Найден' if result else 'Не найден')
         return result
 
     def insert_employee(self, personnel_number, lastname, firstname, middlename, birth_date_str,
@@ -115,14 +261,33 @@ class EmployeeRepository:
             bool: True в случае успеха, False при ошибке.
         """
         log.debug(
-            f"Добавление нового сотрудника: таб.№={personnel_number}, ФИО={lastname} {firstname} {middlename}")
+            "Добавление нового сотрудника: таб.№=%s, ФИО=%s %s %s", personnel_number, lastname, firstname, middlename)
         params = (personnel_number, lastname, firstname, middlename, birth_date_str,
                   gender_id, position_id, department_id, state_id)
         result = self.db.execute_query(q.INSERT_EMPLOYEE, params)
         log.debug(
-            f"Результат добавления сотрудника {personnel_number}: {result}")
+            "Результат добавления сотрудника %s: %s", personnel_number, result)
         return result
 
+    def insert_employees_bulk(self, rows):
+        """
+        Добавляет набор сотрудников пачками (одна транзакция на пачку).
+
+        Args:
+            rows (Iterable[tuple]): Кортежи в порядке полей `insert_employee`:
+                (personnel_number, lastname, firstname, middlename, birth_date_str,
+                 gender_id, position_id, department_id, state_id).
+
+        Returns:
+            tuple[int, list[tuple[int, tuple, str]]]: Количество добавленных сотрудников
+                и список ошибок (индекс строки, параметры, текст ошибки).
+        """
+        log.debug("Пакетное добавление сотрудников")
+        added, failed = self.db.execute_many(q.INSERT_EMPLOYEE, rows)
+        log.info(
+            "Пакетное добавление сотрудников: добавлено %s, с ошибками %s", added, len(failed))
+        return added, failed
+
     def update_employee(self, personnel_number, lastname, firstname, middlename, birth_date_str,
                         gender_id, position_id, department_id, state_id):
         """
@@ -142,12 +307,12 @@ class EmployeeRepository:
         Returns:
             bool: True в случае успеха, False при ошибке.
         """
-        log.debug(f"Обновление данных сотрудника: таб.№={personnel_number}")
+        log.debug("Обновление данных сотрудника: таб.№=%s", personnel_number)
         params = (lastname, firstname, middlename, birth_date_str,
                   gender_id, position_id, department_id, state_id, personnel_number)
         result = self.db.execute_query(q.UPDATE_EMPLOYEE, params)
         log.debug(
-            f"Результат обновления сотрудника {personnel_number}: {result}")
+            "Результат обновления сотрудника %s: %s", personnel_number, result)
         return result
 
     def delete_employee(self, personnel_number):
@@ -160,10 +325,10 @@ class EmployeeRepository:
         Returns:
             bool: True в случае успеха, False при ошибке.
         """
-        log.debug(f"Удаление сотрудника: таб.№={personnel_number}")
+        log.debug("Удаление сотрудника: таб.№=%s", personnel_number)
         result = self.db.execute_query(q.DELETE_EMPLOYEE, (personnel_number,))
         log.debug(
-            f"Результат удаления сотрудника {personnel_number}: {result}")
+            "Результат удаления сотрудника %s: %s", personnel_number, result)
         return result
 
     # --- Проверки и вспомогательные методы ---
@@ -178,66 +343,133 @@ class EmployeeRepository:
         Returns:
             bool: True, если сотрудник существует, иначе False.
         """
-        log.debug(f"Проверка существования таб. номера: {personnel_number}")
+        log.debug("Проверка существования таб. номера: %s", personnel_number)
         result = self.db.fetch_one(
             q.CHECK_PERSONNEL_NUMBER_EXISTS, (personnel_number,))
         exists = result is not None
         log.debug(
-            f"Результат проверки таб. номера {personnel_number}: {exists}")
+            "Результат проверки таб. номера %s: %s", personnel_number, exists)
         return exists
 
     # --- Методы для статистики и отчетов ---
 
+    def _active_state_params(self):
+        """Параметры запросов по работающим сотрудникам (ID состояния из кэша справочников)."""
+        return {"active_state_id": self.read_db.references.get_id("States", q.STATE_ACTIVE)}
+
     def get_active_employee_count(self):
         """Возвращает количество работающих сотрудников."""
         log.debug("Запрос количества работающих сотрудников")
         query = q.GET_ACTIVE_EMPLOYEE_COUNT
-        result = self.db.fetch_one(query)
+        result = self.read_db.fetch_one(query, self._active_state_params())
         count = result[0] if result else 0
-        log.debug(f"Найдено работающих сотрудников: {count}")
+        log.debug("Найдено работающих сотрудников: %s", count)
         return count
 
     def get_employees_count_by_department(self):
         """Возвращает распределение работающих сотрудников по отделам."""
         log.debug("Запрос распределения сотрудников по отделам")
         query = q.GET_EMPLOYEES_COUNT_BY_DEPARTMENT
-        result = self.db.fetch_all(query)
+        result = self.read_db.fetch_all(query, self._active_state_params())
         if result is None:
             log.warning("Не удалось получить распределение по отделам.")
             return []
-        log.debug(f"Получено распределение по {len(result)} отделам.")
+        log.debug("Получено распределение по %s отделам.", len(result))
         return result
 
     def get_employees_count_by_position(self, limit=7):
         """Возвращает топ N должностей по количеству работающих сотрудников."""
-        log.debug(f"Запрос топ-{limit} должностей по количеству сотрудников")
+        log.debug("Запрос топ-%s должностей по количеству сотрудников", limit)
         query = q.GET_EMPLOYEES_COUNT_BY_POSITION_TOP_N
-        result = self.db.fetch_all(query, (limit,))
+        result = self.read_db.fetch_all(
+            query, {**self._active_state_params(), "limit": limit})
         if result is None:
             log.warning("Не удалось получить распределение по должностям.")
             return []
-        log.debug(f"Получено топ-{len(result)} должностей.")
+        log.debug("Получено топ-%s должностей.", len(result))
         return result
 
     def get_active_employee_birth_dates(self):
         """Возвращает список дат рождения работающих сотрудников."""
         log.debug("Запрос дат рождения работающих сотрудников")
         query = q.GET_ACTIVE_EMPLOYEE_BIRTH_DATES
-        result = self.db.fetch_all(query)
+        result = self.read_db.fetch_all(query, self._active_state_params())
         if result is None:
             log.warning("Не удалось получить даты рождения.")
             return []
         birth_dates = [row[0] for row in result]
-        log.debug(f"Получено {len(birth_dates)} дат рождения.")
+        log.debug("Получено %s дат рождения.", len(birth_dates))
         return birth_dates
 
     def get_gender_distribution(self):
         """Возвращает гендерное распределение работающих сотрудников."""
         log.debug("Запрос гендерного распределения сотрудников")
         query = q.GET_GENDER_DISTRIBUTION
-        result = self.db.fetch_all(query)
+        result = self.read_db.fetch_all(query, self._active_state_params())
         if result is None:
             log.warning("Не удалось получить гендерное распределение.")
             return []
-        log.debug(f"Получено гендерное распределение: {result}")
+        log.debug("Получено гендерное распределение: %s", result)
+        return result
+
+    # --- Методы для Dashboard (сводные таблицы, миграция 0005) ---
+    # Сводные таблицы поддерживаются триггерами, поэтому чтение не зависит
+    # от числа сотрудников. Методы выше считают те же значения по Employees.
+
+    def get_active_headcount(self):
+        """Возвращает количество работающих сотрудников по сводной таблице."""
+        result = self.read_db.fetch_one(
+            q.GET_HEADCOUNT_ACTIVE_TOTAL, self._active_state_params())
+        count = result[0] if result else 0
+        log.debug("Работающих сотрудников (сводка): %s", count)
+        return count
+
+    def get_headcount_by_department(self):
+        """Возвращает распределение работающих сотрудников по отделам (по сводной таблице)."""
+        result = self.read_db.fetch_all(
+            q.GET_HEADCOUNT_BY_DEPARTMENT, self._active_state_params())
+        if result is None:
+            log.warning("Не удалось получить сводку по отделам.")
+            return []
+        return result
+
+    def get_headcount_by_position(self, limit=7):
+        """Возвращает топ N должностей по количеству работающих сотрудников (по сводной таблице)."""
+        result = self.read_db.fetch_all(
+            q.GET_HEADCOUNT_BY_POSITION_TOP_N, {**self._active_state_params(), "limit": limit})
+        if result is None:
+            log.warning("Не удалось получить сводку по должностям.")
+            return []
+        return result
+
+    def get_headcount_by_gender(self):
+        """Возвращает гендерное распределение работающих сотрудников (по сводной таблице)."""
+        result = self.read_db.fetch_all(
+            q.GET_HEADCOUNT_BY_GENDER, self._active_state_params())
+        if result is None:
+            log.warning("Не удалось получить сводку по полу.")
+            return []
+        return result
+
+    def get_headcount_by_age(self, today=None):
+        """
+        Возвращает количество работающих сотрудников по полному числу лет.
+
+        Возраст считается в SQL по сводке дат рождения целочисленно
+        (разность дат в виде ГГГГММДД), без разбора дат в Python.
+
+        Args:
+            today (datetime.date | None, optional): Дата расчета; по умолчанию - сегодня.
+
+        Returns:
+            list[tuple[int, int]]: Список (возраст, количество) по возрастанию возраста.
+        """
+        today = today or datetime.date.today()
+        params = {**self._active_state_params(),
+                  "today_key": today.year * 10000 + today.month * 100 + today.day}
+        result = self.read_db.fetch_all(q.GET_HEADCOUNT_BY_AGE, params)
+        if result is None:
+            log.warning("Не удалось получить сводку по возрастам.")
+            return []
+        log.debug("Получено %s возрастов (сводка).", len(result))
         return result
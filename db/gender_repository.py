@@ -1,11 +1,11 @@
 """
 Модуль репозитория для взаимодействия с таблицей `Genders` (Пол).
 
-Содержит методы для получения данных о полах.
+Содержит методы для получения данных о полах. Справочник читается
+из кэша `Database.references`.
 """
 import logging
 from db.database import Database  # Database
-import db.queries as q
 
 
 log = logging.getLogger(__name__)
@@ -31,8 +31,8 @@ class GenderRepository:
             list[tuple] | None: Список кортежей (ID, GenderName) или None в случае ошибки.
         """
         log.debug("Запрос всех записей из справочника Genders")
-        result = self.db.fetch_all(q.GET_GENDERS)  # Используем self.db
-        log.debug(f"Получено {len(result) if result else 0} записей о полах.")
+        result = self.db.references.get_all("Genders")
+        log.debug("Получено %s записей о полах.", len(result) if result else 0)
         return result
 
     def get_by_id(self, gender_id):
@@ -40,7 +40,7 @@ class GenderRepository:
         Возвращает ID пола по его названию.
 
         Примечание: В текущей реализации этот метод фактически ищет по имени,
-        так как параметр gender_id используется в запросе GET_GENDER_ID, который ищет по GenderName.
+        так как параметр gender_id содержит название пола (GenderName).
         Метод `get_by_name` является псевдонимом для этого метода.
 
         Args:
@@ -49,18 +49,16 @@ class GenderRepository:
         Returns:
             int | None: ID найденного пола или None, если пол не найден или произошла ошибка.
         """
-        log.debug(f"Запрос ID пола по названию: '{gender_id}'")
-        result = self.db.fetch_one(
-            q.GET_GENDER_ID, (gender_id,))  # Используем self.db
-        found_id = result[0] if result else None
-        log.debug(f"Результат поиска ID пола: {found_id}")
+        log.debug("Запрос ID пола по названию: '%s'", gender_id)
+        found_id = self.db.references.get_id("Genders", gender_id)
+        log.debug("Результат поиска ID пола: %s", found_id)
         return found_id
 
     def get_by_name(self, name):
         """
         Возвращает ID пола по его названию.
 
-        Является псевдонимом для метода `get_by_id` из-за текущей реализации запроса.
+        Является псевдонимом для метода `get_by_id`.
 
         Args:
             name (str): Название пола для поиска.
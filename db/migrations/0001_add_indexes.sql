@@ -0,0 +1,35 @@
+-- Миграция 0001: вторичные индексы для основных путей доступа.
+-- Индексы подобраны так, чтобы покрывать запросы отчетов и проверок
+-- (GET_DISMISSAL_COUNT_BY_*, GET_RAW_ABSENCE_DATA_FOR_SUMMATION,
+-- CHECK_ABSENCE_EXISTS_BY_PN_DATE, GET_WORKING_HOURS_FOR_POSITION_AND_DAY).
+
+-- Кадровые события: фильтр по периоду с соединением по типу события
+CREATE INDEX IF NOT EXISTS idx_EmployeeEvents_EventDate
+    ON EmployeeEvents (EventDate, EventID);
+
+-- Кадровые события сотрудника в хронологическом порядке
+CREATE INDEX IF NOT EXISTS idx_EmployeeEvents_Employee
+    ON EmployeeEvents (EmployeePersonnelNumber, EventDate);
+
+-- Кадровые события по типу (прием, увольнение, перемещение) и дате
+CREATE INDEX IF NOT EXISTS idx_EmployeeEvents_EventID
+    ON EmployeeEvents (EventID, EventDate);
+
+-- Отсутствия за период
+CREATE INDEX IF NOT EXISTS idx_Absences_AbsenceDate
+    ON Absences (AbsenceDate, EmployeePersonnelNumber);
+
+-- Отсутствия сотрудника (в т.ч. проверка дубликата на дату)
+CREATE INDEX IF NOT EXISTS idx_Absences_Employee_Date
+    ON Absences (EmployeePersonnelNumber, AbsenceDate);
+
+-- Сотрудники по состоянию (работает, уволен и т.д.)
+CREATE INDEX IF NOT EXISTS idx_Employees_StateID
+    ON Employees (StateID);
+
+-- График работы должности на день недели
+CREATE INDEX IF NOT EXISTS idx_Schedules_Position_Day
+    ON Schedules (PositionID, DayOfWeekID, WorkingHoursID);
+
+-- Обновляем статистику планировщика для новых индексов
+ANALYZE;
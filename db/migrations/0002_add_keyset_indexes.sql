@@ -0,0 +1,11 @@
+-- Миграция 0002: индексы для постраничной навигации по курсору (keyset).
+-- Порядок ключей совпадает с ORDER BY списков событий и отсутствий,
+-- поэтому страница читается из индекса без сортировки всей таблицы.
+
+-- Список кадровых событий: ORDER BY EventDate DESC, ID DESC
+CREATE INDEX IF NOT EXISTS idx_EmployeeEvents_EventDate_ID
+    ON EmployeeEvents (EventDate, ID);
+
+-- Список отсутствий: ORDER BY AbsenceDate DESC, ID DESC
+CREATE INDEX IF NOT EXISTS idx_Absences_AbsenceDate_ID
+    ON Absences (AbsenceDate, ID);
@@ -0,0 +1,80 @@
+-- Миграция 0003: полнотекстовый индекс (FTS5) для поиска сотрудников.
+-- requires: fts5
+--
+-- Токенизатор trigram индексирует все трехсимвольные подстроки, поэтому
+-- MATCH по фразе ищет подстроку (как LIKE '%...%') и без учета регистра,
+-- в том числе для кириллицы. Строка индекса связана с сотрудником через rowid
+-- таблицы Employees; названия из справочников хранятся денормализованно
+-- и поддерживаются триггерами.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS EmployeesFTS USING fts5(
+    PersonnelNumber, LastName, FirstName, MiddleName, BirthDate,
+    GenderName, PositionName, DepartmentName, StateName,
+    tokenize = 'trigram'
+);
+
+-- Начальное заполнение
+DELETE FROM EmployeesFTS;
+INSERT INTO EmployeesFTS (rowid, PersonnelNumber, LastName, FirstName, MiddleName, BirthDate,
+                          GenderName, PositionName, DepartmentName, StateName)
+SELECT E.rowid, E.PersonnelNumber, E.LastName, E.FirstName, E.MiddleName, E.BirthDate,
+       G.GenderName, P.Name, D.Name, S.StateName
+FROM Employees AS E
+LEFT JOIN Genders AS G ON E.GenderID = G.ID
+LEFT JOIN Positions AS P ON E.PositionID = P.ID
+LEFT JOIN Departments AS D ON E.DepartmentID = D.ID
+LEFT JOIN States AS S ON E.StateID = S.ID;
+
+-- Сотрудники
+CREATE TRIGGER IF NOT EXISTS trg_Employees_fts_insert AFTER INSERT ON Employees
+BEGIN
+    INSERT INTO EmployeesFTS (rowid, PersonnelNumber, LastName, FirstName, MiddleName, BirthDate,
+                              GenderName, PositionName, DepartmentName, StateName)
+    VALUES (new.rowid, new.PersonnelNumber, new.LastName, new.FirstName, new.MiddleName, new.BirthDate,
+            (SELECT GenderName FROM Genders WHERE ID = new.GenderID),
+            (SELECT Name FROM Positions WHERE ID = new.PositionID),
+            (SELECT Name FROM Departments WHERE ID = new.DepartmentID),
+            (SELECT StateName FROM States WHERE ID = new.StateID));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Employees_fts_update AFTER UPDATE ON Employees
+BEGIN
+    DELETE FROM EmployeesFTS WHERE rowid = old.rowid;
+    INSERT INTO EmployeesFTS (rowid, PersonnelNumber, LastName, FirstName, MiddleName, BirthDate,
+                              GenderName, PositionName, DepartmentName, StateName)
+    VALUES (new.rowid, new.PersonnelNumber, new.LastName, new.FirstName, new.MiddleName, new.BirthDate,
+            (SELECT GenderName FROM Genders WHERE ID = new.GenderID),
+            (SELECT Name FROM Positions WHERE ID = new.PositionID),
+            (SELECT Name FROM Departments WHERE ID = new.DepartmentID),
+            (SELECT StateName FROM States WHERE ID = new.StateID));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Employees_fts_delete AFTER DELETE ON Employees
+BEGIN
+    DELETE FROM EmployeesFTS WHERE rowid = old.rowid;
+END;
+
+-- Справочники: переименование обновляет строки индекса связанных сотрудников
+CREATE TRIGGER IF NOT EXISTS trg_Genders_fts_update AFTER UPDATE OF GenderName ON Genders
+BEGIN
+    UPDATE EmployeesFTS SET GenderName = new.GenderName
+    WHERE rowid IN (SELECT rowid FROM Employees WHERE GenderID = new.ID);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Positions_fts_update AFTER UPDATE OF Name ON Positions
+BEGIN
+    UPDATE EmployeesFTS SET PositionName = new.Name
+    WHERE rowid IN (SELECT rowid FROM Employees WHERE PositionID = new.ID);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Departments_fts_update AFTER UPDATE OF Name ON Departments
+BEGIN
+    UPDATE EmployeesFTS SET DepartmentName = new.Name
+    WHERE rowid IN (SELECT rowid FROM Employees WHERE DepartmentID = new.ID);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_States_fts_update AFTER UPDATE OF StateName ON States
+BEGIN
+    UPDATE EmployeesFTS SET StateName = new.StateName
+    WHERE rowid IN (SELECT rowid FROM Employees WHERE StateID = new.ID);
+END;
@@ -0,0 +1,124 @@
+-- Миграция 0004: полнотекстовые индексы (FTS5) для поиска кадровых событий и отсутствий.
+-- requires: fts5
+--
+-- Как и EmployeesFTS (миграция 0003), используется токенизатор trigram:
+-- MATCH по фразе ищет подстроку без учета регистра. Строка индекса связана
+-- с записью через rowid (= ID события или отсутствия); ФИО сотрудника и названия
+-- из справочников хранятся денормализованно и поддерживаются триггерами.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS EmployeeEventsFTS USING fts5(
+    EventDate, EventName, PersonnelNumber, LastName, FirstName, MiddleName,
+    PositionName, DepartmentName, Reason,
+    tokenize = 'trigram'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS AbsencesFTS USING fts5(
+    PersonnelNumber, LastName, FirstName, MiddleName, AbsenceDate,
+    FullDay, StartingTime, EndingTime, Reason,
+    tokenize = 'trigram'
+);
+
+-- Начальное заполнение
+DELETE FROM EmployeeEventsFTS;
+INSERT INTO EmployeeEventsFTS (rowid, EventDate, EventName, PersonnelNumber, LastName, FirstName,
+                               MiddleName, PositionName, DepartmentName, Reason)
+SELECT EE.ID, EE.EventDate, EV.EventName, EE.EmployeePersonnelNumber, E.LastName, E.FirstName,
+       E.MiddleName, P.Name, D.Name, EE.Reason
+FROM EmployeeEvents AS EE
+LEFT JOIN Events AS EV ON EE.EventID = EV.ID
+LEFT JOIN Employees AS E ON EE.EmployeePersonnelNumber = E.PersonnelNumber
+LEFT JOIN Positions AS P ON EE.PositionID = P.ID
+LEFT JOIN Departments AS D ON EE.DepartmentID = D.ID;
+
+DELETE FROM AbsencesFTS;
+INSERT INTO AbsencesFTS (rowid, PersonnelNumber, LastName, FirstName, MiddleName, AbsenceDate,
+                         FullDay, StartingTime, EndingTime, Reason)
+SELECT A.ID, A.EmployeePersonnelNumber, E.LastName, E.FirstName, E.MiddleName, A.AbsenceDate,
+       CASE A.FullDay WHEN 1 THEN 'Да' ELSE 'Нет' END, A.StartingTime, A.EndingTime, A.Reason
+FROM Absences AS A
+LEFT JOIN Employees AS E ON A.EmployeePersonnelNumber = E.PersonnelNumber;
+
+-- Кадровые события
+CREATE TRIGGER IF NOT EXISTS trg_EmployeeEvents_fts_insert AFTER INSERT ON EmployeeEvents
+BEGIN
+    INSERT INTO EmployeeEventsFTS (rowid, EventDate, EventName, PersonnelNumber, LastName, FirstName,
+                                   MiddleName, PositionName, DepartmentName, Reason)
+    SELECT new.ID, new.EventDate, (SELECT EventName FROM Events WHERE ID = new.EventID),
+           new.EmployeePersonnelNumber, E.LastName, E.FirstName, E.MiddleName,
+           (SELECT Name FROM Positions WHERE ID = new.PositionID),
+           (SELECT Name FROM Departments WHERE ID = new.DepartmentID), new.Reason
+    FROM (SELECT 1) LEFT JOIN Employees AS E ON E.PersonnelNumber = new.EmployeePersonnelNumber;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_EmployeeEvents_fts_update AFTER UPDATE ON EmployeeEvents
+BEGIN
+    DELETE FROM EmployeeEventsFTS WHERE rowid = old.ID;
+    INSERT INTO EmployeeEventsFTS (rowid, EventDate, EventName, PersonnelNumber, LastName, FirstName,
+                                   MiddleName, PositionName, DepartmentName, Reason)
+    SELECT new.ID, new.EventDate, (SELECT EventName FROM Events WHERE ID = new.EventID),
+           new.EmployeePersonnelNumber, E.LastName, E.FirstName, E.MiddleName,
+           (SELECT Name FROM Positions WHERE ID = new.PositionID),
+           (SELECT Name FROM Departments WHERE ID = new.DepartmentID), new.Reason
+    FROM (SELECT 1) LEFT JOIN Employees AS E ON E.PersonnelNumber = new.EmployeePersonnelNumber;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_EmployeeEvents_fts_delete AFTER DELETE ON EmployeeEvents
+BEGIN
+    DELETE FROM EmployeeEventsFTS WHERE rowid = old.ID;
+END;
+
+-- Отсутствия
+CREATE TRIGGER IF NOT EXISTS trg_Absences_fts_insert AFTER INSERT ON Absences
+BEGIN
+    INSERT INTO AbsencesFTS (rowid, PersonnelNumber, LastName, FirstName, MiddleName, AbsenceDate,
+                             FullDay, StartingTime, EndingTime, Reason)
+    SELECT new.ID, new.EmployeePersonnelNumber, E.LastName, E.FirstName, E.MiddleName, new.AbsenceDate,
+           CASE new.FullDay WHEN 1 THEN 'Да' ELSE 'Нет' END, new.StartingTime, new.EndingTime, new.Reason
+    FROM (SELECT 1) LEFT JOIN Employees AS E ON E.PersonnelNumber = new.EmployeePersonnelNumber;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Absences_fts_update AFTER UPDATE ON Absences
+BEGIN
+    DELETE FROM AbsencesFTS WHERE rowid = old.ID;
+    INSERT INTO AbsencesFTS (rowid, PersonnelNumber, LastName, FirstName, MiddleName, AbsenceDate,
+                             FullDay, StartingTime, EndingTime, Reason)
+    SELECT new.ID, new.EmployeePersonnelNumber, E.LastName, E.FirstName, E.MiddleName, new.AbsenceDate,
+           CASE new.FullDay WHEN 1 THEN 'Да' ELSE 'Нет' END, new.StartingTime, new.EndingTime, new.Reason
+    FROM (SELECT 1) LEFT JOIN Employees AS E ON E.PersonnelNumber = new.EmployeePersonnelNumber;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Absences_fts_delete AFTER DELETE ON Absences
+BEGIN
+    DELETE FROM AbsencesFTS WHERE rowid = old.ID;
+END;
+
+-- Смена ФИО сотрудника обновляет его события и отсутствия
+CREATE TRIGGER IF NOT EXISTS trg_Employees_history_fts_update
+AFTER UPDATE OF LastName, FirstName, MiddleName ON Employees
+BEGIN
+    UPDATE EmployeeEventsFTS
+    SET LastName = new.LastName, FirstName = new.FirstName, MiddleName = new.MiddleName
+    WHERE rowid IN (SELECT ID FROM EmployeeEvents WHERE EmployeePersonnelNumber = new.PersonnelNumber);
+    UPDATE AbsencesFTS
+    SET LastName = new.LastName, FirstName = new.FirstName, MiddleName = new.MiddleName
+    WHERE rowid IN (SELECT ID FROM Absences WHERE EmployeePersonnelNumber = new.PersonnelNumber);
+END;
+
+-- Справочники, которые выводятся в списке событий
+CREATE TRIGGER IF NOT EXISTS trg_Events_fts_update AFTER UPDATE OF EventName ON Events
+BEGIN
+    UPDATE EmployeeEventsFTS SET EventName = new.EventName
+    WHERE rowid IN (SELECT ID FROM EmployeeEvents WHERE EventID = new.ID);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Positions_events_fts_update AFTER UPDATE OF Name ON Positions
+BEGIN
+    UPDATE EmployeeEventsFTS SET PositionName = new.Name
+    WHERE rowid IN (SELECT ID FROM EmployeeEvents WHERE PositionID = new.ID);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Departments_events_fts_update AFTER UPDATE OF Name ON Departments
+BEGIN
+    UPDATE EmployeeEventsFTS SET DepartmentName = new.Name
+    WHERE rowid IN (SELECT ID FROM EmployeeEvents WHERE DepartmentID = new.ID);
+END;
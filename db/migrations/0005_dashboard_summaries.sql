@@ -0,0 +1,160 @@
+-- Миграция 0005: сводные таблицы для показателей дашборда.
+--
+-- Дашборд раньше считал численность и события агрегатными запросами
+-- по всей таблице Employees/EmployeeEvents. Сводные таблицы хранят уже
+-- посчитанные значения и поддерживаются триггерами, поэтому чтение
+-- зависит от числа отделов/должностей/дат, а не от числа сотрудников.
+-- Отсутствующие справочные ID (NULL) хранятся как 0, чтобы работали
+-- первичные ключи и UPSERT.
+
+-- Численность по состоянию, отделу, должности и полу
+CREATE TABLE IF NOT EXISTS HeadcountSummary (
+    StateID INTEGER NOT NULL,
+    DepartmentID INTEGER NOT NULL,
+    PositionID INTEGER NOT NULL,
+    GenderID INTEGER NOT NULL,
+    EmployeeCount INTEGER NOT NULL,
+    PRIMARY KEY (StateID, DepartmentID, PositionID, GenderID)
+) WITHOUT ROWID;
+
+-- Численность по состоянию и дате рождения (для гистограммы возрастов)
+CREATE TABLE IF NOT EXISTS BirthDateSummary (
+    StateID INTEGER NOT NULL,
+    BirthDate TEXT NOT NULL,
+    EmployeeCount INTEGER NOT NULL,
+    PRIMARY KEY (StateID, BirthDate)
+) WITHOUT ROWID;
+
+-- Количество кадровых событий по типу и дню
+CREATE TABLE IF NOT EXISTS EventDailySummary (
+    EventID INTEGER NOT NULL,
+    EventDate TEXT NOT NULL,
+    EventCount INTEGER NOT NULL,
+    PRIMARY KEY (EventID, EventDate)
+) WITHOUT ROWID;
+
+-- Начальное заполнение
+DELETE FROM HeadcountSummary;
+INSERT INTO HeadcountSummary (StateID, DepartmentID, PositionID, GenderID, EmployeeCount)
+SELECT IFNULL(StateID, 0), IFNULL(DepartmentID, 0), IFNULL(PositionID, 0), IFNULL(GenderID, 0), COUNT(*)
+FROM Employees
+GROUP BY 1, 2, 3, 4;
+
+DELETE FROM BirthDateSummary;
+INSERT INTO BirthDateSummary (StateID, BirthDate, EmployeeCount)
+SELECT IFNULL(StateID, 0), BirthDate, COUNT(*)
+FROM Employees
+WHERE BirthDate IS NOT NULL AND BirthDate != ''
+GROUP BY 1, 2;
+
+DELETE FROM EventDailySummary;
+INSERT INTO EventDailySummary (EventID, EventDate, EventCount)
+SELECT EventID, EventDate, COUNT(*)
+FROM EmployeeEvents
+WHERE EventDate IS NOT NULL
+GROUP BY 1, 2;
+
+-- Сотрудники: численность
+CREATE TRIGGER IF NOT EXISTS trg_Employees_headcount_insert AFTER INSERT ON Employees
+BEGIN
+    INSERT INTO HeadcountSummary (StateID, DepartmentID, PositionID, GenderID, EmployeeCount)
+    VALUES (IFNULL(new.StateID, 0), IFNULL(new.DepartmentID, 0), IFNULL(new.PositionID, 0),
+            IFNULL(new.GenderID, 0), 1)
+    ON CONFLICT (StateID, DepartmentID, PositionID, GenderID)
+    DO UPDATE SET EmployeeCount = EmployeeCount + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Employees_headcount_delete AFTER DELETE ON Employees
+BEGIN
+    UPDATE HeadcountSummary SET EmployeeCount = EmployeeCount - 1
+    WHERE StateID = IFNULL(old.StateID, 0) AND DepartmentID = IFNULL(old.DepartmentID, 0)
+      AND PositionID = IFNULL(old.PositionID, 0) AND GenderID = IFNULL(old.GenderID, 0);
+    DELETE FROM HeadcountSummary
+    WHERE StateID = IFNULL(old.StateID, 0) AND DepartmentID = IFNULL(old.DepartmentID, 0)
+      AND PositionID = IFNULL(old.PositionID, 0) AND GenderID = IFNULL(old.GenderID, 0)
+      AND EmployeeCount <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Employees_headcount_update
+AFTER UPDATE OF StateID, DepartmentID, PositionID, GenderID ON Employees
+WHEN old.StateID IS NOT new.StateID OR old.DepartmentID IS NOT new.DepartmentID
+  OR old.PositionID IS NOT new.PositionID OR old.GenderID IS NOT new.GenderID
+BEGIN
+    UPDATE HeadcountSummary SET EmployeeCount = EmployeeCount - 1
+    WHERE StateID = IFNULL(old.StateID, 0) AND DepartmentID = IFNULL(old.DepartmentID, 0)
+      AND PositionID = IFNULL(old.PositionID, 0) AND GenderID = IFNULL(old.GenderID, 0);
+    DELETE FROM HeadcountSummary
+    WHERE StateID = IFNULL(old.StateID, 0) AND DepartmentID = IFNULL(old.DepartmentID, 0)
+      AND PositionID = IFNULL(old.PositionID, 0) AND GenderID = IFNULL(old.GenderID, 0)
+      AND EmployeeCount <= 0;
+    INSERT INTO HeadcountSummary (StateID, DepartmentID, PositionID, GenderID, EmployeeCount)
+    VALUES (IFNULL(new.StateID, 0), IFNULL(new.DepartmentID, 0), IFNULL(new.PositionID, 0),
+            IFNULL(new.GenderID, 0), 1)
+    ON CONFLICT (StateID, DepartmentID, PositionID, GenderID)
+    DO UPDATE SET EmployeeCount = EmployeeCount + 1;
+END;
+
+-- Сотрудники: даты рождения
+CREATE TRIGGER IF NOT EXISTS trg_Employees_birthdates_insert AFTER INSERT ON Employees
+WHEN new.BirthDate IS NOT NULL AND new.BirthDate != ''
+BEGIN
+    INSERT INTO BirthDateSummary (StateID, BirthDate, EmployeeCount)
+    VALUES (IFNULL(new.StateID, 0), new.BirthDate, 1)
+    ON CONFLICT (StateID, BirthDate) DO UPDATE SET EmployeeCount = EmployeeCount + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Employees_birthdates_delete AFTER DELETE ON Employees
+WHEN old.BirthDate IS NOT NULL AND old.BirthDate != ''
+BEGIN
+    UPDATE BirthDateSummary SET EmployeeCount = EmployeeCount - 1
+    WHERE StateID = IFNULL(old.StateID, 0) AND BirthDate = old.BirthDate;
+    DELETE FROM BirthDateSummary
+    WHERE StateID = IFNULL(old.StateID, 0) AND BirthDate = old.BirthDate AND EmployeeCount <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Employees_birthdates_update
+AFTER UPDATE OF StateID, BirthDate ON Employees
+WHEN old.StateID IS NOT new.StateID OR old.BirthDate IS NOT new.BirthDate
+BEGIN
+    -- Для пустой или отсутствующей даты условия ниже не находят строк
+    UPDATE BirthDateSummary SET EmployeeCount = EmployeeCount - 1
+    WHERE StateID = IFNULL(old.StateID, 0) AND BirthDate = old.BirthDate AND old.BirthDate != '';
+    DELETE FROM BirthDateSummary
+    WHERE StateID = IFNULL(old.StateID, 0) AND BirthDate = old.BirthDate AND EmployeeCount <= 0;
+    INSERT INTO BirthDateSummary (StateID, BirthDate, EmployeeCount)
+    SELECT IFNULL(new.StateID, 0), new.BirthDate, 1
+    WHERE new.BirthDate IS NOT NULL AND new.BirthDate != ''
+    ON CONFLICT (StateID, BirthDate) DO UPDATE SET EmployeeCount = EmployeeCount + 1;
+END;
+
+-- Кадровые события: количество по типу и дню
+CREATE TRIGGER IF NOT EXISTS trg_EmployeeEvents_daily_insert AFTER INSERT ON EmployeeEvents
+WHEN new.EventDate IS NOT NULL
+BEGIN
+    INSERT INTO EventDailySummary (EventID, EventDate, EventCount)
+    VALUES (new.EventID, new.EventDate, 1)
+    ON CONFLICT (EventID, EventDate) DO UPDATE SET EventCount = EventCount + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_EmployeeEvents_daily_delete AFTER DELETE ON EmployeeEvents
+WHEN old.EventDate IS NOT NULL
+BEGIN
+    UPDATE EventDailySummary SET EventCount = EventCount - 1
+    WHERE EventID = old.EventID AND EventDate = old.EventDate;
+    DELETE FROM EventDailySummary
+    WHERE EventID = old.EventID AND EventDate = old.EventDate AND EventCount <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_EmployeeEvents_daily_update
+AFTER UPDATE OF EventID, EventDate ON EmployeeEvents
+WHEN old.EventID IS NOT new.EventID OR old.EventDate IS NOT new.EventDate
+BEGIN
+    UPDATE EventDailySummary SET EventCount = EventCount - 1
+    WHERE EventID = old.EventID AND EventDate = old.EventDate;
+    DELETE FROM EventDailySummary
+    WHERE EventID = old.EventID AND EventDate = old.EventDate AND EventCount <= 0;
+    INSERT INTO EventDailySummary (EventID, EventDate, EventCount)
+    SELECT new.EventID, new.EventDate, 1
+    WHERE new.EventDate IS NOT NULL
+    ON CONFLICT (EventID, EventDate) DO UPDATE SET EventCount = EventCount + 1;
+END;
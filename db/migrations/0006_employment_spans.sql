@@ -0,0 +1,67 @@
+-- Миграция 0006: периоды работы сотрудников (прием -> увольнение).
+--
+-- Отчет об уволенных раньше искал дату приема коррелированным подзапросом
+-- MAX(EventDate) по событиям 'Прием' для каждой строки увольнения.
+-- Таблица EmploymentSpans хранит период целиком: открытый период
+-- (DismissalDate IS NULL) создается при приеме, закрывается при увольнении
+-- (EmployeeEventRepository.insert_event пересчитывает периоды сотрудника). Должность и отдел - на момент
+-- увольнения (для открытого периода - на момент приема).
+
+CREATE TABLE IF NOT EXISTS EmploymentSpans (
+    ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    EmployeePersonnelNumber TEXT NOT NULL,
+    HireDate TEXT,          -- Формат: ГГГГ-ММ-ДД (NULL, если прием не зарегистрирован)
+    DismissalDate TEXT,     -- Формат: ГГГГ-ММ-ДД (NULL - период не закрыт)
+    DismissalReason TEXT,
+    PositionID INTEGER,
+    DepartmentID INTEGER,
+    FOREIGN KEY (EmployeePersonnelNumber) REFERENCES Employees(PersonnelNumber),
+    FOREIGN KEY (PositionID) REFERENCES Positions(ID),
+    FOREIGN KEY (DepartmentID) REFERENCES Departments(ID)
+);
+
+-- Отчет об уволенных за период
+CREATE INDEX IF NOT EXISTS idx_EmploymentSpans_DismissalDate
+    ON EmploymentSpans (DismissalDate);
+
+-- Открытый период сотрудника
+CREATE INDEX IF NOT EXISTS idx_EmploymentSpans_Employee
+    ON EmploymentSpans (EmployeePersonnelNumber, DismissalDate);
+
+-- Начальное заполнение по истории событий (тот же пересчет выполняет
+-- EmployeeEventRepository.rebuild_employment_spans / python -m db.rebuild_summaries)
+DELETE FROM EmploymentSpans;
+
+-- Закрытые периоды: каждое увольнение с последним приемом не позже его даты
+INSERT INTO EmploymentSpans (EmployeePersonnelNumber, HireDate, DismissalDate, DismissalReason,
+                             PositionID, DepartmentID)
+SELECT D.EmployeePersonnelNumber,
+       (SELECT MAX(H.EventDate)
+        FROM EmployeeEvents AS H
+        JOIN Events AS HV ON H.EventID = HV.ID
+        WHERE H.EmployeePersonnelNumber = D.EmployeePersonnelNumber
+          AND HV.EventName = 'Прием'
+          AND H.EventDate <= D.EventDate),
+       D.EventDate, D.Reason,
+       COALESCE(D.PositionID, E.PositionID), COALESCE(D.DepartmentID, E.DepartmentID)
+FROM EmployeeEvents AS D
+JOIN Events AS DV ON D.EventID = DV.ID
+LEFT JOIN Employees AS E ON D.EmployeePersonnelNumber = E.PersonnelNumber
+WHERE DV.EventName = 'Увольнение' AND D.EventDate IS NOT NULL;
+
+-- Открытые периоды: прием, после которого (по дате и ID) не было ни увольнения, ни другого приема
+INSERT INTO EmploymentSpans (EmployeePersonnelNumber, HireDate, DismissalDate, DismissalReason,
+                             PositionID, DepartmentID)
+SELECT H.EmployeePersonnelNumber, H.EventDate, NULL, NULL,
+       COALESCE(H.PositionID, E.PositionID), COALESCE(H.DepartmentID, E.DepartmentID)
+FROM EmployeeEvents AS H
+JOIN Events AS HV ON H.EventID = HV.ID
+LEFT JOIN Employees AS E ON H.EmployeePersonnelNumber = E.PersonnelNumber
+WHERE HV.EventName = 'Прием' AND H.EventDate IS NOT NULL
+  AND NOT EXISTS (
+      SELECT 1
+      FROM EmployeeEvents AS X
+      JOIN Events AS XV ON X.EventID = XV.ID
+      WHERE X.EmployeePersonnelNumber = H.EmployeePersonnelNumber
+        AND XV.EventName IN ('Прием', 'Увольнение')
+        AND (X.EventDate, X.ID) > (H.EventDate, H.ID));
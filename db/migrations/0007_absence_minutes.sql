@@ -0,0 +1,114 @@
+-- Миграция 0007: минуты отсутствия по сотруднику и дню.
+--
+-- Отчет по отсутствиям раньше читал все записи за период и считал
+-- длительность каждой в Python. Длительность записи теперь описана один раз
+-- в представлении AbsenceDurations, а таблица AbsenceDailyMinutes хранит
+-- сумму минут по (дата, сотрудник) и поддерживается триггерами, поэтому
+-- итоги за период - это один SUM по диапазону первичного ключа.
+--
+-- Правила расчета (как в прежнем отчете):
+-- - неполный день: ЧЧ:ММ окончания - ЧЧ:ММ начала (не меньше 0);
+-- - полный день: рабочие часы по графику должности на день недели,
+--   0 для выходного (00:00-00:00), 8 часов, если графика нет или он некорректен.
+-- График берется по текущей должности сотрудника; при изменении графиков
+-- суммы пересчитываются командой `python -m db.rebuild_summaries`.
+
+CREATE TABLE IF NOT EXISTS AbsenceDailyMinutes (
+    AbsenceDate TEXT NOT NULL,              -- Формат: ГГГГ-ММ-ДД
+    EmployeePersonnelNumber TEXT NOT NULL,
+    Minutes INTEGER NOT NULL,
+    PRIMARY KEY (AbsenceDate, EmployeePersonnelNumber)
+) WITHOUT ROWID;
+
+-- Длительность каждой записи об отсутствии в минутах
+DROP VIEW IF EXISTS AbsenceDurations;
+CREATE VIEW AbsenceDurations AS
+SELECT A.ID, A.EmployeePersonnelNumber, A.AbsenceDate,
+       CASE
+           WHEN A.FullDay = 1 THEN IFNULL(
+               (SELECT CASE
+                           WHEN WH.StartingTime = '00:00' AND WH.EndingTime = '00:00' THEN 0
+                           WHEN (CAST(substr(WH.EndingTime, 1, instr(WH.EndingTime, ':') - 1) AS INTEGER) * 60
+                                 + CAST(substr(WH.EndingTime, instr(WH.EndingTime, ':') + 1) AS INTEGER))
+                              - (CAST(substr(WH.StartingTime, 1, instr(WH.StartingTime, ':') - 1) AS INTEGER) * 60
+                                 + CAST(substr(WH.StartingTime, instr(WH.StartingTime, ':') + 1) AS INTEGER)) > 0
+                           THEN (CAST(substr(WH.EndingTime, 1, instr(WH.EndingTime, ':') - 1) AS INTEGER) * 60
+                                 + CAST(substr(WH.EndingTime, instr(WH.EndingTime, ':') + 1) AS INTEGER))
+                              - (CAST(substr(WH.StartingTime, 1, instr(WH.StartingTime, ':') - 1) AS INTEGER) * 60
+                                 + CAST(substr(WH.StartingTime, instr(WH.StartingTime, ':') + 1) AS INTEGER))
+                       END
+                FROM Employees AS E
+                JOIN Schedules AS S ON S.PositionID = E.PositionID
+                -- strftime('%w'): 0 = воскресенье; DaysOfTheWeek: 1 = понедельник ... 7 = воскресенье
+                 AND S.DayOfWeekID = (CAST(strftime('%w', A.AbsenceDate) AS INTEGER) + 6) % 7 + 1
+                JOIN WorkingHours AS WH ON S.WorkingHoursID = WH.ID
+                WHERE E.PersonnelNumber = A.EmployeePersonnelNumber
+                LIMIT 1), 480)
+           WHEN A.StartingTime IS NULL OR A.StartingTime = ''
+             OR A.EndingTime IS NULL OR A.EndingTime = '' THEN 0
+           ELSE MAX(0, (CAST(substr(A.EndingTime, 1, instr(A.EndingTime, ':') - 1) AS INTEGER) * 60
+                        + CAST(substr(A.EndingTime, instr(A.EndingTime, ':') + 1) AS INTEGER))
+                     - (CAST(substr(A.StartingTime, 1, instr(A.StartingTime, ':') - 1) AS INTEGER) * 60
+                        + CAST(substr(A.StartingTime, instr(A.StartingTime, ':') + 1) AS INTEGER)))
+       END AS Minutes
+FROM Absences AS A
+WHERE A.AbsenceDate IS NOT NULL;
+
+-- Начальное заполнение
+DELETE FROM AbsenceDailyMinutes;
+INSERT INTO AbsenceDailyMinutes (AbsenceDate, EmployeePersonnelNumber, Minutes)
+SELECT AbsenceDate, EmployeePersonnelNumber, SUM(Minutes)
+FROM AbsenceDurations
+GROUP BY AbsenceDate, EmployeePersonnelNumber;
+
+-- Отсутствия: пересчет суммы затронутого дня сотрудника
+CREATE TRIGGER IF NOT EXISTS trg_Absences_minutes_insert AFTER INSERT ON Absences
+WHEN new.AbsenceDate IS NOT NULL
+BEGIN
+    INSERT OR REPLACE INTO AbsenceDailyMinutes (AbsenceDate, EmployeePersonnelNumber, Minutes)
+    SELECT AbsenceDate, EmployeePersonnelNumber, SUM(Minutes)
+    FROM AbsenceDurations
+    WHERE EmployeePersonnelNumber = new.EmployeePersonnelNumber AND AbsenceDate = new.AbsenceDate
+    GROUP BY AbsenceDate, EmployeePersonnelNumber;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Absences_minutes_delete AFTER DELETE ON Absences
+WHEN old.AbsenceDate IS NOT NULL
+BEGIN
+    DELETE FROM AbsenceDailyMinutes
+    WHERE EmployeePersonnelNumber = old.EmployeePersonnelNumber AND AbsenceDate = old.AbsenceDate;
+    INSERT INTO AbsenceDailyMinutes (AbsenceDate, EmployeePersonnelNumber, Minutes)
+    SELECT AbsenceDate, EmployeePersonnelNumber, SUM(Minutes)
+    FROM AbsenceDurations
+    WHERE EmployeePersonnelNumber = old.EmployeePersonnelNumber AND AbsenceDate = old.AbsenceDate
+    GROUP BY AbsenceDate, EmployeePersonnelNumber;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Absences_minutes_update AFTER UPDATE ON Absences
+BEGIN
+    DELETE FROM AbsenceDailyMinutes
+    WHERE EmployeePersonnelNumber = old.EmployeePersonnelNumber AND AbsenceDate = old.AbsenceDate;
+    INSERT INTO AbsenceDailyMinutes (AbsenceDate, EmployeePersonnelNumber, Minutes)
+    SELECT AbsenceDate, EmployeePersonnelNumber, SUM(Minutes)
+    FROM AbsenceDurations
+    WHERE EmployeePersonnelNumber = old.EmployeePersonnelNumber AND AbsenceDate = old.AbsenceDate
+    GROUP BY AbsenceDate, EmployeePersonnelNumber;
+    INSERT OR REPLACE INTO AbsenceDailyMinutes (AbsenceDate, EmployeePersonnelNumber, Minutes)
+    SELECT AbsenceDate, EmployeePersonnelNumber, SUM(Minutes)
+    FROM AbsenceDurations
+    WHERE EmployeePersonnelNumber = new.EmployeePersonnelNumber AND AbsenceDate = new.AbsenceDate
+    GROUP BY AbsenceDate, EmployeePersonnelNumber;
+END;
+
+-- Смена должности меняет график, по которому считаются полные дни
+CREATE TRIGGER IF NOT EXISTS trg_Employees_absence_minutes_update
+AFTER UPDATE OF PositionID ON Employees
+WHEN old.PositionID IS NOT new.PositionID
+BEGIN
+    DELETE FROM AbsenceDailyMinutes WHERE EmployeePersonnelNumber = new.PersonnelNumber;
+    INSERT INTO AbsenceDailyMinutes (AbsenceDate, EmployeePersonnelNumber, Minutes)
+    SELECT AbsenceDate, EmployeePersonnelNumber, SUM(Minutes)
+    FROM AbsenceDurations
+    WHERE EmployeePersonnelNumber = new.PersonnelNumber
+    GROUP BY AbsenceDate, EmployeePersonnelNumber;
+END;
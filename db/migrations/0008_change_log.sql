@@ -0,0 +1,175 @@
+-- Миграция 0008: журнал изменений данных.
+--
+-- Триггеры записывают в ChangeLog каждое изменение основных таблиц и
+-- справочников: сущность (имя таблицы), ключ записи и операцию. Version
+-- монотонно растет, поэтому подписчик (ChangeJournal в db/change_journal.py)
+-- читает только записи после последней увиденной версии. Журнал видит и
+-- изменения из других соединений и процессов; откаченные транзакции в него
+-- не попадают. Старые записи удаляются (config.CHANGE_LOG_RETENTION).
+
+CREATE TABLE IF NOT EXISTS ChangeLog (
+    Version INTEGER PRIMARY KEY AUTOINCREMENT,
+    Entity TEXT NOT NULL,      -- Имя таблицы
+    EntityKey TEXT NOT NULL,   -- PersonnelNumber для Employees, ID для остальных
+    Operation TEXT NOT NULL    -- insert, update, delete
+);
+
+-- Employees
+CREATE TRIGGER IF NOT EXISTS trg_Employees_changelog_insert AFTER INSERT ON Employees
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Employees', new.PersonnelNumber, 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Employees_changelog_update AFTER UPDATE ON Employees
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Employees', new.PersonnelNumber, 'update');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Employees_changelog_delete AFTER DELETE ON Employees
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Employees', old.PersonnelNumber, 'delete');
+END;
+
+-- EmployeeEvents
+CREATE TRIGGER IF NOT EXISTS trg_EmployeeEvents_changelog_insert AFTER INSERT ON EmployeeEvents
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('EmployeeEvents', new.ID, 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_EmployeeEvents_changelog_update AFTER UPDATE ON EmployeeEvents
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('EmployeeEvents', new.ID, 'update');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_EmployeeEvents_changelog_delete AFTER DELETE ON EmployeeEvents
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('EmployeeEvents', old.ID, 'delete');
+END;
+
+-- Absences
+CREATE TRIGGER IF NOT EXISTS trg_Absences_changelog_insert AFTER INSERT ON Absences
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Absences', new.ID, 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Absences_changelog_update AFTER UPDATE ON Absences
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Absences', new.ID, 'update');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Absences_changelog_delete AFTER DELETE ON Absences
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Absences', old.ID, 'delete');
+END;
+
+-- Users
+CREATE TRIGGER IF NOT EXISTS trg_Users_changelog_insert AFTER INSERT ON Users
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Users', new.ID, 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Users_changelog_update AFTER UPDATE ON Users
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Users', new.ID, 'update');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Users_changelog_delete AFTER DELETE ON Users
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Users', old.ID, 'delete');
+END;
+
+-- Genders
+CREATE TRIGGER IF NOT EXISTS trg_Genders_changelog_insert AFTER INSERT ON Genders
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Genders', new.ID, 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Genders_changelog_update AFTER UPDATE ON Genders
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Genders', new.ID, 'update');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Genders_changelog_delete AFTER DELETE ON Genders
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Genders', old.ID, 'delete');
+END;
+
+-- Positions
+CREATE TRIGGER IF NOT EXISTS trg_Positions_changelog_insert AFTER INSERT ON Positions
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Positions', new.ID, 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Positions_changelog_update AFTER UPDATE ON Positions
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Positions', new.ID, 'update');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Positions_changelog_delete AFTER DELETE ON Positions
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Positions', old.ID, 'delete');
+END;
+
+-- Departments
+CREATE TRIGGER IF NOT EXISTS trg_Departments_changelog_insert AFTER INSERT ON Departments
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Departments', new.ID, 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Departments_changelog_update AFTER UPDATE ON Departments
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Departments', new.ID, 'update');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Departments_changelog_delete AFTER DELETE ON Departments
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Departments', old.ID, 'delete');
+END;
+
+-- States
+CREATE TRIGGER IF NOT EXISTS trg_States_changelog_insert AFTER INSERT ON States
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('States', new.ID, 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_States_changelog_update AFTER UPDATE ON States
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('States', new.ID, 'update');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_States_changelog_delete AFTER DELETE ON States
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('States', old.ID, 'delete');
+END;
+
+-- Events
+CREATE TRIGGER IF NOT EXISTS trg_Events_changelog_insert AFTER INSERT ON Events
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Events', new.ID, 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Events_changelog_update AFTER UPDATE ON Events
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Events', new.ID, 'update');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Events_changelog_delete AFTER DELETE ON Events
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Events', old.ID, 'delete');
+END;
+
+-- Roles
+CREATE TRIGGER IF NOT EXISTS trg_Roles_changelog_insert AFTER INSERT ON Roles
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Roles', new.ID, 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Roles_changelog_update AFTER UPDATE ON Roles
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Roles', new.ID, 'update');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Roles_changelog_delete AFTER DELETE ON Roles
+BEGIN
+    INSERT INTO ChangeLog (Entity, EntityKey, Operation) VALUES ('Roles', old.ID, 'delete');
+END;
@@ -0,0 +1,67 @@
+-- Миграция 0009: целочисленные представления дат и времени.
+--
+-- Даты (ГГГГ-ММ-ДД) и время (ЧЧ:ММ) хранятся текстом, а отчеты и расчеты
+-- длительностей разбирали их строками. Вычисляемые (VIRTUAL) столбцы
+-- дают то же значение целым числом:
+-- - *Day    - юлианский день: CAST(julianday(дата) + 0.5 AS INTEGER)
+--             (= date.toordinal() + 1721425, см. db/date_codes.py);
+-- - *Minute - минуты от полуночи.
+-- Некорректное или пустое значение дает NULL. Столбцы не хранятся в строках
+-- и не требуют изменений в запросах вставки; индексы по ним поддерживаются SQLite.
+
+ALTER TABLE Employees ADD COLUMN BirthDay INTEGER
+    GENERATED ALWAYS AS (CAST(julianday(NULLIF(BirthDate, '')) + 0.5 AS INTEGER)) VIRTUAL;
+
+ALTER TABLE EmployeeEvents ADD COLUMN EventDay INTEGER
+    GENERATED ALWAYS AS (CAST(julianday(NULLIF(EventDate, '')) + 0.5 AS INTEGER)) VIRTUAL;
+
+ALTER TABLE Absences ADD COLUMN AbsenceDay INTEGER
+    GENERATED ALWAYS AS (CAST(julianday(NULLIF(AbsenceDate, '')) + 0.5 AS INTEGER)) VIRTUAL;
+ALTER TABLE Absences ADD COLUMN StartMinute INTEGER
+    GENERATED ALWAYS AS (CASE WHEN instr(StartingTime, ':') > 0
+        THEN CAST(substr(StartingTime, 1, instr(StartingTime, ':') - 1) AS INTEGER) * 60
+             + CAST(substr(StartingTime, instr(StartingTime, ':') + 1) AS INTEGER) END) VIRTUAL;
+ALTER TABLE Absences ADD COLUMN EndMinute INTEGER
+    GENERATED ALWAYS AS (CASE WHEN instr(EndingTime, ':') > 0
+        THEN CAST(substr(EndingTime, 1, instr(EndingTime, ':') - 1) AS INTEGER) * 60
+             + CAST(substr(EndingTime, instr(EndingTime, ':') + 1) AS INTEGER) END) VIRTUAL;
+
+ALTER TABLE WorkingHours ADD COLUMN StartMinute INTEGER
+    GENERATED ALWAYS AS (CASE WHEN instr(StartingTime, ':') > 0
+        THEN CAST(substr(StartingTime, 1, instr(StartingTime, ':') - 1) AS INTEGER) * 60
+             + CAST(substr(StartingTime, instr(StartingTime, ':') + 1) AS INTEGER) END) VIRTUAL;
+ALTER TABLE WorkingHours ADD COLUMN EndMinute INTEGER
+    GENERATED ALWAYS AS (CASE WHEN instr(EndingTime, ':') > 0
+        THEN CAST(substr(EndingTime, 1, instr(EndingTime, ':') - 1) AS INTEGER) * 60
+             + CAST(substr(EndingTime, instr(EndingTime, ':') + 1) AS INTEGER) END) VIRTUAL;
+
+-- Отчет по увольнениям: тип события + диапазон дней
+CREATE INDEX IF NOT EXISTS idx_EmployeeEvents_EventID_Day
+    ON EmployeeEvents (EventID, EventDay);
+
+-- Выборка отсутствий за период для отчетов
+CREATE INDEX IF NOT EXISTS idx_Absences_AbsenceDay
+    ON Absences (AbsenceDay);
+
+-- Длительность отсутствия (миграция 0007) по целым минутам вместо разбора строк
+DROP VIEW IF EXISTS AbsenceDurations;
+CREATE VIEW AbsenceDurations AS
+SELECT A.ID, A.EmployeePersonnelNumber, A.AbsenceDate,
+       CASE
+           WHEN A.FullDay = 1 THEN IFNULL(
+               (SELECT CASE
+                           WHEN WH.StartMinute = 0 AND WH.EndMinute = 0 THEN 0
+                           WHEN WH.EndMinute - WH.StartMinute > 0 THEN WH.EndMinute - WH.StartMinute
+                       END
+                FROM Employees AS E
+                JOIN Schedules AS S ON S.PositionID = E.PositionID
+                -- Юлианский день по модулю 7: 0 = понедельник; DaysOfTheWeek: 1 = понедельник ... 7 = воскресенье
+                 AND S.DayOfWeekID = A.AbsenceDay % 7 + 1
+                JOIN WorkingHours AS WH ON S.WorkingHoursID = WH.ID
+                WHERE E.PersonnelNumber = A.EmployeePersonnelNumber
+                LIMIT 1), 480)
+           WHEN A.StartMinute IS NULL OR A.EndMinute IS NULL THEN 0
+           ELSE MAX(0, A.EndMinute - A.StartMinute)
+       END AS Minutes
+FROM Absences AS A
+WHERE A.AbsenceDate IS NOT NULL;
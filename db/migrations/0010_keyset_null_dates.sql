@@ -0,0 +1,16 @@
+-- Миграция 0010: индексы постраничной навигации с учетом пустых дат.
+--
+-- EventDate и AbsenceDate допускают NULL. Сравнение кортежей
+-- (дата, ID) < (:after_date, :after_id) для NULL дает NULL, поэтому строки
+-- без даты не попадали на страницы после первой. Списки сортируются и
+-- листаются по COALESCE(дата, ''): строки без даты идут последними и
+-- читаются по курсору ('', ID). Индексы повторяют выражение ORDER BY,
+-- иначе SQLite сортирует всю таблицу.
+
+-- Список кадровых событий: ORDER BY COALESCE(EventDate, '') DESC, ID DESC
+CREATE INDEX IF NOT EXISTS idx_EmployeeEvents_EventDateKey_ID
+    ON EmployeeEvents (COALESCE(EventDate, ''), ID);
+
+-- Список отсутствий: ORDER BY COALESCE(AbsenceDate, '') DESC, ID DESC
+CREATE INDEX IF NOT EXISTS idx_Absences_AbsenceDateKey_ID
+    ON Absences (COALESCE(AbsenceDate, ''), ID);
@@ -0,0 +1,287 @@
+# db/migrator.py
+"""
+Модуль версионных миграций схемы базы данных.
+
+Миграции хранятся в каталоге `config.MIGRATIONS_PATH` в виде SQL-файлов
+с именами `NNNN_описание.sql` и применяются по возрастанию номера.
+Номер последней примененной миграции хранится в `PRAGMA user_version`,
+поэтому при каждом запуске применяются только новые файлы. Каждая миграция
+выполняется в отдельной транзакции вместе с обновлением `user_version`;
+сами скрипты пишутся идемпотентно (`IF NOT EXISTS`).
+
+Миграция может объявить требование к сборке SQLite строкой-комментарием
+`-- requires: fts5`. Если требование не выполнено, миграция пропускается
+(версия схемы все равно повышается) и записывается в таблицу
+`SkippedMigrations`, а код, использующий ее объекты, работает в резервном
+режиме. При следующих запусках пропущенные миграции проверяются снова и
+применяются, как только сборка SQLite начнет поддерживать требование
+(например, после обновления). Поэтому такие миграции не должны зависеть
+от порядка применения относительно более поздних.
+"""
+import logging
+import re
+import sqlite3
+from pathlib import Path
+from config import MIGRATIONS_PATH
+from db.database import Database
+import db.queries as q
+
+log = logging.getLogger(__name__)
+
+_MIGRATION_NAME_RE = re.compile(r"^(\d+)_\w+\.sql$")
+_REQUIRES_RE = re.compile(r"^--\s*requires:\s*(.+)$", re.MULTILINE)
+
+# Проверочные операторы для требований миграций (выполняются в базе в памяти)
+_REQUIREMENT_PROBES = {
+    "fts5": "CREATE VIRTUAL TABLE requirement_probe USING fts5(probe, tokenize = 'trigram')",
+}
+
+# Пропущенные из-за требований миграции (служебная таблица мигратора)
+_CREATE_SKIPPED_MIGRATIONS = """
+    CREATE TABLE IF NOT EXISTS SkippedMigrations (
+        Version INTEGER PRIMARY KEY,
+        Name TEXT NOT NULL,
+        Requirements TEXT NOT NULL  -- Невыполненные требования через запятую
+    )
+"""
+_INSERT_SKIPPED_MIGRATION = \
+    "INSERT OR REPLACE INTO SkippedMigrations (Version, Name, Requirements) VALUES (?, ?, ?)"
+_GET_SKIPPED_MIGRATIONS = "SELECT Version, Name FROM SkippedMigrations ORDER BY Version"
+_DELETE_SKIPPED_MIGRATION = "DELETE FROM SkippedMigrations WHERE Version = ?"
+
+
+def discover_migrations(migrations_path=MIGRATIONS_PATH) -> list[tuple[int, Path]]:
+    """
+    Находит файлы миграций и упорядочивает их по номеру версии.
+
+    Args:
+        migrations_path (optional): Каталог с файлами миграций.
+
+    Returns:
+        list[tuple[int, Path]]: Список (версия, путь к файлу) по возрастанию версии.
+
+    Raises:
+        ValueError: Если две миграции имеют одинаковый номер.
+    """
+    migrations = {}
+    for path in Path(migrations_path).glob("*.sql"):
+        match = _MIGRATION_NAME_RE.match(path.name)
+        if not match:
+            log.warning("Файл %s пропущен: имя не соответствует шаблону миграции.", path.name)
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(
+                f"Повторяющийся номер миграции {version}: "
+                f"{migrations[version].name} и {path.name}")
+        migrations[version] = path
+    return sorted(migrations.items())
+
+
+def split_sql_script(script: str) -> list[str]:
+    """
+    Разбивает SQL-скрипт на отдельные завершенные операторы.
+
+    Разбиение идет по `;` с проверкой `sqlite3.complete_statement`, поэтому
+    точки с запятой внутри строк и тел триггеров (BEGIN ... END) не разрывают оператор.
+
+    Args:
+        script (str): Текст SQL-скрипта.
+
+    Returns:
+        list[str]: Список операторов.
+    """
+    statements = []
+    buffer = ""
+    for part in script.split(";"):
+        buffer += part + ";"
+        if sqlite3.complete_statement(buffer):
+            statement = buffer.strip()
+            # Фрагмент из одних комментариев оператором не является
+            if re.sub(r"--[^\n]*", "", statement).strip(" \n\t;"):
+                statements.append(statement)
+            buffer = ""
+    return statements
+
+
+def migration_requirements(script: str) -> list[str]:
+    """
+    Возвращает требования миграции из строк `-- requires: a, b`.
+
+    Args:
+        script (str): Текст SQL-скрипта.
+
+    Returns:
+        list[str]: Список требований в нижнем регистре.
+    """
+    return [name.strip().lower()
+            for line in _REQUIRES_RE.findall(script)
+            for name in line.split(",") if name.strip()]
+
+
+def requirement_available(requirement: str) -> bool:
+    """
+    Проверяет, поддерживает ли используемая сборка SQLite требование миграции.
+
+    Args:
+        requirement (str): Имя требования (например, "fts5").
+
+    Returns:
+        bool: True, если требование выполнено.
+    """
+    probe = _REQUIREMENT_PROBES.get(requirement)
+    if probe is None:
+        log.warning("Неизвестное требование миграции: %s", requirement)
+        return False
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.execute(probe)
+        return True
+    except sqlite3.Error as e:
+        log.debug("Требование %s не выполнено: %s", requirement, e)
+        return False
+    finally:
+        conn.close()
+
+
+def get_schema_version(db: Database) -> int:
+    """
+    Возвращает текущую версию схемы (`PRAGMA user_version`).
+
+    Args:
+        db (Database): Объект базы данных.
+
+    Returns:
+        int: Номер последней примененной миграции (0 - миграции не применялись).
+    """
+    result = db.fetch_one("PRAGMA user_version")
+    return result[0] if result else 0
+
+
+def apply_migrations(db: Database, migrations_path=MIGRATIONS_PATH) -> bool:
+    """
+    Применяет к базе все миграции с номером больше текущей версии схемы.
+
+    Args:
+        db (Database): Объект базы данных.
+        migrations_path (optional): Каталог с файлами миграций.
+
+    Returns:
+        bool: True, если схема актуальна, False при ошибке миграции
+              (изменения неудавшейся миграции откатываются).
+    """
+    try:
+        migrations = discover_migrations(migrations_path)
+    except (OSError, ValueError) as e:
+        log.error("Не удалось получить список миграций: %s", e)
+        return False
+
+    current = get_schema_version(db)
+    latest = migrations[-1][0] if migrations else 0
+    if current > latest:
+        log.warning(
+            "Версия схемы БД (%s) новее известных миграций (%s).", current, latest)
+        return True
+
+    for version, path in migrations:
+        if version <= current:
+            continue
+        log.info("Применение миграции %s (версия %s -> %s)", path.name, current, version)
+        try:
+            script = path.read_text(encoding="utf-8")
+            missing = [name for name in migration_requirements(script)
+                       if not requirement_available(name)]
+            if missing:
+                log.warning("Миграция %s пропущена: SQLite не поддерживает %s",
+                            path.name, ", ".join(missing))
+                statements = []
+            else:
+                statements = split_sql_script(script)
+            with db.transaction():
+                _execute_statements(db, statements)
+                if missing:
+                    # Запоминаем миграцию, чтобы применить ее, когда требование появится
+                    if not (db.execute_query(_CREATE_SKIPPED_MIGRATIONS)
+                            and db.execute_query(_INSERT_SKIPPED_MIGRATION,
+                                                 (version, path.name, ", ".join(missing)))):
+                        raise sqlite3.OperationalError("не удалось записать пропущенную миграцию")
+                # Версия обновляется в той же транзакции, что и сама миграция
+                if not db.execute_query(f"PRAGMA user_version = {int(version)}"):
+                    raise sqlite3.OperationalError("не удалось обновить user_version")
+        except (OSError, sqlite3.Error) as e:
+            log.error("Миграция %s не применена: %s", path.name, e)
+            return False
+        current = version
+
+    if not retry_skipped_migrations(db, migrations):
+        return False
+    log.info("Схема БД актуальна (версия %s).", current)
+    return True
+
+
+def get_skipped_migrations(db: Database) -> list[tuple[int, str]]:
+    """
+    Возвращает миграции, пропущенные из-за невыполненных требований.
+
+    Args:
+        db (Database): Объект базы данных.
+
+    Returns:
+        list[tuple[int, str]]: Список (версия, имя файла) по возрастанию версии.
+    """
+    if not db.fetch_one(q.CHECK_TABLE_EXISTS, ("SkippedMigrations",)):
+        return []
+    return db.fetch_all(_GET_SKIPPED_MIGRATIONS) or []
+
+
+def retry_skipped_migrations(db: Database, migrations: list[tuple[int, Path]]) -> bool:
+    """
+    Применяет ранее пропущенные миграции, требования которых теперь выполнены.
+
+    Миграция, требование которой по-прежнему не выполнено, остается в списке
+    пропущенных до следующего запуска.
+
+    Args:
+        db (Database): Объект базы данных.
+        migrations (list[tuple[int, Path]]): Известные миграции (`discover_migrations`).
+
+    Returns:
+        bool: True, если ошибок не было, False при ошибке миграции
+              (ее изменения откатываются, и она остается пропущенной).
+    """
+    paths = dict(migrations)
+    for version, name in get_skipped_migrations(db):
+        path = paths.get(version)
+        if path is None:
+            log.warning("Пропущенная миграция %s (версия %s) не найдена.", name, version)
+            continue
+        try:
+            script = path.read_text(encoding="utf-8")
+            missing = [requirement for requirement in migration_requirements(script)
+                       if not requirement_available(requirement)]
+            if missing:
+                log.info("Миграция %s по-прежнему пропущена: SQLite не поддерживает %s",
+                         path.name, ", ".join(missing))
+                continue
+            log.info("Применение ранее пропущенной миграции %s", path.name)
+            with db.transaction():
+                _execute_statements(db, split_sql_script(script))
+                if not db.execute_query(_DELETE_SKIPPED_MIGRATION, (version,)):
+                    raise sqlite3.OperationalError("не удалось обновить SkippedMigrations")
+        except (OSError, sqlite3.Error) as e:
+            log.error("Пропущенная миграция %s не применена: %s", path.name, e)
+            return False
+    return True
+
+
+def _execute_statements(db: Database, statements: list[str]) -> None:
+    """
+    Выполняет операторы миграции (внутри транзакции вызывающего кода).
+
+    Raises:
+        sqlite3.OperationalError: Если оператор не выполнен.
+    """
+    for statement in statements:
+        if not db.execute_query(statement):
+            raise sqlite3.OperationalError(
+                f"ошибка выполнения оператора: {statement}")
@@ -31,9 +31,9 @@ class PositionRepository:
             list[tuple] | None: Список кортежей (ID, Name) или None в случае ошибки.
         """
         log.debug("Запрос всех записей из справочника Positions")
-        result = self.db.fetch_all(q.GET_ALL_POSITIONS)
+        result = self.db.references.get_all("Positions")
         log.debug(
-            f"Получено {len(result) if result else 0} записей о должностях.")
+            "Получено %s записей о должностях.", len(result) if result else 0)
         return result
 
     def get_by_id(self, position_name):
@@ -42,7 +42,7 @@ class PositionRepository:
 
         Примечание: В текущей реализации этот метод фактически ищет по имени,
         так как параметр `position_id` (переименован в `position_name` для ясности)
-        используется в запросе `GET_POSITION_ID`, который ищет по `Name`.
+        содержит название должности (`Name`).
         Метод `get_by_name` является псевдонимом для этого метода.
 
         Args:
@@ -51,17 +51,16 @@ class PositionRepository:
         Returns:
             int | None: ID найденной должности или None, если должность не найдена или произошла ошибка.
         """
-        log.debug(f"Запрос ID должности по названию: '{position_name}'")
-        result = self.db.fetch_one(q.GET_POSITION_ID, (position_name,))
-        found_id = result[0] if result else None
-        log.debug(f"Результат поиска ID должности: {found_id}")
+        log.debug("Запрос ID должности по названию: '%s'", position_name)
+        found_id = self.db.references.get_id("Positions", position_name)
+        log.debug("Результат поиска ID должности: %s", found_id)
         return found_id
 
     def get_by_name(self, name):
         """
         Возвращает ID должности по её названию.
 
-        Является псевдонимом для метода `get_by_id` из-за текущей реализации запроса.
+        Является псевдонимом для метода `get_by_id`.
 
         Args:
             name (str): Название должности для поиска.
@@ -81,11 +80,11 @@ class PositionRepository:
         Returns:
             list[tuple] | None: Список кортежей с названиями отделов [(Name,), ...] или None в случае ошибки.
         """
-        log.debug(f"Запрос отделов для должности ID={position_id}")
+        log.debug("Запрос отделов для должности ID=%s", position_id)
         result = self.db.fetch_all(
             q.GET_DEPARTMENTS_FOR_POSITION, (position_id,))
         log.debug(
-            f"Найдено {len(result) if result else 0} отделов для должности ID={position_id}.")
+            "Найдено %s отделов для должности ID=%s.", len(result) if result else 0, position_id)
         return result
 
     def get_positions(self):
@@ -96,7 +95,8 @@ class PositionRepository:
             list[tuple] | None: Список кортежей с названиями должностей [(Name,), ...] или None в случае ошибки.
         """
         log.debug("Запрос названий всех должностей")
-        result = self.db.fetch_all(q.GET_POSITIONS)
+        rows = self.db.references.get_all("Positions")
+        result = [(name,) for _, name in rows] if rows is not None else None
         log.debug(
-            f"Получено {len(result) if result else 0} названий должностей.")
+            "Получено %s названий должностей.", len(result) if result else 0)
         return result
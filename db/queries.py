@@ -10,8 +10,18 @@
 - Отчеты (Reports)
 
 Имена констант отражают назначение конкретного SQL-запроса.
+
+Постраничные запросы (keyset-пагинация) собираются как
+базовый запрос + поиск + *_KEYSET (строки после курсора) + *_ORDER_BY + PAGE_LIMIT.
+Курсор - значения ключа сортировки последней строки предыдущей страницы.
+Строки с произвольной позиции без известного курсора читаются через PAGE_OFFSET.
 """
 
+# Ограничение размера страницы для постраничных запросов
+PAGE_LIMIT = " LIMIT :page_size"
+# Пропуск строк (окна виртуальной таблицы без курсора); добавляется после PAGE_LIMIT
+PAGE_OFFSET = " OFFSET :offset"
+
 # ==============================================================================
 # Сотрудники (Employees)
 # ==============================================================================
@@ -27,12 +37,19 @@ GET_EMPLOYEES = """
     JOIN States AS S ON E.StateID = S.ID
     WHERE 1=1
 """
+# Поиск через LIKE (короткие строки и базы без FTS). py_lower (db.database.register_functions)
+# приводит к нижнему регистру с учетом Unicode: встроенный LIKE учитывает регистр кириллицы
 GET_EMPLOYEES_SEARCH = """
-   AND (E.PersonnelNumber LIKE :search_term OR E.LastName LIKE :search_term OR E.FirstName LIKE :search_term OR
-        E.MiddleName LIKE :search_term OR E.BirthDate LIKE :search_term OR G.GenderName LIKE :search_term OR
-        P.Name LIKE :search_term OR D.Name LIKE :search_term OR S.StateName LIKE :search_term)
+   AND (py_lower(E.PersonnelNumber) LIKE py_lower(:search_term) OR
+        py_lower(E.LastName) LIKE py_lower(:search_term) OR
+        py_lower(E.FirstName) LIKE py_lower(:search_term) OR
+        py_lower(E.MiddleName) LIKE py_lower(:search_term) OR
+        py_lower(E.BirthDate) LIKE py_lower(:search_term) OR
+        py_lower(G.GenderName) LIKE py_lower(:search_term) OR py_lower(P.Name) LIKE py_lower(:search_term) OR
+        py_lower(D.Name) LIKE py_lower(:search_term) OR py_lower(S.StateName) LIKE py_lower(:search_term))
 """
 GET_EMPLOYEES_ORDER_BY = " ORDER BY E.PersonnelNumber"
+GET_EMPLOYEES_KEYSET = " AND E.PersonnelNumber > :after_pn"
 
 GET_EMPLOYEES_COUNT = """
     SELECT COUNT(*) FROM Employees AS E
@@ -42,6 +59,27 @@ GET_EMPLOYEES_COUNT = """
 """
 GET_EMPLOYEES_COUNT_SEARCH = GET_EMPLOYEES_SEARCH
 
+# Полнотекстовый поиск (EmployeesFTS, миграция 0003). :fts_query - фраза FTS5
+GET_EMPLOYEES_FTS_SEARCH = """
+   AND E.rowid IN (SELECT rowid FROM EmployeesFTS WHERE EmployeesFTS MATCH :fts_query)
+"""
+# Поиск с ранжированием по релевантности (bm25)
+GET_EMPLOYEES_FTS_RANKED = """
+    SELECT
+        E.PersonnelNumber, E.LastName, E.FirstName, E.MiddleName, E.BirthDate,
+        G.GenderName, P.Name AS PositionName, D.Name AS DepartmentName, S.StateName
+    FROM EmployeesFTS AS F
+    JOIN Employees AS E ON E.rowid = F.rowid
+    JOIN Genders AS G ON E.GenderID = G.ID
+    JOIN Positions AS P ON E.PositionID = P.ID
+    JOIN Departments AS D ON E.DepartmentID = D.ID
+    JOIN States AS S ON E.StateID = S.ID
+    WHERE EmployeesFTS MATCH :fts_query
+"""
+GET_EMPLOYEES_FTS_RANKED_ORDER_BY = " ORDER BY F.rank, E.PersonnelNumber"
+# Проверка наличия таблицы (индексы FTS создаются, только если SQLite поддерживает FTS5)
+CHECK_TABLE_EXISTS = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+
 INSERT_EMPLOYEE = """
     INSERT INTO Employees (PersonnelNumber, LastName, FirstName, MiddleName, BirthDate,
                           GenderID, PositionID, DepartmentID, StateID)
@@ -78,13 +116,13 @@ CHECK_PERSONNEL_NUMBER_EXISTS = """
 """
 GET_ACTIVE_EMPLOYEE_COUNT = """
     SELECT COUNT(PersonnelNumber) FROM Employees
-    WHERE StateID = (SELECT ID FROM States WHERE StateName = 'Работает')
+    WHERE StateID = :active_state_id
 """
 GET_EMPLOYEES_COUNT_BY_DEPARTMENT = """
     SELECT D.Name, COUNT(E.PersonnelNumber)
     FROM Employees E
     JOIN Departments D ON E.DepartmentID = D.ID
-    WHERE E.StateID = (SELECT ID FROM States WHERE StateName = 'Работает')
+    WHERE E.StateID = :active_state_id
     GROUP BY D.Name
     ORDER BY COUNT(E.PersonnelNumber) DESC;
 """
@@ -92,33 +130,72 @@ GET_EMPLOYEES_COUNT_BY_POSITION_TOP_N = """
     SELECT P.Name, COUNT(E.PersonnelNumber) as EmpCount
     FROM Employees E
     JOIN Positions P ON E.PositionID = P.ID
-    WHERE E.StateID = (SELECT ID FROM States WHERE StateName = 'Работает')
+    WHERE E.StateID = :active_state_id
     GROUP BY P.Name
     ORDER BY EmpCount DESC
-    LIMIT ?;
+    LIMIT :limit;
 """
 GET_ACTIVE_EMPLOYEE_BIRTH_DATES = """
     SELECT BirthDate FROM Employees
-    WHERE StateID = (SELECT ID FROM States WHERE StateName = 'Работает')
+    WHERE StateID = :active_state_id
     AND BirthDate IS NOT NULL AND BirthDate != '';
 """
 GET_GENDER_DISTRIBUTION = """
     SELECT G.GenderName, COUNT(E.PersonnelNumber)
     FROM Employees E
     JOIN Genders G ON E.GenderID = G.ID
-    WHERE E.StateID = (SELECT ID FROM States WHERE StateName = 'Работает')
+    WHERE E.StateID = :active_state_id
     GROUP BY G.GenderName
     ORDER BY COUNT(E.PersonnelNumber) DESC;
 """
+# Показатели дашборда из сводных таблиц (миграция 0005, поддерживаются триггерами)
+GET_HEADCOUNT_ACTIVE_TOTAL = """
+    SELECT IFNULL(SUM(EmployeeCount), 0) FROM HeadcountSummary
+    WHERE StateID = :active_state_id
+"""
+GET_HEADCOUNT_BY_DEPARTMENT = """
+    SELECT D.Name, SUM(H.EmployeeCount) AS EmpCount
+    FROM HeadcountSummary H
+    JOIN Departments D ON H.DepartmentID = D.ID
+    WHERE H.StateID = :active_state_id
+    GROUP BY D.Name
+    ORDER BY EmpCount DESC
+"""
+GET_HEADCOUNT_BY_POSITION_TOP_N = """
+    SELECT P.Name, SUM(H.EmployeeCount) AS EmpCount
+    FROM HeadcountSummary H
+    JOIN Positions P ON H.PositionID = P.ID
+    WHERE H.StateID = :active_state_id
+    GROUP BY P.Name
+    ORDER BY EmpCount DESC
+    LIMIT :limit
+"""
+GET_HEADCOUNT_BY_GENDER = """
+    SELECT G.GenderName, SUM(H.EmployeeCount) AS EmpCount
+    FROM HeadcountSummary H
+    JOIN Genders G ON H.GenderID = G.ID
+    WHERE H.StateID = :active_state_id
+    GROUP BY G.GenderName
+    ORDER BY EmpCount DESC
+"""
+# Полных лет на дату :today_key (ГГГГММДД): разность ключей ГГГГММДД, деленная на 10000
+GET_HEADCOUNT_BY_AGE = """
+    SELECT (:today_key - CAST(strftime('%Y%m%d', BirthDate) AS INTEGER)) / 10000 AS Age,
+           SUM(EmployeeCount)
+    FROM BirthDateSummary
+    WHERE StateID = :active_state_id AND strftime('%Y%m%d', BirthDate) IS NOT NULL
+    GROUP BY Age
+    ORDER BY Age
+"""
 GET_EMPLOYEE_LIST_FOR_ABSENCE = """
     SELECT PersonnelNumber, LastName || ' ' || FirstName || COALESCE(' ' || MiddleName, '') AS FullName
-    FROM Employees WHERE StateID = (SELECT ID FROM States WHERE StateName = 'Работает')
+    FROM Employees WHERE StateID = :active_state_id
     ORDER BY LastName, FirstName
 """
 GET_ACTIVE_EMPLOYEES_FOR_LINKING = """
     SELECT PersonnelNumber, LastName || ' ' || FirstName || COALESCE(' ' || MiddleName, '') AS FullName
     FROM Employees
-    WHERE StateID = (SELECT ID FROM States WHERE StateName = 'Работает')
+    WHERE StateID = :active_state_id
     ORDER BY LastName, FirstName;
 """
 
@@ -126,22 +203,26 @@ GET_ACTIVE_EMPLOYEES_FOR_LINKING = """
 # Справочники (Genders, Positions, Departments, States, Events, Roles)
 # ==============================================================================
 
+# Справочники загружаются целиком и кэшируются (db.reference_cache.ReferenceCache);
+# поиск ID по названию выполняется в памяти.
+
+# Названия записей справочников, на которые опирается логика приложения
+STATE_ACTIVE = "Работает"
+EVENT_HIRE = "Прием"
+EVENT_DISMISSAL = "Увольнение"
+ROLE_ADMIN = "Администратор"
+
 # --- Справочник: Пол (Genders) ---
 GET_GENDERS = "SELECT ID, GenderName FROM Genders"
-GET_GENDER_ID = "SELECT ID FROM Genders WHERE GenderName = ?"
 
 # --- Справочник: Должности (Positions) ---
 GET_ALL_POSITIONS = "SELECT ID, Name FROM Positions"
-GET_POSITION_ID = "SELECT ID FROM Positions WHERE Name = ?"
-GET_POSITIONS = "SELECT Name FROM Positions"
 
 # --- Справочник: Состояния (States) ---
 GET_STATES = "SELECT ID, StateName FROM States"
-GET_STATE_ID = "SELECT ID FROM States WHERE StateName = ?"
 
 # --- Справочник: Отделы (Departments) ---
 GET_DEPARTMENTS = "SELECT ID, Name FROM Departments"
-GET_DEPARTMENT_ID_BY_NAME = "SELECT ID FROM Departments WHERE Name = ?"
 GET_DEPARTMENTS_FOR_POSITION = """
     SELECT D.Name FROM Departments AS D
     INNER JOIN PositionDepartments AS PD ON D.ID = PD.DepartmentID
@@ -150,33 +231,49 @@ GET_DEPARTMENTS_FOR_POSITION = """
 
 # --- Справочник: Кадровые события (Events) ---
 GET_ALL_EVENTS = "SELECT ID, EventName FROM Events"
-GET_EVENT_ID_BY_NAME = "SELECT ID FROM Events WHERE EventName = ?"
 
 # --- Справочник: Роли пользователей (Roles) ---
 GET_ALL_ROLES_ORDERED = "SELECT ID, RoleName FROM Roles ORDER BY RoleName"
-GET_ROLE_ID_BY_NAME = "SELECT ID FROM Roles WHERE RoleName = ?"
-GET_ROLE_NAME_BY_ID = "SELECT RoleName FROM Roles WHERE ID = ?"
-GET_ADMIN_ROLE_ID = "SELECT ID FROM Roles WHERE RoleName = 'Администратор'"
 
 # ==============================================================================
 # Кадровые события (EmployeeEvents)
 # ==============================================================================
 
-GET_EMPLOYEE_EVENTS = """
-    SELECT EE.EventDate, EV.EventName, E.PersonnelNumber,
+_EMPLOYEE_EVENTS_COLUMNS = """
+    EE.EventDate, EV.EventName, E.PersonnelNumber,
            E.LastName || ' ' || E.FirstName || COALESCE(' ' || E.MiddleName, '') AS FullName,
-           P.Name AS NewPositionName, D.Name AS NewDepartmentName, EE.Reason
+           P.Name AS NewPositionName, D.Name AS NewDepartmentName, EE.Reason"""
+_EMPLOYEE_EVENTS_FROM = """
     FROM EmployeeEvents AS EE
     JOIN Events AS EV ON EE.EventID = EV.ID JOIN Employees AS E ON EE.EmployeePersonnelNumber = E.PersonnelNumber
     LEFT JOIN Positions AS P ON EE.PositionID = P.ID LEFT JOIN Departments AS D ON EE.DepartmentID = D.ID
     WHERE 1=1
 """
+GET_EMPLOYEE_EVENTS = "SELECT" + _EMPLOYEE_EVENTS_COLUMNS + _EMPLOYEE_EVENTS_FROM
+# Для страницы дополнительно выбирается EE.ID (последний столбец) - часть ключа курсора
+GET_EMPLOYEE_EVENTS_PAGE = "SELECT" + _EMPLOYEE_EVENTS_COLUMNS + \
+    ", EE.ID" + _EMPLOYEE_EVENTS_FROM
 GET_EMPLOYEE_EVENTS_SEARCH = """
-   AND (EE.EventDate LIKE :search_term OR EV.EventName LIKE :search_term OR E.PersonnelNumber LIKE :search_term OR
-        E.LastName LIKE :search_term OR E.FirstName LIKE :search_term OR E.MiddleName LIKE :search_term OR
-        P.Name LIKE :search_term OR D.Name LIKE :search_term OR EE.Reason LIKE :search_term)
+   AND (py_lower(EE.EventDate) LIKE py_lower(:search_term) OR
+        py_lower(EV.EventName) LIKE py_lower(:search_term) OR
+        py_lower(E.PersonnelNumber) LIKE py_lower(:search_term) OR
+        py_lower(E.LastName) LIKE py_lower(:search_term) OR
+        py_lower(E.FirstName) LIKE py_lower(:search_term) OR
+        py_lower(E.MiddleName) LIKE py_lower(:search_term) OR py_lower(P.Name) LIKE py_lower(:search_term) OR
+        py_lower(D.Name) LIKE py_lower(:search_term) OR py_lower(EE.Reason) LIKE py_lower(:search_term))
+"""
+# Полнотекстовый поиск (EmployeeEventsFTS, миграция 0004)
+GET_EMPLOYEE_EVENTS_FTS_SEARCH = """
+   AND EE.ID IN (SELECT rowid FROM EmployeeEventsFTS WHERE EmployeeEventsFTS MATCH :fts_query)
+"""
+# Ключ сортировки - COALESCE(дата, ''): события без даты идут последними и тоже
+# листаются по курсору (индекс idx_EmployeeEvents_EventDateKey_ID, миграция 0010)
+GET_EMPLOYEE_EVENTS_ORDER_BY = " ORDER BY COALESCE(EE.EventDate, '') DESC, EE.ID DESC"
+# Отдельное условие по дате нужно, чтобы SQLite искал по индексу выражения диапазоном
+GET_EMPLOYEE_EVENTS_KEYSET = """
+   AND COALESCE(EE.EventDate, '') <= :after_date
+   AND (COALESCE(EE.EventDate, ''), EE.ID) < (:after_date, :after_id)
 """
-GET_EMPLOYEE_EVENTS_ORDER_BY = " ORDER BY EE.EventDate DESC, EE.ID DESC"
 
 GET_EMPLOYEE_EVENTS_COUNT = """
     SELECT COUNT(EE.ID) FROM EmployeeEvents AS EE
@@ -186,6 +283,46 @@ GET_EMPLOYEE_EVENTS_COUNT = """
 """
 GET_EMPLOYEE_EVENTS_COUNT_SEARCH = GET_EMPLOYEE_EVENTS_SEARCH
 
+# --- Периоды работы (EmploymentSpans) ---
+# Пересчет периодов по истории событий (как начальное заполнение в миграции 0006):
+# не зависит от порядка, в котором события добавлялись. Полный пересчет - все
+# сотрудники, *_FOR_EMPLOYEE - один сотрудник (после приема или увольнения)
+DELETE_ALL_EMPLOYMENT_SPANS = "DELETE FROM EmploymentSpans"
+DELETE_EMPLOYEE_EMPLOYMENT_SPANS = "DELETE FROM EmploymentSpans WHERE EmployeePersonnelNumber = :pn"
+# Закрытые периоды: каждое увольнение с последним приемом не позже его даты
+REBUILD_CLOSED_EMPLOYMENT_SPANS = """
+    INSERT INTO EmploymentSpans (EmployeePersonnelNumber, HireDate, DismissalDate, DismissalReason,
+                                 PositionID, DepartmentID)
+    SELECT D.EmployeePersonnelNumber,
+           (SELECT MAX(H.EventDate) FROM EmployeeEvents AS H
+            WHERE H.EmployeePersonnelNumber = D.EmployeePersonnelNumber
+              AND H.EventID = :hire_event_id AND H.EventDate <= D.EventDate),
+           D.EventDate, D.Reason,
+           COALESCE(D.PositionID, E.PositionID), COALESCE(D.DepartmentID, E.DepartmentID)
+    FROM EmployeeEvents AS D
+    LEFT JOIN Employees AS E ON D.EmployeePersonnelNumber = E.PersonnelNumber
+    WHERE D.EventID = :dismissal_event_id AND D.EventDate IS NOT NULL
+"""
+# Открытые периоды: прием, после которого (по дате и ID) не было ни увольнения, ни другого приема
+REBUILD_OPEN_EMPLOYMENT_SPANS = """
+    INSERT INTO EmploymentSpans (EmployeePersonnelNumber, HireDate, DismissalDate, DismissalReason,
+                                 PositionID, DepartmentID)
+    SELECT H.EmployeePersonnelNumber, H.EventDate, NULL, NULL,
+           COALESCE(H.PositionID, E.PositionID), COALESCE(H.DepartmentID, E.DepartmentID)
+    FROM EmployeeEvents AS H
+    LEFT JOIN Employees AS E ON H.EmployeePersonnelNumber = E.PersonnelNumber
+    WHERE H.EventID = :hire_event_id AND H.EventDate IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM EmployeeEvents AS X
+          WHERE X.EmployeePersonnelNumber = H.EmployeePersonnelNumber
+            AND X.EventID IN (:hire_event_id, :dismissal_event_id)
+            AND (X.EventDate, X.ID) > (H.EventDate, H.ID))
+"""
+REBUILD_CLOSED_EMPLOYMENT_SPANS_FOR_EMPLOYEE = REBUILD_CLOSED_EMPLOYMENT_SPANS + \
+    "    AND D.EmployeePersonnelNumber = :pn\n"
+REBUILD_OPEN_EMPLOYMENT_SPANS_FOR_EMPLOYEE = REBUILD_OPEN_EMPLOYMENT_SPANS + \
+    "      AND H.EmployeePersonnelNumber = :pn\n"
+
 INSERT_EMPLOYEE_EVENT = """
     INSERT INTO EmployeeEvents (EmployeePersonnelNumber, EventID, EventDate, DepartmentID, PositionID, Reason)
     VALUES (?, ?, ?, ?, ?, ?)
@@ -197,6 +334,11 @@ GET_EVENT_COUNT_LAST_DAYS = """
     WHERE EV.EventName = ?
     AND EE.EventDate BETWEEN ? AND ?;
 """
+# То же по сводной таблице событий по дням (миграция 0005)
+GET_EVENT_COUNT_FROM_SUMMARY = """
+    SELECT IFNULL(SUM(EventCount), 0) FROM EventDailySummary
+    WHERE EventID = ? AND EventDate BETWEEN ? AND ?
+"""
 
 # ==============================================================================
 # Отсутствия (Absences)
@@ -217,12 +359,25 @@ GET_ABSENCES = """
     WHERE 1=1
 """
 GET_ABSENCES_SEARCH = """
-    AND (E.PersonnelNumber LIKE :search_term OR E.LastName LIKE :search_term OR E.FirstName LIKE :search_term OR
-         E.MiddleName LIKE :search_term OR A.AbsenceDate LIKE :search_term OR
-         (CASE A.FullDay WHEN 1 THEN 'Да' ELSE 'Нет' END) LIKE :search_term OR
-         A.StartingTime LIKE :search_term OR A.EndingTime LIKE :search_term OR A.Reason LIKE :search_term)
+    AND (py_lower(E.PersonnelNumber) LIKE py_lower(:search_term) OR
+         py_lower(E.LastName) LIKE py_lower(:search_term) OR
+         py_lower(E.FirstName) LIKE py_lower(:search_term) OR
+         py_lower(E.MiddleName) LIKE py_lower(:search_term) OR
+         py_lower(A.AbsenceDate) LIKE py_lower(:search_term) OR
+         py_lower(CASE A.FullDay WHEN 1 THEN 'Да' ELSE 'Нет' END) LIKE py_lower(:search_term) OR
+         py_lower(A.StartingTime) LIKE py_lower(:search_term) OR
+         py_lower(A.EndingTime) LIKE py_lower(:search_term) OR py_lower(A.Reason) LIKE py_lower(:search_term))
+"""
+# Полнотекстовый поиск (AbsencesFTS, миграция 0004)
+GET_ABSENCES_FTS_SEARCH = """
+    AND A.ID IN (SELECT rowid FROM AbsencesFTS WHERE AbsencesFTS MATCH :fts_query)
+"""
+# Ключ сортировки - COALESCE(дата, ''), как у событий (idx_Absences_AbsenceDateKey_ID)
+GET_ABSENCES_ORDER_BY = " ORDER BY COALESCE(A.AbsenceDate, '') DESC, A.ID DESC"
+GET_ABSENCES_KEYSET = """
+    AND COALESCE(A.AbsenceDate, '') <= :after_date
+    AND (COALESCE(A.AbsenceDate, ''), A.ID) < (:after_date, :after_id)
 """
-GET_ABSENCES_ORDER_BY = " ORDER BY A.AbsenceDate DESC, E.LastName, E.FirstName"
 
 GET_ABSENCES_COUNT = """
     SELECT COUNT(A.ID) FROM Absences AS A
@@ -274,10 +429,14 @@ GET_USERS_BASE = """
     WHERE 1=1
 """
 GET_USERS_SEARCH = """
-    AND (U.Login LIKE :search_term OR U.Email LIKE :search_term OR R.RoleName LIKE :search_term
-         OR E.LastName LIKE :search_term OR E.FirstName LIKE :search_term OR U.EmployeePersonnelNumber LIKE :search_term)
+    AND (py_lower(U.Login) LIKE py_lower(:search_term) OR py_lower(U.Email) LIKE py_lower(:search_term) OR
+         py_lower(R.RoleName) LIKE py_lower(:search_term) OR
+         py_lower(E.LastName) LIKE py_lower(:search_term) OR
+         py_lower(E.FirstName) LIKE py_lower(:search_term) OR
+         py_lower(U.EmployeePersonnelNumber) LIKE py_lower(:search_term))
 """
 GET_USERS_ORDER_BY = " ORDER BY U.Login"
+GET_USERS_KEYSET = " AND U.Login > :after_login"
 
 GET_USERS_COUNT_BASE = """
     SELECT COUNT(U.ID)
@@ -320,89 +479,102 @@ GET_ADMIN_COUNT = """
 # ==============================================================================
 
 # --- Отчет по увольнениям ---
+# Увольнения по периодам: диапазон юлианских дней (EventDay, миграция 0009)
+# по индексу (EventID, EventDay); ключи группировки - целые числа
 GET_DISMISSAL_COUNT_BY_MONTH = """
     SELECT
-        substr(EE.EventDate, 1, 7) AS DismissalMonth, -- 'YYYY-MM'
-        COUNT(EE.ID) AS DismissalCount
-    FROM EmployeeEvents AS EE
-    JOIN Events AS EV ON EE.EventID = EV.ID
-    WHERE EV.EventName = 'Увольнение'
-      AND EE.EventDate BETWEEN ? AND ?
+        CAST(strftime('%Y%m', EventDate) AS INTEGER) AS DismissalMonth, -- ГГГГММ
+        COUNT(*) AS DismissalCount
+    FROM EmployeeEvents
+    WHERE EventID = :dismissal_event_id
+      AND EventDay BETWEEN :start_day AND :end_day
     GROUP BY DismissalMonth
     ORDER BY DismissalMonth ASC;
 """
 GET_DISMISSAL_COUNT_BY_DAY = """
     SELECT
-        EE.EventDate AS DismissalDay, -- 'YYYY-MM-DD'
-        COUNT(EE.ID) AS DismissalCount
-    FROM EmployeeEvents AS EE
-    JOIN Events AS EV ON EE.EventID = EV.ID
-    WHERE EV.EventName = 'Увольнение'
-      AND EE.EventDate BETWEEN ? AND ?
+        EventDay AS DismissalDay, -- юлианский день
+        COUNT(*) AS DismissalCount
+    FROM EmployeeEvents
+    WHERE EventID = :dismissal_event_id
+      AND EventDay BETWEEN :start_day AND :end_day
     GROUP BY DismissalDay
     ORDER BY DismissalDay ASC;
 """
 GET_DISMISSAL_COUNT_BY_YEAR = """
     SELECT
-        substr(EE.EventDate, 1, 4) AS DismissalYear, -- 'YYYY'
-        COUNT(EE.ID) AS DismissalCount
-    FROM EmployeeEvents AS EE
-    JOIN Events AS EV ON EE.EventID = EV.ID
-    WHERE EV.EventName = 'Увольнение'
-      AND EE.EventDate BETWEEN ? AND ?
+        CAST(strftime('%Y', EventDate) AS INTEGER) AS DismissalYear, -- ГГГГ
+        COUNT(*) AS DismissalCount
+    FROM EmployeeEvents
+    WHERE EventID = :dismissal_event_id
+      AND EventDay BETWEEN :start_day AND :end_day
     GROUP BY DismissalYear
     ORDER BY DismissalYear ASC;
 """
+# Периоды работы (EmploymentSpans, миграция 0006): один диапазон по индексу дат увольнения
 GET_DISMISSED_EMPLOYEES_DETAILS = """
     SELECT
         E.PersonnelNumber,
         E.LastName || ' ' || E.FirstName || COALESCE(' ' || E.MiddleName, '') AS FullName,
         P.Name AS PositionName,
         D.Name AS DepartmentName,
-        (SELECT MAX(EventDate)
-         FROM EmployeeEvents AS EE_Hire
-         JOIN Events AS EV_Hire ON EE_Hire.EventID = EV_Hire.ID
-         WHERE EE_Hire.EmployeePersonnelNumber = E.PersonnelNumber
-           AND EV_Hire.EventName = 'Прием'
-           AND EE_Hire.EventDate <= EE_Dismiss.EventDate
-        ) AS HireDate,
-        EE_Dismiss.EventDate AS DismissalDate,
-        EE_Dismiss.Reason AS DismissalReason
-    FROM EmployeeEvents AS EE_Dismiss
-    JOIN Employees AS E ON EE_Dismiss.EmployeePersonnelNumber = E.PersonnelNumber
-    JOIN Events AS EV ON EE_Dismiss.EventID = EV.ID
-    LEFT JOIN Positions AS P ON E.PositionID = P.ID
-    LEFT JOIN Departments AS D ON E.DepartmentID = D.ID
-    WHERE EV.EventName = 'Увольнение'
-      AND EE_Dismiss.EventDate BETWEEN ? AND ?
-    ORDER BY EE_Dismiss.EventDate DESC;
+        S.HireDate,
+        S.DismissalDate,
+        S.DismissalReason
+    FROM EmploymentSpans AS S
+    JOIN Employees AS E ON S.EmployeePersonnelNumber = E.PersonnelNumber
+    LEFT JOIN Positions AS P ON S.PositionID = P.ID
+    LEFT JOIN Departments AS D ON S.DepartmentID = D.ID
+    WHERE S.DismissalDate BETWEEN ? AND ?
+    ORDER BY S.DismissalDate DESC;
 """
 
 # --- Отчет по отсутствиям ---
+# Дата и время - целыми числами (AbsenceDay, StartMinute, EndMinute; миграция 0009)
 GET_ABSENCES_DETAILS_FOR_REPORT = """
     SELECT
         EmployeePersonnelNumber,
-        AbsenceDate,
+        AbsenceDay,
         FullDay,
-        StartingTime,
-        EndingTime,
+        StartMinute,
+        EndMinute,
         ScheduleID
     FROM Absences
-    WHERE AbsenceDate BETWEEN ? AND ?
-    ORDER BY EmployeePersonnelNumber, AbsenceDate;
+    WHERE AbsenceDay BETWEEN ? AND ?
+    ORDER BY EmployeePersonnelNumber, AbsenceDay;
 """
-GET_RAW_ABSENCE_DATA_FOR_SUMMATION = """
+# Суммы минут по сотрудникам за период (AbsenceDailyMinutes, миграция 0007)
+GET_ABSENCE_MINUTES_BY_EMPLOYEE = """
     SELECT
-        A.EmployeePersonnelNumber, -- 0
-        E.LastName || ' ' || E.FirstName || COALESCE(' ' || E.MiddleName, '') AS FullName, -- 1
-        E.PositionID,             -- 2
-        A.AbsenceDate,            -- 3
-        A.FullDay,                -- 4
-        A.StartingTime,           -- 5
-        A.EndingTime,             -- 6
-        A.ScheduleID              -- 7
-    FROM Absences AS A
-    JOIN Employees AS E ON A.EmployeePersonnelNumber = E.PersonnelNumber
-    WHERE A.AbsenceDate BETWEEN ? AND ?
-    ORDER BY A.EmployeePersonnelNumber, A.AbsenceDate;
+        M.EmployeePersonnelNumber,
+        E.LastName || ' ' || E.FirstName || COALESCE(' ' || E.MiddleName, '') AS FullName,
+        SUM(M.Minutes) AS TotalMinutes
+    FROM AbsenceDailyMinutes AS M
+    JOIN Employees AS E ON M.EmployeePersonnelNumber = E.PersonnelNumber
+    WHERE M.AbsenceDate BETWEEN ? AND ?
+    GROUP BY M.EmployeePersonnelNumber
+    HAVING SUM(M.Minutes) > 0
+    ORDER BY TotalMinutes DESC;
+"""
+# Полный пересчет (после изменения графиков работы)
+DELETE_ALL_ABSENCE_DAILY_MINUTES = "DELETE FROM AbsenceDailyMinutes"
+REBUILD_ABSENCE_DAILY_MINUTES = """
+    INSERT INTO AbsenceDailyMinutes (AbsenceDate, EmployeePersonnelNumber, Minutes)
+    SELECT AbsenceDate, EmployeePersonnelNumber, SUM(Minutes)
+    FROM AbsenceDurations
+    GROUP BY AbsenceDate, EmployeePersonnelNumber
+"""
+
+# ==============================================================================
+# Журнал изменений (ChangeLog, миграция 0008)
+# ==============================================================================
+
+GET_CHANGES_SINCE = """
+    SELECT Version, Entity, EntityKey, Operation
+    FROM ChangeLog
+    WHERE Version > ?
+    ORDER BY Version
 """
+# Отдельные подзапросы: MIN и MAX по первичному ключу читаются без сканирования
+GET_CHANGE_LOG_BOUNDS = "SELECT (SELECT MIN(Version) FROM ChangeLog), (SELECT MAX(Version) FROM ChangeLog)"
+PRUNE_CHANGE_LOG = "DELETE FROM ChangeLog WHERE Version <= ?"
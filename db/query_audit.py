@@ -0,0 +1,353 @@
+# db/query_audit.py
+"""
+Офлайн-аудит планов выполнения SQL-запросов.
+
+Перебирает все SQL-константы из `db.queries`, а также составные варианты,
+которые собирают репозитории (базовый запрос + поиск + сортировка), и для
+каждого выполняет `EXPLAIN QUERY PLAN` на базе со схемой из
+`db/create_tables.sql` и всеми миграциями. В отчет попадают:
+
+- полные сканирования таблиц (кроме маленьких справочников);
+- временные B-деревья для ORDER BY / GROUP BY / DISTINCT;
+- коррелированные подзапросы;
+- автоматические (временные) индексы.
+
+Найденные проблемы сравниваются с базовой линией (`query_audit_baseline.json`):
+новые проблемы приводят к коду возврата 1, что позволяет использовать аудит
+как проверку перед релизом.
+
+Запуск:
+    python -m db.query_audit                    # аудит и сравнение с базовой линией
+    python -m db.query_audit --verbose          # с полными планами запросов
+    python -m db.query_audit --db db/personnel.db   # на реальной базе (со статистикой)
+    python -m db.query_audit --update-baseline  # принять текущее состояние
+"""
+import argparse
+import json
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+import db.queries as q
+from db.database import register_functions
+from db.migrator import discover_migrations
+
+SCHEMA_PATH = Path(__file__).parent / "create_tables.sql"
+BASELINE_PATH = Path(__file__).parent / "query_audit_baseline.json"
+
+# Справочники из нескольких строк: их полное сканирование не считается проблемой
+SMALL_TABLES = {"Genders", "Departments", "Positions", "States", "Events",
+                "DaysOfTheWeek", "WorkingHours", "Roles", "PositionDepartments",
+                "sqlite_master"}
+
+_SQL_START_RE = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_LINE_COMMENT_RE = re.compile(r"--[^\n]*")
+_NAMED_PARAM_RE = re.compile(r"(?<!:):([A-Za-z_]\w*)")
+_TABLE_ALIAS_RE = re.compile(
+    r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_SQL_KEYWORDS = {"WHERE", "JOIN", "LEFT", "INNER", "ON", "GROUP", "ORDER", "SET",
+                 "VALUES", "LIMIT", "AS", "CROSS", "OUTER", "UNION", "HAVING"}
+
+
+def composed_queries() -> dict[str, str]:
+    """
+    Возвращает составные запросы в том виде, в каком их собирают репозитории.
+
+    Returns:
+        dict[str, str]: Словарь {имя варианта: текст запроса}.
+    """
+    pn_filter = " AND E.PersonnelNumber = :pn_filter "
+    return {
+        # EmployeeRepository.get_employees / iter_employees
+        "GET_EMPLOYEES+ORDER_BY": q.GET_EMPLOYEES + q.GET_EMPLOYEES_ORDER_BY,
+        "GET_EMPLOYEES+SEARCH+ORDER_BY":
+            q.GET_EMPLOYEES + q.GET_EMPLOYEES_SEARCH + q.GET_EMPLOYEES_ORDER_BY,
+        "GET_EMPLOYEES+PN_FILTER+ORDER_BY":
+            q.GET_EMPLOYEES + pn_filter + q.GET_EMPLOYEES_ORDER_BY,
+        "GET_EMPLOYEES_COUNT+SEARCH": q.GET_EMPLOYEES_COUNT + q.GET_EMPLOYEES_COUNT_SEARCH,
+        "GET_EMPLOYEES_COUNT+PN_FILTER": q.GET_EMPLOYEES_COUNT + pn_filter,
+        # Поиск сотрудников по индексу FTS
+        "GET_EMPLOYEES_FTS_RANKED+ORDER_BY":
+            q.GET_EMPLOYEES_FTS_RANKED + q.GET_EMPLOYEES_FTS_RANKED_ORDER_BY,
+        "GET_EMPLOYEES+FTS_SEARCH+ORDER_BY+PAGE_LIMIT":
+            q.GET_EMPLOYEES + q.GET_EMPLOYEES_FTS_SEARCH + q.GET_EMPLOYEES_ORDER_BY + q.PAGE_LIMIT,
+        "GET_EMPLOYEES_COUNT+FTS_SEARCH": q.GET_EMPLOYEES_COUNT + q.GET_EMPLOYEES_FTS_SEARCH,
+        # EmployeeEventRepository.get_events / iter_events
+        "GET_EMPLOYEE_EVENTS+ORDER_BY":
+            q.GET_EMPLOYEE_EVENTS + q.GET_EMPLOYEE_EVENTS_ORDER_BY,
+        "GET_EMPLOYEE_EVENTS+SEARCH+ORDER_BY":
+            q.GET_EMPLOYEE_EVENTS + q.GET_EMPLOYEE_EVENTS_SEARCH + q.GET_EMPLOYEE_EVENTS_ORDER_BY,
+        "GET_EMPLOYEE_EVENTS_COUNT+SEARCH":
+            q.GET_EMPLOYEE_EVENTS_COUNT + q.GET_EMPLOYEE_EVENTS_COUNT_SEARCH,
+        "GET_EMPLOYEE_EVENTS_PAGE+FTS_SEARCH+ORDER_BY+PAGE_LIMIT":
+            q.GET_EMPLOYEE_EVENTS_PAGE + q.GET_EMPLOYEE_EVENTS_FTS_SEARCH
+            + q.GET_EMPLOYEE_EVENTS_ORDER_BY + q.PAGE_LIMIT,
+        "GET_EMPLOYEE_EVENTS_COUNT+FTS_SEARCH":
+            q.GET_EMPLOYEE_EVENTS_COUNT + q.GET_EMPLOYEE_EVENTS_FTS_SEARCH,
+        # AbsenceRepository.get_absences / iter_absences
+        "GET_ABSENCES+ORDER_BY": q.GET_ABSENCES + q.GET_ABSENCES_ORDER_BY,
+        "GET_ABSENCES+SEARCH+ORDER_BY":
+            q.GET_ABSENCES + q.GET_ABSENCES_SEARCH + q.GET_ABSENCES_ORDER_BY,
+        "GET_ABSENCES_COUNT+SEARCH": q.GET_ABSENCES_COUNT + q.GET_ABSENCES_COUNT_SEARCH,
+        "GET_ABSENCES+FTS_SEARCH+ORDER_BY+PAGE_LIMIT":
+            q.GET_ABSENCES + q.GET_ABSENCES_FTS_SEARCH + q.GET_ABSENCES_ORDER_BY + q.PAGE_LIMIT,
+        "GET_ABSENCES_COUNT+FTS_SEARCH": q.GET_ABSENCES_COUNT + q.GET_ABSENCES_FTS_SEARCH,
+        # UserRepository.get_users
+        "GET_USERS_BASE+ORDER_BY": q.GET_USERS_BASE + q.GET_USERS_ORDER_BY,
+        "GET_USERS_BASE+SEARCH+ORDER_BY":
+            q.GET_USERS_BASE + q.GET_USERS_SEARCH + q.GET_USERS_ORDER_BY,
+        "GET_USERS_COUNT_BASE+SEARCH": q.GET_USERS_COUNT_BASE + q.GET_USERS_COUNT_SEARCH,
+        # Постраничные запросы (keyset): первая и последующие страницы
+        "GET_EMPLOYEES+ORDER_BY+PAGE_LIMIT":
+            q.GET_EMPLOYEES + q.GET_EMPLOYEES_ORDER_BY + q.PAGE_LIMIT,
+        "GET_EMPLOYEES+KEYSET+ORDER_BY+PAGE_LIMIT":
+            q.GET_EMPLOYEES + q.GET_EMPLOYEES_KEYSET + q.GET_EMPLOYEES_ORDER_BY + q.PAGE_LIMIT,
+        "GET_EMPLOYEE_EVENTS_PAGE+ORDER_BY+PAGE_LIMIT":
+            q.GET_EMPLOYEE_EVENTS_PAGE + q.GET_EMPLOYEE_EVENTS_ORDER_BY + q.PAGE_LIMIT,
+        "GET_EMPLOYEE_EVENTS_PAGE+KEYSET+ORDER_BY+PAGE_LIMIT":
+            q.GET_EMPLOYEE_EVENTS_PAGE + q.GET_EMPLOYEE_EVENTS_KEYSET
+            + q.GET_EMPLOYEE_EVENTS_ORDER_BY + q.PAGE_LIMIT,
+        "GET_ABSENCES+ORDER_BY+PAGE_LIMIT":
+            q.GET_ABSENCES + q.GET_ABSENCES_ORDER_BY + q.PAGE_LIMIT,
+        "GET_ABSENCES+KEYSET+ORDER_BY+PAGE_LIMIT":
+            q.GET_ABSENCES + q.GET_ABSENCES_KEYSET + q.GET_ABSENCES_ORDER_BY + q.PAGE_LIMIT,
+        "GET_USERS_BASE+ORDER_BY+PAGE_LIMIT":
+            q.GET_USERS_BASE + q.GET_USERS_ORDER_BY + q.PAGE_LIMIT,
+        "GET_USERS_BASE+KEYSET+ORDER_BY+PAGE_LIMIT":
+            q.GET_USERS_BASE + q.GET_USERS_KEYSET + q.GET_USERS_ORDER_BY + q.PAGE_LIMIT,
+    }
+
+
+def collect_queries() -> dict[str, str]:
+    """
+    Собирает все проверяемые запросы: полные SQL-константы `db.queries`
+    (фрагменты вроде *_SEARCH и *_ORDER_BY пропускаются) и составные варианты.
+
+    Returns:
+        dict[str, str]: Словарь {имя запроса: текст запроса}.
+    """
+    queries = {name: value for name, value in vars(q).items()
+               if name.isupper() and isinstance(value, str) and _SQL_START_RE.match(value)}
+    queries.update(composed_queries())
+    return queries
+
+
+def build_schema_connection(db_path=None) -> sqlite3.Connection:
+    """
+    Открывает базу для аудита.
+
+    Args:
+        db_path (optional): Путь к существующей базе. Если не указан, создается
+                            база в памяти со схемой `create_tables.sql` и миграциями.
+
+    Returns:
+        sqlite3.Connection: Соединение с базой.
+    """
+    if db_path:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        register_functions(conn)
+        return conn
+    conn = sqlite3.connect(":memory:")
+    register_functions(conn)
+    conn.executescript(SCHEMA_PATH.read_text(encoding="utf-8"))
+    for version, path in discover_migrations():
+        conn.executescript(path.read_text(encoding="utf-8"))
+        conn.execute(f"PRAGMA user_version = {int(version)}")
+    return conn
+
+
+class _AnyParams(dict):
+    """Словарь именованных параметров, подставляющий NULL для любого имени."""
+
+    def __missing__(self, key):
+        return None
+
+
+def _placeholder_params(query: str):
+    """Возвращает фиктивные параметры (NULL) для всех плейсхолдеров запроса."""
+    text = _LINE_COMMENT_RE.sub(" ", _STRING_LITERAL_RE.sub("''", query))
+    if _NAMED_PARAM_RE.search(text):
+        return _AnyParams()
+    return (None,) * text.count("?")
+
+
+def _alias_map(query: str) -> dict[str, str]:
+    """Строит соответствие {псевдоним: таблица} по FROM/JOIN запроса."""
+    aliases = {}
+    for table, alias in _TABLE_ALIAS_RE.findall(_STRING_LITERAL_RE.sub("''", query)):
+        aliases[table] = table
+        if alias and alias.upper() not in _SQL_KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+def explain(conn: sqlite3.Connection, query: str) -> list[tuple[int, int, str]]:
+    """
+    Выполняет EXPLAIN QUERY PLAN для запроса.
+
+    Args:
+        conn (sqlite3.Connection): Соединение с базой со схемой.
+        query (str): Текст запроса.
+
+    Returns:
+        list[tuple[int, int, str]]: Узлы плана (id, parent, описание).
+    """
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", _placeholder_params(query)).fetchall()
+    return [(node_id, parent, detail) for node_id, parent, _, detail in rows]
+
+
+def analyze_plan(query: str, plan: list[tuple[int, int, str]]) -> list[str]:
+    """
+    Находит в плане запроса проблемные узлы.
+
+    Args:
+        query (str): Текст запроса (для сопоставления псевдонимов таблицам).
+        plan (list): Узлы плана из `explain`.
+
+    Returns:
+        list[str]: Отсортированный список проблем вида `вид:подробности`, например
+                   `full_scan:Employees`, `temp_btree:ORDER BY`, `correlated_subquery`.
+    """
+    aliases = _alias_map(query)
+    # Обход индекса в порядке ORDER BY с LIMIT останавливается после первых строк
+    bounded = (re.search(r"\bLIMIT\b", query, re.IGNORECASE) is not None
+               and not any(detail.startswith("USE TEMP B-TREE FOR") and "ORDER BY" in detail
+                           for _, _, detail in plan))
+    findings = set()
+    for _, _, detail in plan:
+        if detail.startswith("SCAN "):
+            name = detail.split()[1]
+            table = aliases.get(name, name)
+            # SCAN ... USING COVERING INDEX читает только индекс, но все равно целиком
+            if bounded and " INDEX " in detail:
+                continue
+            # Виртуальная таблица FTS5 с ограничением MATCH (idxStr содержит "M")
+            # читает только списки документов из полнотекстового индекса
+            if " VIRTUAL TABLE INDEX " in detail and ":M" in detail:
+                continue
+            if table not in SMALL_TABLES and "CONSTANT ROW" not in detail:
+                findings.add(f"full_scan:{table}")
+        if detail.startswith("USE TEMP B-TREE FOR "):
+            findings.add(f"temp_btree:{detail[len('USE TEMP B-TREE FOR '):]}")
+        if detail.startswith("CORRELATED "):
+            findings.add("correlated_subquery")
+        if "AUTOMATIC" in detail and "INDEX" in detail:
+            table = detail.split()[1]
+            findings.add(f"automatic_index:{aliases.get(table, table)}")
+    return sorted(findings)
+
+
+def run_audit(conn: sqlite3.Connection) -> dict[str, dict]:
+    """
+    Выполняет аудит всех запросов.
+
+    Args:
+        conn (sqlite3.Connection): Соединение с базой со схемой.
+
+    Returns:
+        dict[str, dict]: {имя запроса: {"plan": [...], "findings": [...], "error": str | None}}.
+    """
+    results = {}
+    for name, query in sorted(collect_queries().items()):
+        try:
+            plan = explain(conn, query)
+        except sqlite3.Error as e:
+            results[name] = {"plan": [], "findings": [], "error": str(e)}
+            continue
+        results[name] = {"plan": plan, "findings": analyze_plan(query, plan), "error": None}
+    return results
+
+
+def load_baseline(path=BASELINE_PATH) -> dict[str, list[str]]:
+    """Загружает базовую линию принятых проблем (пустую, если файла нет)."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(results: dict[str, dict], path=BASELINE_PATH) -> None:
+    """Сохраняет текущие проблемы как базовую линию."""
+    baseline = {name: result["findings"]
+                for name, result in results.items() if result["findings"]}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def _format_plan(plan: list[tuple[int, int, str]]) -> list[str]:
+    """Форматирует план в виде дерева с отступами."""
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, detail in plan:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("      " + "  " * depth[node_id] + detail)
+    return lines
+
+
+def main(argv=None) -> int:
+    """
+    Точка входа командной строки.
+
+    Returns:
+        int: 0 - новых проблем нет, 1 - есть новые проблемы или ошибки запросов.
+    """
+    parser = argparse.ArgumentParser(
+        description="Аудит планов выполнения SQL-запросов (EXPLAIN QUERY PLAN).")
+    parser.add_argument("--db", help="путь к существующей базе (по умолчанию - схема в памяти)")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH),
+                        help="файл базовой линии принятых проблем")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="сохранить текущие проблемы как базовую линию")
+    parser.add_argument("--verbose", "-v", action="store_true",
+                        help="выводить планы всех запросов")
+    args = parser.parse_args(argv)
+
+    conn = build_schema_connection(args.db)
+    try:
+        results = run_audit(conn)
+    finally:
+        conn.close()
+
+    if args.update_baseline:
+        save_baseline(results, args.baseline)
+        print(f"Базовая линия обновлена: {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    new_total = errors = 0
+    for name, result in results.items():
+        accepted = set(baseline.get(name, []))
+        new = [finding for finding in result["findings"] if finding not in accepted]
+        if result["error"]:
+            errors += 1
+            print(f"[ERROR] {name}: {result['error']}")
+            continue
+        if new:
+            new_total += len(new)
+            status = "NEW"
+        elif result["findings"]:
+            status = "ok*"
+        else:
+            status = "ok"
+        if new or args.verbose:
+            print(f"[{status}] {name}")
+            for finding in result["findings"]:
+                mark = "+" if finding in new else " "
+                print(f"    {mark} {finding}")
+            print("\n".join(_format_plan(result["plan"])))
+        fixed = accepted - set(result["findings"])
+        if fixed:
+            print(f"[fixed] {name}: {', '.join(sorted(fixed))} (обновите базовую линию)")
+
+    accepted_total = sum(len(result["findings"]) for result in results.values()) - new_total
+    print(f"\nЗапросов: {len(results)}, новых проблем: {new_total}, "
+          f"принятых: {accepted_total}, ошибок: {errors}")
+    return 1 if new_total or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
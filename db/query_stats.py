@@ -0,0 +1,158 @@
+"""
+Модуль сбора статистики выполнения SQL-запросов.
+
+Предоставляет класс `QueryStats`, который для каждого текста запроса
+(нормализованного) накапливает число вызовов, число строк, суммарное и
+максимальное время выполнения, число ошибок и гистограмму длительностей.
+Запросы дольше порога записываются в отдельный журнал медленных запросов
+(логгер `db.slow_queries`).
+"""
+import json
+import logging
+import re
+import threading
+
+log = logging.getLogger(__name__)
+slow_log = logging.getLogger("db.slow_queries")
+
+# Верхние границы корзин гистограммы длительностей, мс (последняя - без границы)
+HISTOGRAM_BOUNDS_MS = (1, 5, 10, 50, 100, 500, 1000)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_LINE_COMMENT_RE = re.compile(r"--[^\n]*")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Приводит текст запроса к каноническому виду для группировки статистики.
+
+    Удаляет однострочные комментарии, схлопывает пробельные символы и
+    завершающую точку с запятой.
+
+    Args:
+        query (str): Исходный текст SQL-запроса.
+
+    Returns:
+        str: Нормализованный текст запроса.
+    """
+    text = _LINE_COMMENT_RE.sub(" ", query)
+    return _WHITESPACE_RE.sub(" ", text).strip().rstrip(";").strip()
+
+
+def _bucket_label(index: int) -> str:
+    """Возвращает подпись корзины гистограммы по ее индексу."""
+    if index < len(HISTOGRAM_BOUNDS_MS):
+        return f"<={HISTOGRAM_BOUNDS_MS[index]}ms"
+    return f">{HISTOGRAM_BOUNDS_MS[-1]}ms"
+
+
+class QueryStats:
+    """
+    Потокобезопасный накопитель статистики SQL-запросов.
+    """
+
+    def __init__(self, slow_threshold_ms: float):
+        """
+        Инициализирует накопитель.
+
+        Args:
+            slow_threshold_ms (float): Порог (мс), начиная с которого запрос
+                                       попадает в журнал медленных запросов.
+                                       0 или меньше отключает журнал.
+        """
+        self.slow_threshold_ms = slow_threshold_ms
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        # Кэш нормализации: тексты запросов из db.queries повторяются
+        self._normalized: dict[str, str] = {}
+
+    def record(self, query: str, elapsed_ms: float, rows: int = 0,
+               params=None, error: bool = False) -> None:
+        """
+        Учитывает одно выполнение запроса.
+
+        Args:
+            query (str): Текст SQL-запроса.
+            elapsed_ms (float): Время выполнения, мс.
+            rows (int, optional): Количество прочитанных или измененных строк.
+            params (optional): Параметры запроса (только для журнала медленных запросов).
+            error (bool, optional): Завершился ли запрос ошибкой.
+        """
+        key = self._normalized.get(query)
+        if key is None:
+            key = normalize_query(query)
+            self._normalized[query] = key
+
+        bucket = len(HISTOGRAM_BOUNDS_MS)
+        for index, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if elapsed_ms <= bound:
+                bucket = index
+                break
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {
+                    "calls": 0, "rows": 0, "errors": 0,
+                    "total_ms": 0.0, "max_ms": 0.0,
+                    "histogram": [0] * (len(HISTOGRAM_BOUNDS_MS) + 1),
+                }
+            entry["calls"] += 1
+            entry["rows"] += rows
+            entry["total_ms"] += elapsed_ms
+            if elapsed_ms > entry["max_ms"]:
+                entry["max_ms"] = elapsed_ms
+            if error:
+                entry["errors"] += 1
+            entry["histogram"][bucket] += 1
+
+        if 0 < self.slow_threshold_ms <= elapsed_ms:
+            slow_log.warning("%.1f ms, строк: %d | %s | параметры: %r",
+                             elapsed_ms, rows, key, params)
+
+    def snapshot(self) -> dict[str, dict]:
+        """
+        Возвращает копию накопленной статистики.
+
+        Returns:
+            dict[str, dict]: Словарь {нормализованный запрос: показатели}, где
+                показатели - calls, rows, errors, total_ms, avg_ms, max_ms
+                и histogram ({подпись корзины: количество}).
+                Упорядочен по убыванию суммарного времени.
+        """
+        with self._lock:
+            items = [(key, dict(entry, histogram=list(entry["histogram"])))
+                     for key, entry in self._entries.items()]
+        result = {}
+        for key, entry in sorted(items, key=lambda item: item[1]["total_ms"], reverse=True):
+            entry["avg_ms"] = entry["total_ms"] / \
+                entry["calls"] if entry["calls"] else 0.0
+            entry["histogram"] = {_bucket_label(index): count
+                                  for index, count in enumerate(entry["histogram"]) if count}
+            result[key] = entry
+        return result
+
+    def reset(self) -> None:
+        """Очищает накопленную статистику."""
+        with self._lock:
+            self._entries.clear()
+
+    def dump(self, file_path) -> bool:
+        """
+        Сохраняет снимок статистики в JSON-файл.
+
+        Args:
+            file_path: Путь к файлу.
+
+        Returns:
+            bool: True при успешной записи, False при ошибке.
+        """
+        try:
+            with open(file_path, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+            log.info("Статистика запросов сохранена в %s", file_path)
+            return True
+        except OSError as e:
+            log.error(
+                "Не удалось сохранить статистику запросов в %s: %s", file_path, e)
+            return False
@@ -0,0 +1,65 @@
+# db/rebuild_summaries.py
+"""
+Пересчет сводных таблиц, которые зависят от данных вне своих триггеров.
+
+Суммы минут отсутствия (`AbsenceDailyMinutes`) считаются по графикам работы
+(`Schedules`/`WorkingHours`), а триггеры срабатывают только на изменения
+отсутствий и должности сотрудника. После изменения графиков суммы нужно
+пересчитать этой командой.
+
+Периоды работы (`EmploymentSpans`) пересчитываются при добавлении приема или
+увольнения через репозиторий. После правки `EmployeeEvents` в обход приложения
+(вручную, другим инструментом) периоды пересчитываются этой же командой.
+
+Запуск:
+    python -m db.rebuild_summaries                      # база из config.DATABASE_PATH
+    python -m db.rebuild_summaries --db db/personnel.db
+"""
+import argparse
+import logging
+import sys
+
+from config import DATABASE_PATH
+from db.absence_repository import AbsenceRepository
+from db.database import Database
+from db.employee_event_repository import EmployeeEventRepository
+from db.migrator import apply_migrations
+
+log = logging.getLogger(__name__)
+
+
+def main(argv=None) -> int:
+    """
+    Точка входа командной строки.
+
+    Returns:
+        int: 0 - пересчет выполнен, 1 - ошибка подключения, миграций или пересчета.
+    """
+    parser = argparse.ArgumentParser(
+        description="Пересчет сводных таблиц (суммы минут отсутствия, периоды работы).")
+    parser.add_argument("--db", default=DATABASE_PATH, help="путь к базе данных")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db)
+    if db.conn is None:
+        print(f"Не удалось подключиться к базе: {args.db}")
+        return 1
+    try:
+        if not apply_migrations(db):
+            print("Не удалось обновить схему базы данных")
+            return 1
+        if not AbsenceRepository(db).rebuild_absence_minutes():
+            print("Ошибка пересчета сумм минут отсутствия")
+            return 1
+        print("Суммы минут отсутствия пересчитаны")
+        if not EmployeeEventRepository(db).rebuild_employment_spans():
+            print("Ошибка пересчета периодов работы")
+            return 1
+        print("Периоды работы пересчитаны")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+# db/reference_cache.py
+"""
+Модуль кэша справочников (Genders, Positions, Departments, States, Events, Roles).
+
+Справочники маленькие и почти не меняются, а запрашиваются при каждом
+открытии диалога и на каждой строке импорта. `ReferenceCache` загружает
+справочник целиком один раз и отвечает на запросы "ID по названию" и
+"название по ID" из памяти.
+
+Кэш сбрасывается:
+- при записи в таблицу справочника через `Database.execute_query`/`execute_many`
+  (и при откате транзакции, в которой могла быть такая запись);
+- при изменении базы другим соединением или процессом - это определяется по
+  `PRAGMA data_version`, которое проверяется не чаще раза в
+  `DATA_VERSION_CHECK_INTERVAL` секунд.
+"""
+import logging
+import re
+import threading
+import time
+import db.queries as q
+
+log = logging.getLogger(__name__)
+
+# Справочник -> запрос, возвращающий (ID, Название)
+REFERENCE_QUERIES = {
+    "Genders": q.GET_GENDERS,
+    "Positions": q.GET_ALL_POSITIONS,
+    "Departments": q.GET_DEPARTMENTS,
+    "States": q.GET_STATES,
+    "Events": q.GET_ALL_EVENTS,
+    "Roles": q.GET_ALL_ROLES_ORDERED,
+}
+
+DATA_VERSION_CHECK_INTERVAL = 1.0
+
+# Таблица, в которую пишет DML-запрос
+_WRITE_TARGET_RE = re.compile(
+    r"^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+(\w+)",
+    re.IGNORECASE)
+_READ_ONLY_RE = re.compile(r"^\s*(?:SELECT|WITH|EXPLAIN)\b", re.IGNORECASE)
+
+
+class ReferenceCache:
+    """Кэш справочников в виде отображений ID <-> название."""
+
+    def __init__(self, db):
+        """
+        Инициализирует кэш (справочники загружаются при первом обращении).
+
+        Args:
+            db (Database): Объект базы данных, из которой читаются справочники.
+        """
+        self.db = db
+        # Справочник -> (строки, {название: ID}, {ID: название}); снимок заменяется
+        # целиком, поэтому прочитанный снимок согласован даже при сбросе из другого потока
+        self._snapshots: dict[str, tuple[list[tuple], dict[str, int], dict[int, str]]] = {}
+        self._lock = threading.Lock()
+        self._data_versions: dict[int, int] = {}  # поток -> PRAGMA data_version
+        self._checked_at = 0.0
+
+    # --- Чтение ---
+
+    def get_all(self, table: str) -> list[tuple] | None:
+        """
+        Возвращает все записи справочника.
+
+        Args:
+            table (str): Имя таблицы справочника (ключ `REFERENCE_QUERIES`).
+
+        Returns:
+            list[tuple] | None: Список (ID, Название) в порядке запроса справочника
+                                или None, если справочник не удалось загрузить.
+        """
+        snapshot = self._load(table)
+        return list(snapshot[0]) if snapshot is not None else None
+
+    def get_id(self, table: str, name: str) -> int | None:
+        """
+        Возвращает ID записи справочника по названию.
+
+        Args:
+            table (str): Имя таблицы справочника.
+            name (str): Название записи.
+
+        Returns:
+            int | None: ID или None, если запись не найдена.
+        """
+        snapshot = self._load(table)
+        return snapshot[1].get(name) if snapshot is not None else None
+
+    def get_name(self, table: str, record_id: int) -> str | None:
+        """
+        Возвращает название записи справочника по ID.
+
+        Args:
+            table (str): Имя таблицы справочника.
+            record_id (int): ID записи.
+
+        Returns:
+            str | None: Название или None, если запись не найдена.
+        """
+        snapshot = self._load(table)
+        return snapshot[2].get(record_id) if snapshot is not None else None
+
+    # --- Сброс ---
+
+    def invalidate(self, table: str | None = None) -> None:
+        """
+        Сбрасывает закэшированный справочник (или все справочники).
+
+        Args:
+            table (str | None, optional): Имя таблицы; None - сбросить все.
+        """
+        with self._lock:
+            tables = [table] if table else list(self._snapshots)
+            for name in tables:
+                self._snapshots.pop(name, None)
+        if tables:
+            log.debug("Кэш справочников сброшен: %s", ", ".join(tables))
+
+    def invalidate_for_query(self, query: str) -> None:
+        """
+        Сбрасывает справочник, в который пишет выполненный запрос.
+
+        Запросы к другим таблицам кэш не затрагивают; DDL и прочие
+        нераспознанные операторы сбрасывают все справочники.
+
+        Args:
+            query (str): Выполненный SQL-запрос.
+        """
+        if _READ_ONLY_RE.match(query):
+            return
+        match = _WRITE_TARGET_RE.match(query)
+        if match is None:
+            self.invalidate()
+            return
+        table = next((name for name in REFERENCE_QUERIES
+                      if name.lower() == match.group(1).lower()), None)
+        if table is not None:
+            self.invalidate(table)
+
+    # --- Загрузка ---
+
+    def _check_data_version(self) -> None:
+        """Сбрасывает кэш, если базу изменило другое соединение."""
+        now = time.monotonic()
+        if now - self._checked_at < DATA_VERSION_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        result = self.db.fetch_one("PRAGMA data_version")
+        if result is None:
+            return
+        thread_id = threading.get_ident()
+        previous = self._data_versions.get(thread_id)
+        self._data_versions[thread_id] = result[0]
+        if previous is not None and previous != result[0]:
+            log.debug("База изменена другим соединением (data_version=%s)", result[0])
+            self.invalidate()
+
+    def _load(self, table: str) -> tuple[list[tuple], dict[str, int], dict[int, str]] | None:
+        """
+        Возвращает снимок справочника, при необходимости загружая его из БД.
+
+        Ответ дается по возвращенному снимку, а не по полям кэша: другой поток
+        может сбросить кэш сразу после загрузки.
+
+        Args:
+            table (str): Имя таблицы справочника.
+
+        Returns:
+            tuple | None: (строки, {название: ID}, {ID: название})
+                          или None при ошибке запроса.
+
+        Raises:
+            KeyError: Если таблица не является справочником.
+        """
+        query = REFERENCE_QUERIES[table]
+        self._check_data_version()
+        with self._lock:
+            snapshot = self._snapshots.get(table)
+        if snapshot is not None:
+            return snapshot
+        rows = self.db.fetch_all(query)
+        if rows is None:
+            log.warning("Не удалось загрузить справочник %s", table)
+            return None
+        snapshot = (rows,
+                    {name: record_id for record_id, name in rows},
+                    {record_id: name for record_id, name in rows})
+        with self._lock:
+            self._snapshots[table] = snapshot
+        log.debug("Справочник %s загружен в кэш (%s записей)", table, len(rows))
+        return snapshot
@@ -3,11 +3,11 @@
 Модуль репозитория для взаимодействия с таблицей `Roles` (Роли пользователей).
 
 Содержит методы для получения информации о ролях, таких как ID по имени,
-имя по ID, а также список всех доступных ролей.
+имя по ID, а также список всех доступных ролей. Справочник читается
+из кэша `Database.references`.
 """
 import logging
 from db.database import Database
-import db.queries as q
 
 log = logging.getLogger(__name__)
 
@@ -40,15 +40,13 @@ class RoleRepository:
         Returns:
             int | None: ID роли, если она найдена, иначе None.
         """
-        log.debug(f"Запрос ID для роли: '{role_name}'")
-        query = q.GET_ROLE_ID_BY_NAME
-        result = self.db.fetch_one(query, (role_name,))
-        if result:
-            role_id = result[0]
-            log.debug(f"Найден ID={role_id} для роли '{role_name}'.")
+        log.debug("Запрос ID для роли: '%s'", role_name)
+        role_id = self.db.references.get_id("Roles", role_name)
+        if role_id is not None:
+            log.debug("Найден ID=%s для роли '%s'.", role_id, role_name)
             return role_id
         else:
-            log.warning(f"Роль с названием '{role_name}' не найдена.")
+            log.warning("Роль с названием '%s' не найдена.", role_name)
             return None
 
     def get_name_by_id(self, role_id: int) -> str | None:
@@ -61,15 +59,13 @@ class RoleRepository:
         Returns:
             str | None: Название роли, если она найдена, иначе None.
         """
-        log.debug(f"Запрос названия роли по ID={role_id}")
-        query = q.GET_ROLE_NAME_BY_ID
-        result = self.db.fetch_one(query, (role_id,))
-        if result:
-            role_name = result[0]
-            log.debug(f"Найдено название '{role_name}' для роли ID={role_id}.")
+        log.debug("Запрос названия роли по ID=%s", role_id)
+        role_name = self.db.references.get_name("Roles", role_id)
+        if role_name is not None:
+            log.debug("Найдено название '%s' для роли ID=%s.", role_name, role_id)
             return role_name
         else:
-            log.warning(f"Роль с ID={role_id} не найдена.")
+            log.warning("Роль с ID=%s не найдена.", role_id)
             return None
 
     def get_all_roles(self) -> list[tuple[int, str]]:
@@ -82,8 +78,7 @@ class RoleRepository:
                                    или произошла ошибка.
         """
         log.debug("Запрос списка всех ролей")
-        query = q.GET_ALL_ROLES_ORDERED
-        result = self.db.fetch_all(query)
+        result = self.db.references.get_all("Roles")
         if result is None:
             log.error(
                 "Ошибка при получении списка ролей (fetch_all вернул None).")
@@ -92,5 +87,5 @@ class RoleRepository:
             log.info("Список ролей в базе данных пуст.")
             return []
         else:
-            log.debug(f"Получено {len(result)} ролей.")
+            log.debug("Получено %s ролей.", len(result))
             return result
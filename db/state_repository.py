@@ -5,7 +5,6 @@
 """
 import logging
 from db.database import Database
-import db.queries as q
 
 log = logging.getLogger(__name__)
 
@@ -30,9 +29,9 @@ class StateRepository:
             list[tuple] | None: Список кортежей (ID, StateName) или None в случае ошибки.
         """
         log.debug("Запрос всех записей из справочника States")
-        result = self.db.fetch_all(q.GET_STATES)
+        result = self.db.references.get_all("States")
         log.debug(
-            f"Получено {len(result) if result else 0} записей о состояниях.")
+            "Получено %s записей о состояниях.", len(result) if result else 0)
         return result
 
     def get_by_id(self, state_name):
@@ -41,7 +40,7 @@ class StateRepository:
 
         Примечание: В текущей реализации этот метод фактически ищет по имени,
         так как параметр `state_id` (переименован в `state_name` для ясности)
-        используется в запросе `GET_STATE_ID`, который ищет по `StateName`.
+        содержит название состояния (`StateName`).
         Метод `get_by_name` является псевдонимом для этого метода.
 
         Args:
@@ -50,17 +49,16 @@ class StateRepository:
         Returns:
             int | None: ID найденного состояния или None, если состояние не найдено или произошла ошибка.
         """
-        log.debug(f"Запрос ID состояния по названию: '{state_name}'")
-        result = self.db.fetch_one(q.GET_STATE_ID, (state_name,))
-        found_id = result[0] if result else None
-        log.debug(f"Результат поиска ID состояния: {found_id}")
+        log.debug("Запрос ID состояния по названию: '%s'", state_name)
+        found_id = self.db.references.get_id("States", state_name)
+        log.debug("Результат поиска ID состояния: %s", found_id)
         return found_id
 
     def get_by_name(self, name):
         """
         Возвращает ID состояния по его названию.
 
-        Является псевдонимом для метода `get_by_id` из-за текущей реализации запроса.
+        Является псевдонимом для метода `get_by_id`.
 
         Args:
             name (str): Название состояния для поиска.
@@ -52,7 +52,7 @@ class UserRepository:
             hashed_password = bcrypt.hashpw(password_bytes, salt)
             return hashed_password.decode('utf-8')
         except Exception as e:
-            log.error(f"Ошибка хеширования пароля: {e}", exc_info=True)
+            log.error("Ошибка хеширования пароля: %s", e, exc_info=True)
             return None
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
@@ -77,7 +77,7 @@ class UserRepository:
             log.warning(f"Неверный формат хеша при проверке пароля.")
             return False
         except Exception as e:
-            log.error(f"Ошибка проверки пароля: {e}", exc_info=True)
+            log.error("Ошибка проверки пароля: %s", e, exc_info=True)
             return False
 
     # --- CRUD Операции и получение списков ---
@@ -98,7 +98,7 @@ class UserRepository:
         Returns:
             tuple[list[tuple], int]: Кортеж (список данных пользователей, общее количество).
         """
-        log.debug(f"Запрос списка пользователей: search='{search_term}'")
+        log.debug("Запрос списка пользователей: search='%s'", search_term)
         base_query = q.GET_USERS_BASE
         params = {}
         if search_term:
@@ -106,22 +106,18 @@ class UserRepository:
             params["search_term"] = f"%{search_term}%"
         query = base_query + q.GET_USERS_ORDER_BY
 
-        log.debug(f"Запрос данных пользователей: {query}, параметры: {params}")
+        log.debug("Запрос данных пользователей: %s, параметры: %s", query, params)
+        generation = self.db.write_generation
         data = self.db.fetch_all(query, params)
         if data is None:
             log.warning("Запрос данных пользователей вернул None")
             data = []
 
-        # Запрос для подсчета строк
-        count_query = q.GET_USERS_COUNT_BASE
-        count_params = {}
-        if search_term:
-            count_query += q.GET_USERS_COUNT_SEARCH
-            count_params["search_term"] = f"%{search_term}%"
-        count_result = self.db.fetch_one(count_query, count_params)
-        total_rows = count_result[0] if count_result else 0
+        # Весь список уже получен - его длина и есть количество
+        total_rows = len(data)
+        self.db.set_cached_count(("users", search_term or ""), total_rows, generation)
         log.debug(
-            f"Найдено пользователей: {total_rows}, получено данных: {len(data)}")
+            "Найдено пользователей: %s, получено данных: %s", total_rows, len(data))
 
         # Замена None на пустые строки для отображения (кроме ID)
         processed_data = []
@@ -132,6 +128,85 @@ class UserRepository:
 
         return processed_data, total_rows
 
+    def count_users(self, search_term: str | None = None) -> int:
+        """
+        Возвращает количество пользователей с учетом поиска.
+
+        Значение кэшируется до следующей записи в БД.
+
+        Args:
+            search_term (str | None, optional): Строка для поиска по логину,
+                                               ФИО сотрудника, email, роли.
+
+        Returns:
+            int: Количество найденных пользователей.
+        """
+        cache_key = ("users", search_term or "")
+        cached = self.db.get_cached_count(cache_key)
+        if cached is not None:
+            return cached
+
+        count_query = q.GET_USERS_COUNT_BASE
+        count_params = {}
+        if search_term:
+            count_query += q.GET_USERS_COUNT_SEARCH
+            count_params["search_term"] = f"%{search_term}%"
+        generation = self.db.write_generation
+        count_result = self.db.fetch_one(count_query, count_params)
+        total_rows = count_result[0] if count_result else 0
+        self.db.set_cached_count(cache_key, total_rows, generation)
+        return total_rows
+
+    def get_users_page(self, search_term: str | None = None, after: tuple | None = None,
+                       page_size: int = 10, offset: int = 0) -> tuple[list[tuple], tuple | None]:
+        """
+        Получает одну страницу пользователей (keyset-пагинация по логину).
+
+        Формат строк - как в `get_users` (ID первым столбцом, None заменены
+        на пустые строки). Первая страница запрашивается вместе с общим
+        количеством строк, которое кэшируется для `count_users`.
+
+        Args:
+            search_term (str | None, optional): Строка для поиска по логину,
+                                               ФИО сотрудника, email, роли.
+            after (tuple | None, optional): Курсор (Login,) последней строки
+                                            предыдущей страницы. None - первая страница.
+            page_size (int, optional): Количество строк на странице.
+            offset (int, optional): Сколько строк пропустить (после курсора, если он
+                задан); для чтения с произвольной позиции.
+
+        Returns:
+            tuple[list[tuple], tuple | None]: Кортеж (строки страницы,
+                курсор следующей страницы или None).
+        """
+        query = q.GET_USERS_BASE
+        params = {"page_size": page_size}
+        if search_term:
+            query += q.GET_USERS_SEARCH
+            params["search_term"] = f"%{search_term}%"
+        if after:
+            query += q.GET_USERS_KEYSET
+            params["after_login"] = after[0]
+        query += q.GET_USERS_ORDER_BY + q.PAGE_LIMIT
+        if offset:
+            query += q.PAGE_OFFSET
+            params["offset"] = offset
+
+        log.debug("Запрос страницы пользователей: %s, параметры: %s", query, params)
+        if after or offset:
+            data = self.db.fetch_all(query, params)
+        else:
+            generation = self.db.write_generation
+            data, total_rows = self.db.fetch_all_with_count(query, params)
+            if data is not None:
+                self.db.set_cached_count(("users", search_term or ""), total_rows, generation)
+        if data is None:
+            log.warning("Запрос страницы пользователей вернул None")
+            return [], None
+        next_cursor = (data[-1][1],) if len(data) == page_size else None
+        return [tuple([row[0]] + ["" if item is None else item for item in row[1:]])
+                for row in data], next_cursor
+
     def get_user_by_id(self, user_id: int) -> tuple | None:
         """
         Получает данные одного пользователя по ID (без JOIN).
@@ -143,12 +218,12 @@ class UserRepository:
             tuple | None: Кортеж (ID, Login, PasswordHash, EmployeePN, RoleID, Email)
                           или None, если пользователь не найден.
         """
-        log.debug(f"Запрос пользователя по ID={user_id}")
+        log.debug("Запрос пользователя по ID=%s", user_id)
         result = self.db.fetch_one(q.GET_USER_BY_ID, (user_id,))
         if result:
-            log.debug(f"Найден пользователь ID={user_id}.")
+            log.debug("Найден пользователь ID=%s.", user_id)
         else:
-            log.warning(f"Пользователь ID={user_id} не найден.")
+            log.warning("Пользователь ID=%s не найден.", user_id)
         return result
 
     def get_user_by_login(self, login: str) -> tuple | None:
@@ -162,12 +237,12 @@ class UserRepository:
             tuple | None: Кортеж (ID, PasswordHash, RoleID) или None,
                           если пользователь не найден.
         """
-        log.debug(f"Запрос пользователя по login='{login}' для аутентификации")
+        log.debug("Запрос пользователя по login='%s' для аутентификации", login)
         result = self.db.fetch_one(q.GET_USER_BY_LOGIN_FOR_AUTH, (login,))
         if result:
-            log.debug(f"Найден пользователь login='{login}'.")
+            log.debug("Найден пользователь login='%s'.", login)
         else:
-            log.warning(f"Пользователь login='{login}' не найден.")
+            log.warning("Пользователь login='%s' не найден.", login)
         return result
 
     def add_user(self, login: str, password: str, role_id: int,
@@ -186,7 +261,7 @@ class UserRepository:
             bool: True в случае успеха, False при ошибке.
         """
         log.debug(
-            f"Добавление пользователя: login='{login}', role_id={role_id}")
+            "Добавление пользователя: login='%s', role_id=%s", login, role_id)
         hashed_password = self._hash_password(password)
         if not hashed_password:
             log.error("Не удалось хешировать пароль при добавлении пользователя.")
@@ -196,11 +271,45 @@ class UserRepository:
                   role_id, email if email else None)
         result = self.db.execute_query(q.INSERT_USER, params)
         if result:
-            log.info(f"Пользователь '{login}' успешно добавлен.")
+            log.info("Пользователь '%s' успешно добавлен.", login)
         else:
-            log.error(f"Ошибка добавления пользователя '{login}'.")
+            log.error("Ошибка добавления пользователя '%s'.", login)
         return result
 
+    def insert_users_bulk(self, rows) -> tuple[int, list[tuple[int, tuple, str]]]:
+        """
+        Добавляет набор пользователей пачками с хешированием паролей.
+
+        Args:
+            rows (Iterable[tuple]): Кортежи (login, password, employee_pn, role_id, email),
+                                    пароль в открытом виде.
+
+        Returns:
+            tuple[int, list[tuple[int, tuple, str]]]: Количество добавленных пользователей
+                и список ошибок (индекс строки во входных данных, параметры, текст ошибки).
+        """
+        log.debug("Пакетное добавление пользователей")
+        prepared = []
+        source_indexes = []  # Индекс во входных данных для каждой подготовленной строки
+        failed = []
+        for index, (login, password, employee_pn, role_id, email) in enumerate(rows):
+            hashed_password = self._hash_password(password)
+            if not hashed_password:
+                failed.append((index, (login, None, employee_pn, role_id, email),
+                               "Не удалось хешировать пароль"))
+                continue
+            prepared.append((login, hashed_password, employee_pn if employee_pn else None,
+                             role_id, email if email else None))
+            source_indexes.append(index)
+
+        added, db_failed = self.db.execute_many(q.INSERT_USER, prepared)
+        failed.extend((source_indexes[index], params, error)
+                      for index, params, error in db_failed)
+        failed.sort(key=lambda item: item[0])
+        log.info(
+            "Пакетное добавление пользователей: добавлено %s, с ошибками %s", added, len(failed))
+        return added, failed
+
     def update_user(self, user_id: int, role_id: int, employee_pn: str | None,
                     email: str | None, new_password: str | None = None) -> bool:
         """
@@ -217,12 +326,12 @@ class UserRepository:
             bool: True в случае успеха, False при ошибке.
         """
         log.debug(
-            f"Обновление пользователя ID={user_id}. Пароль меняется: {new_password is not None}")
+            "Обновление пользователя ID=%s. Пароль меняется: %s", user_id, new_password is not None)
         if new_password:
             hashed_password = self._hash_password(new_password)
             if not hashed_password:
                 log.error(
-                    f"Не удалось хешировать новый пароль для пользователя ID={user_id}.")
+                    "Не удалось хешировать новый пароль для пользователя ID=%s.", user_id)
                 return False
             params = (role_id, employee_pn if employee_pn else None,
                       email if email else None, hashed_password, user_id)
@@ -234,9 +343,9 @@ class UserRepository:
 
         result = self.db.execute_query(query, params)
         if result:
-            log.info(f"Пользователь ID={user_id} успешно обновлен.")
+            log.info("Пользователь ID=%s успешно обновлен.", user_id)
         else:
-            log.error(f"Ошибка обновления пользователя ID={user_id}.")
+            log.error("Ошибка обновления пользователя ID=%s.", user_id)
         return result
 
     def delete_user(self, user_id: int) -> bool:
@@ -252,12 +361,12 @@ class UserRepository:
         Returns:
             bool: True в случае успеха, False при ошибке.
         """
-        log.debug(f"Удаление пользователя ID={user_id}")
+        log.debug("Удаление пользователя ID=%s", user_id)
         result = self.db.execute_query(q.DELETE_USER, (user_id,))
         if result:
-            log.info(f"Пользователь ID={user_id} успешно удален.")
+            log.info("Пользователь ID=%s успешно удален.", user_id)
         else:
-            log.error(f"Ошибка удаления пользователя ID={user_id}.")
+            log.error("Ошибка удаления пользователя ID=%s.", user_id)
         return result
 
     # --- Вспомогательные методы ---
@@ -277,7 +386,7 @@ class UserRepository:
             bool: True, если логин уникален, иначе False.
         """
         log.debug(
-            f"Проверка уникальности логина: '{login}', исключая ID: {current_user_id}")
+            "Проверка уникальности логина: '%s', исключая ID: %s", login, current_user_id)
         query = q.CHECK_LOGIN_UNIQUE
         params = [login]
         if current_user_id is not None:
@@ -285,7 +394,7 @@ class UserRepository:
             params.append(current_user_id)
         result = self.db.fetch_one(query, tuple(params))
         is_unique = result is None
-        log.debug(f"Логин '{login}' уникален: {is_unique}")
+        log.debug("Логин '%s' уникален: %s", login, is_unique)
         return is_unique
 
     def get_roles(self) -> list[tuple[int, str]]:
@@ -296,11 +405,11 @@ class UserRepository:
             list[tuple[int, str]]: Список кортежей (RoleID, RoleName).
         """
         log.debug("Запрос списка ролей")
-        result = self.db.fetch_all(q.GET_ALL_ROLES_ORDERED)
+        result = self.db.references.get_all("Roles")
         if result is None:
             log.warning("Не удалось получить список ролей.")
             return []
-        log.debug(f"Получено {len(result)} ролей.")
+        log.debug("Получено %s ролей.", len(result))
         return result
 
     def get_active_employees_for_linking(self) -> list[str]:
@@ -312,12 +421,13 @@ class UserRepository:
         """
         log.debug("Запрос списка активных сотрудников для связи с пользователем")
         query = q.GET_ACTIVE_EMPLOYEES_FOR_LINKING
-        result = self.db.fetch_all(query)
+        result = self.db.fetch_all(
+            query, {"active_state_id": self.db.references.get_id("States", q.STATE_ACTIVE)})
         if result is None:
             log.warning("Не удалось получить список сотрудников для связи.")
             return []
         employee_list = [f"{emp[1]} ({emp[0]})" for emp in result]
-        log.debug(f"Загружено {len(employee_list)} сотрудников для связи.")
+        log.debug("Загружено %s сотрудников для связи.", len(employee_list))
         return employee_list
 
     def get_admin_count(self) -> int:
@@ -331,7 +441,7 @@ class UserRepository:
         query = q.GET_ADMIN_COUNT
         result = self.db.fetch_one(query)
         count = result[0] if result else 0
-        log.debug(f"Найдено администраторов: {count}")
+        log.debug("Найдено администраторов: %s", count)
         return count
 
     def get_user_role_id(self, user_id: int) -> int | None:
@@ -344,10 +454,10 @@ class UserRepository:
         Returns:
             int | None: ID роли или None, если пользователь не найден.
         """
-        log.debug(f"Запрос RoleID для пользователя ID={user_id}")
+        log.debug("Запрос RoleID для пользователя ID=%s", user_id)
         result = self.db.fetch_one(q.GET_USER_ROLE_ID_BY_USER_ID, (user_id,))
         role_id = result[0] if result else None
-        log.debug(f"RoleID для пользователя ID={user_id}: {role_id}")
+        log.debug("RoleID для пользователя ID=%s: %s", user_id, role_id)
         return role_id
 
     def get_admin_role_id(self) -> int | None:
@@ -360,10 +470,9 @@ class UserRepository:
             int | None: ID роли администратора или None, если роль не найдена.
         """
         log.debug("Запрос ID роли 'Администратор'")
-        result = self.db.fetch_one(q.GET_ADMIN_ROLE_ID)
-        role_id = result[0] if result else None
+        role_id = self.db.references.get_id("Roles", q.ROLE_ADMIN)
         if role_id is None:
             log.error(
                 "Не удалось найти ID роли 'Администратор'. Проверьте наличие роли в таблице Roles.")
-        log.debug(f"ID роли 'Администратор': {role_id}")
+        log.debug("ID роли 'Администратор': %s", role_id)
         return role_id
@@ -15,7 +15,7 @@ from .dialogs.add_absence_dialog import AddAbsenceDialog
 # Импортируем диалог редактирования
 from .dialogs.edit_absence_dialog import EditAbsenceDialog
 from .dialogs.import_absences_dialog import ImportAbsencesDialog
-from .utils import load_icon
+from .utils import load_icon, write_xml_stream
 
 log = logging.getLogger(__name__)
 
@@ -25,15 +25,16 @@ class AbsencesFrame(BaseTableFrame):
     Фрейм для отображения и управления записями об отсутствиях сотрудников.
     Включает CRUD, импорт и экспорт.
     """
-    ID_COLUMN_INDEX = 0  # Индекс колонки с ID в self.all_data
+    ID_COLUMN_INDEX = 0  # Индекс колонки с ID в self.page_data
+
+    change_entities = ("Absences", "Employees")
 
     def __init__(self, master, db):
         super().__init__(master, db, table_height=350)
         self.repository = AbsenceRepository(db)
         self.db = db
         self.create_widgets()
-        self.load_data()
-        self.display_data()
+        self.reload()
         # Скрываем колонку ID после первого отображения
         if hasattr(self, 'table') and self.table.winfo_exists() and self.table.get_total_columns() > 0:
             try:
@@ -108,7 +109,7 @@ class AbsencesFrame(BaseTableFrame):
             font=DEFAULT_FONT, text_color=LABEL_TEXT_COLOR, placeholder_text_color="gray", fg_color="white"
         )
         self.search_entry.place(x=search_entry_x, y=search_entry_y)
-        self.search_entry.bind("<KeyRelease>", self.search)
+        self.bind_search(self.search_entry)  # Поиск после паузы в наборе
 
         # --- Таблица и пагинация ---
         self.create_table_widgets()
@@ -123,25 +124,25 @@ class AbsencesFrame(BaseTableFrame):
 
         log.debug("Виджеты AbsencesFrame созданы (с кнопками CRUD и Import/Export)")
 
-    def load_data(self, search_term=None):
-        """ Загружает данные об отсутствиях, включая ID. """
-        log.debug(f"Загрузка данных отсутствий (search_term: {search_term})")
-        if search_term is None:
-            search_term = self.search_entry.get().strip()
-        # Данные приходят с ID в первом столбце
-        self.all_data, self.total_rows = self.repository.get_absences(
-            search_term=search_term)
-        log.debug(
-            f"AbsencesFrame.load_data: Загружено {self.total_rows} строк.")
+    def count_rows(self, search_term):
+        """ Возвращает количество записей об отсутствии с учетом поиска. """
+        return self.repository.count_absences(search_term=search_term)
+
+    def fetch_page(self, search_term, after, page_size, offset=0):
+        """ Загружает одну страницу отсутствий (ID в первом столбце). """
+        return self.repository.get_absences_page(
+            search_term=search_term, after=after, page_size=page_size, offset=offset)
+
+    def display_row(self, row):
+        """ Значения ячеек строки отсутствия (без колонки ID). """
+        return row[1:]
 
     def display_data(self, search_term=None):
         """ Отображает данные отсутствий, пропуская колонку ID. """
         log.debug(f"Отображение данных отсутствий (Стр: {self.current_page})")
 
-        start_index = (self.current_page - 1) * self.rows_per_page
-        end_index = start_index + self.rows_per_page
         # Данные с ID
-        current_page_raw_data = self.all_data[start_index:end_index]
+        current_page_raw_data = self.page_data
 
         # Готовим данные БЕЗ ID для отображения
         current_page_display_data = [row[1:] for row in current_page_raw_data]
@@ -174,17 +175,16 @@ class AbsencesFrame(BaseTableFrame):
         if not selected_rows:
             return None
         selected_row_index_in_view = list(selected_rows)[0]
-        # Рассчитываем индекс в полном списке self.all_data
-        actual_data_index = (self.current_page - 1) * \
-            self.rows_per_page + selected_row_index_in_view
-        if 0 <= actual_data_index < len(self.all_data):
-            absence_id = self.all_data[actual_data_index][self.ID_COLUMN_INDEX]
+        # Строка данных текущей страницы (или загруженного окна в виртуальном режиме)
+        row = self.get_row(selected_row_index_in_view)
+        if row is not None:
+            absence_id = row[self.ID_COLUMN_INDEX]
             log.debug(
-                f"Выбрана стр. {selected_row_index_in_view} (данные {actual_data_index}), ID={absence_id}")
+                f"Выбрана стр. {selected_row_index_in_view}, ID={absence_id}")
             return absence_id
         else:
             log.error(
-                f"Неверный индекс данных {actual_data_index} для выбранной строки {selected_row_index_in_view}")
+                f"Неверный индекс выбранной строки {selected_row_index_in_view}")
             return None
 
     # --- Обработчики кнопок ---
@@ -193,8 +193,7 @@ class AbsencesFrame(BaseTableFrame):
         log.info("Открытие диалога добавления отсутствия")
         dialog = AddAbsenceDialog(self, self.repository)
         dialog.wait_window()
-        self.load_data()
-        self.display_data()  # Обновить после закрытия
+        self.reload()  # Обновить после закрытия
 
     def edit_absence(self):
         """ Открывает диалог редактирования для выбранной записи. """
@@ -208,8 +207,7 @@ class AbsencesFrame(BaseTableFrame):
             f"Открытие диалога редактирования для Absence ID={absence_id}")
         dialog = EditAbsenceDialog(self, self.repository, absence_id)
         dialog.wait_window()
-        self.load_data()
-        self.display_data()  # Обновить после закрытия
+        self.reload()  # Обновить после закрытия
 
     def delete_absence(self):
         """ Удаляет выбранную запись об отсутствии. """
@@ -223,19 +221,8 @@ class AbsencesFrame(BaseTableFrame):
             if self.repository.delete_absence(absence_id):
                 messagebox.showinfo("Успех", "Запись удалена.")
                 log.info(f"Absence ID={absence_id} удален.")
-                # Корректировка страницы и перезагрузка данных
-                current_total = self.total_rows
-                self.load_data()
-                new_total_pages = self.get_total_pages()
-                if self.current_page > new_total_pages > 0:
-                    self.current_page = new_total_pages
-                elif current_total > 0 and self.total_rows == 0:
-                    self.current_page = 1
-                # Проверка случая удаления последней записи на странице (кроме первой)
-                elif self.current_page > 1 and (current_total - 1) % self.rows_per_page == 0 and self.total_rows < current_total:
-                    self.current_page -= 1
-
-                self.display_data()
+                # Перезагрузка данных (reload сам скорректирует номер страницы)
+                self.reload()
             else:
                 messagebox.showerror("Ошибка", "Не удалось удалить запись.")
                 log.error(f"Ошибка удаления Absence ID={absence_id}.")
@@ -245,13 +232,23 @@ class AbsencesFrame(BaseTableFrame):
     def export_data(self):
         """ Экспортирует ВСЕ записи об отсутствиях в CSV и XML. """
         log.info("Экспорт данных об отсутствиях")
-        all_absences_raw, _ = self.repository.get_absences(search_term=None)
-        if not all_absences_raw:
+        # Строки читаются потоково (отдельно для CSV и XML), без загрузки таблицы в память
+        try:
+            probe = self.repository.iter_absences(search_term=None)
+            has_data = next(probe, None) is not None
+            probe.close()
+        except Exception as e:
+            messagebox.showerror("Ошибка экспорта", f"{e}")
+            log.exception(f"Ошибка чтения отсутствий для экспорта: {e}")
+            return
+        if not has_data:
             messagebox.showinfo(...)
             log.info(...)
             return
 
-        all_absences_export = [row[1:] for row in all_absences_raw]  # Без ID
+        def all_absences_export():
+            for row in self.repository.iter_absences(search_term=None):
+                yield row[1:]  # Без ID
 
         export_dir = "export"
         now = datetime.datetime.now()
@@ -270,21 +267,21 @@ class AbsencesFrame(BaseTableFrame):
             with codecs.open(csv_filename, "w", "utf-8-sig") as f:
                 writer = csv.writer(f)
                 writer.writerow(headers)
-                writer.writerows(all_absences_export)
+                writer.writerows(all_absences_export())
             log.info(f"Экспорт в CSV: {csv_filename}")
             csv_success = True
         except Exception as e:
             messagebox.showerror("Ошибка CSV", f"{e}")
             log.exception(...)
-        try:
-            root = ET.Element("Absences")
-            for row_data in all_absences_export:
-                absence_elem = ET.SubElement(root, "Absence")
+        def absence_elements():
+            for row_data in all_absences_export():
+                absence_elem = ET.Element("Absence")
                 for key, value in zip(xml_keys, row_data):
                     ET.SubElement(absence_elem, key).text = str(value)
-            tree = ET.ElementTree(root)
-            ET.indent(tree, space="  ")
-            tree.write(xml_filename, encoding="utf-8", xml_declaration=True)
+                yield absence_elem
+
+        try:
+            write_xml_stream(xml_filename, "Absences", absence_elements())
             log.info(f"Экспорт в XML: {xml_filename}")
             xml_success = True
         except Exception as e:
@@ -306,14 +303,11 @@ class AbsencesFrame(BaseTableFrame):
         dialog = ImportAbsencesDialog(self, self.repository)
         dialog.wait_window()  # Ждем закрытия
         # Перезагружаем данные после импорта
-        self.load_data()
-        self.display_data()
+        self.reload()
 
     def search(self, event=None):
         """ Обработчик поиска. """
         log.debug(f"Поиск отсутствий: '{self.search_entry.get()}'")
-        self.current_page = 1
-        self.load_data()
-        self.display_data()
+        self.reload()  # При новом поиске открывается первая страница
         # Скрытие колонки ID (лучше делать в __init__)
         # if hasattr(self, 'table') and self.table.winfo_exists(): self.table.hide_columns(...)
@@ -0,0 +1,183 @@
+# gui/background.py
+"""
+Модуль фонового выполнения запросов для вкладок интерфейса.
+
+Tkinter не потокобезопасен: виджеты можно трогать только из главного потока.
+`BackgroundLoader` выполняет функцию (обычно вызов репозитория) в общем пуле
+потоков, а результат передает в главный поток через очередь, которую
+виджет опрашивает `after()`. Каждый новый запрос загрузчика отменяет
+предыдущий: результат устаревшего запроса отбрасывается, даже если он уже
+выполнялся.
+
+Запросы к БД из рабочих потоков требуют режима пула (`DATABASE_POOLED`):
+у каждого потока свое соединение SQLite.
+"""
+import atexit
+import itertools
+import logging
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from config import BACKGROUND_POLL_INTERVAL_MS, BACKGROUND_WORKERS
+
+log = logging.getLogger(__name__)
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Возвращает общий пул рабочих потоков (создается при первом обращении).
+
+    Returns:
+        ThreadPoolExecutor: Пул потоков фоновой загрузки.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, BACKGROUND_WORKERS), thread_name_prefix="background")
+            log.debug("Создан пул фоновой загрузки (%s потоков)", max(1, BACKGROUND_WORKERS))
+        return _executor
+
+
+def shutdown_executor(wait: bool = False) -> None:
+    """
+    Останавливает общий пул потоков, отменяя еще не начатые задачи.
+
+    Args:
+        wait (bool, optional): Дождаться завершения уже выполняющихся задач.
+            Нужно перед закрытием БД: задачи используют соединения пула,
+            которые закрывает `Database.close()` (запросы задач - чтение
+            одной страницы, поэтому ожидание короткое).
+    """
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
+        log.debug("Пул фоновой загрузки остановлен")
+
+
+atexit.register(shutdown_executor)
+
+
+class BackgroundLoader:
+    """
+    Фоновые запросы одного виджета с доставкой результата в поток Tk.
+
+    Одновременно актуален только последний запрос (`submit`): обработчики
+    более ранних не вызываются.
+    """
+
+    def __init__(self, widget, use_threads: bool = True,
+                 poll_interval_ms: int = BACKGROUND_POLL_INTERVAL_MS):
+        """
+        Инициализирует загрузчик.
+
+        Args:
+            widget: Виджет Tk, через `after()` которого доставляются результаты.
+            use_threads (bool, optional): Выполнять запросы в пуле потоков;
+                False - сразу в вызывающем потоке (БД без режима пула).
+            poll_interval_ms (int, optional): Период опроса готовых результатов (мс).
+        """
+        self.widget = widget
+        self.use_threads = use_threads
+        self.poll_interval_ms = max(1, poll_interval_ms)
+        self._results: queue.SimpleQueue = queue.SimpleQueue()
+        self._tokens = itertools.count(1)
+        self._token = 0  # Номер актуального запроса
+        self._future: Future | None = None
+        self._after_id = None
+
+    @property
+    def pending(self) -> bool:
+        """True, если актуальный запрос еще не обработан."""
+        return self._future is not None
+
+    def submit(self, func: Callable[[], Any], on_done: Callable[[Any], None],
+               on_error: Callable[[BaseException], None] | None = None) -> None:
+        """
+        Выполняет функцию в фоне, отменяя предыдущий запрос.
+
+        Args:
+            func (Callable[[], Any]): Функция, выполняемая в рабочем потоке.
+                Не должна обращаться к виджетам.
+            on_done (Callable[[Any], None]): Вызывается в потоке Tk с результатом.
+            on_error (Callable[[BaseException], None] | None, optional): Вызывается
+                в потоке Tk при исключении; по умолчанию исключение логируется.
+        """
+        self.cancel()
+        token = self._token = next(self._tokens)
+        if not self.use_threads:
+            try:
+                result = func()
+            except Exception as e:
+                self._handle_error(e, on_error)
+                return
+            on_done(result)
+            return
+
+        future = get_executor().submit(func)
+        self._future = future
+        future.add_done_callback(
+            lambda f: self._results.put((token, f, on_done, on_error)))
+        self._schedule_poll()
+
+    def cancel(self) -> None:
+        """Отменяет актуальный запрос: его результат не будет доставлен."""
+        self._token = next(self._tokens)
+        if self._future is not None:
+            self._future.cancel()  # Не начатая задача не выполнится вовсе
+            self._future = None
+
+    def close(self) -> None:
+        """Отменяет запрос и прекращает опрос результатов (при уничтожении виджета)."""
+        self.cancel()
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    # --- Внутренние методы ---
+
+    def _schedule_poll(self) -> None:
+        """Планирует опрос очереди результатов, если он еще не запланирован."""
+        if self._after_id is None:
+            self._after_id = self.widget.after(self.poll_interval_ms, self._poll)
+
+    def _poll(self) -> None:
+        """Доставляет готовые результаты в потоке Tk; устаревшие отбрасываются."""
+        self._after_id = None
+        if not self.widget.winfo_exists():
+            return
+        while True:
+            try:
+                token, future, on_done, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if token != self._token or future.cancelled():
+                log.debug("Результат устаревшего фонового запроса %s отброшен", token)
+                continue
+            self._future = None
+            error = future.exception()
+            if error is not None:
+                self._handle_error(error, on_error)
+            else:
+                on_done(future.result())
+        if self._future is not None:
+            self._schedule_poll()
+
+    @staticmethod
+    def _handle_error(error: BaseException,
+                      on_error: Callable[[BaseException], None] | None) -> None:
+        """Передает исключение обработчику или логирует его."""
+        if on_error is not None:
+            on_error(error)
+        else:
+            log.error("Ошибка фонового запроса: %s", error, exc_info=error)
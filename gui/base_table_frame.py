@@ -4,6 +4,10 @@ from tksheet import Sheet
 from config import *
 import logging
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from db.database import FTS_MIN_TERM_LENGTH
+from .background import BackgroundLoader
 
 log = logging.getLogger(__name__)
 
@@ -11,23 +15,551 @@ log = logging.getLogger(__name__)
 class BaseTableFrame(ctk.CTkFrame, ABC):
     """
     Абстрактный базовый класс для вкладок с табличным отображением данных.
+
+    Данные загружаются постранично (keyset-пагинация): из БД читается только
+    видимая страница (`self.page_data`) после курсора - ключа последней строки
+    предыдущей страницы. Курсоры просмотренных страниц хранятся, поэтому переход
+    назад и перезагрузка текущей страницы не требуют пролистывания с начала.
+
+    Вкладка подписана на журнал изменений (`db.changes`) по таблицам
+    `change_entities`: после изменения этих таблиц (в том числе другим
+    процессом) текущая страница перезагружается один раз, даже если изменений
+    было много (например, пачки импорта).
+
+    Скрытая вкладка (кэш вкладок `MainWindow`) по журналу не обновляется:
+    `on_show()` перезагружает ее при показе, если данные устарели.
+
+    `reload()` выполняет запросы в пуле потоков (`BackgroundLoader`) и
+    отображает результат в потоке Tk; более новая загрузка отменяет
+    незавершенную, поэтому интерфейс не блокируется медленным запросом.
+
+    Поле поиска, подключенное через `bind_search()`, запускает `search()`
+    только после паузы в наборе (`search_delay_ms`); клавиши, не меняющие
+    текст (стрелки, Shift и т.п.), запросов не вызывают.
+
+    Виртуальный режим (`virtual=True`, по умолчанию `VIRTUAL_TABLES`) заменяет
+    страницы прокруткой: таблица имеет полное число строк, а данные читаются
+    окнами по `VIRTUAL_WINDOW_SIZE` строк вокруг видимой области (с соседними
+    окнами про запас). В памяти хранится не больше `VIRTUAL_CACHE_WINDOWS`
+    окон, строки вытесненных окон очищаются. Окно после уже загруженного
+    читается по курсору, окно с произвольной позиции - через OFFSET.
     """
 
-    def __init__(self, master, db, table_width=1136, table_height=350):
+    # Таблицы, изменения которых отображаются в списке
+    change_entities: tuple[str, ...] = ()
+    # Пауза после ввода в поле поиска до запроса к БД (мс)
+    search_delay_ms: int = SEARCH_DEBOUNCE_MS
+
+    def __init__(self, master, db, table_width=1136, table_height=350, virtual=None):
         super().__init__(master, fg_color=MAIN_BG_COLOR)
         self.db = db
+        self.virtual = VIRTUAL_TABLES if virtual is None else virtual
         self.current_page = 1
         self.rows_per_page = 10
         self.total_rows = 0
-        self.data = []
+        self.page_data = []  # Строки текущей страницы
+        # Курсоры начала страниц: [None (стр. 1), ключ последней строки стр. 1, ...]
+        self._page_cursors = [None]
+        self._paging_search_term = None
         self.table_width = table_width  # !!!
         self.table_height = table_height  # !!!
+        # Версии журнала изменений: учтенная последней загрузкой и последняя полученная
+        self._loaded_version = 0
+        self._changed_version = 0
+        self._refresh_pending = False
+        self._shown = True  # Вкладка отображается (скрытая ждет on_show)
+        # Поиск: введенная строка, отложенный запуск и последний поиск без результатов
+        self._typed_search_term = ""
+        self._search_after_id = None
+        self._empty_search: tuple[str, int] | None = None  # (строка, поколение записей БД)
+        self._load_generation = 0
+        # Фоновые запросы вкладки (без режима пула БД - синхронно)
+        self._loader = BackgroundLoader(self, use_threads=self.db.pooled)
+        # Виртуальный режим: окна строк (номер окна -> строки) в порядке использования,
+        # курсоры после окон и отдельный загрузчик окон при прокрутке
+        self.window_size = max(1, VIRTUAL_WINDOW_SIZE)
+        self._windows: OrderedDict[int, list] = OrderedDict()
+        self._window_cursors: dict[int, tuple] = {}
+        self._requested_windows: frozenset = frozenset()
+        self._visible_range = None
+        self._windows_search_term = None  # Строка поиска загруженных окон
+        self._scroll_after_id = None
+        self._window_loader = BackgroundLoader(self, use_threads=self.db.pooled)
+        if self.change_entities:
+            self.db.changes.subscribe(self._on_db_changes, self.change_entities)
 
     @abstractmethod
-    def load_data(self, search_term=None):
-        """Абстрактный метод: загрузка данных"""
+    def count_rows(self, search_term):
+        """Абстрактный метод: количество строк с учетом поиска"""
         raise NotImplementedError
 
+    @abstractmethod
+    def fetch_page(self, search_term, after, page_size, offset=0):
+        """
+        Абстрактный метод: загрузка одной страницы.
+        Строки читаются после курсора `after`, пропуская `offset` строк.
+        Возвращает (строки страницы, курсор следующей страницы или None).
+        """
+        raise NotImplementedError
+
+    def display_row(self, row):
+        """Возвращает значения ячеек таблицы для строки данных (виртуальный режим)."""
+        return row
+
+    def get_row(self, index):
+        """
+        Возвращает строку данных по номеру строки таблицы.
+
+        Args:
+            index (int): Номер строки в таблице.
+
+        Returns:
+            tuple | list | None: Строка данных или None, если она не загружена.
+        """
+        if self.virtual:
+            rows = self._windows.get(index // self.window_size)
+            offset = index % self.window_size
+            return rows[offset] if rows is not None and offset < len(rows) else None
+        return self.page_data[index] if 0 <= index < len(self.page_data) else None
+
+    def get_search_term(self):
+        """Возвращает текущую строку поиска (пустую, если поля поиска нет)."""
+        search_entry = getattr(self, "search_entry", None)
+        return search_entry.get().strip() if search_entry is not None else ""
+
+    def bind_search(self, entry):
+        """
+        Подключает поле поиска с отложенным запуском `search()`.
+
+        Args:
+            entry (ctk.CTkEntry): Поле ввода строки поиска.
+        """
+        self.search_entry = entry
+        entry.bind("<KeyRelease>", self._on_search_key)
+
+    def search(self, event=None):
+        """Перезагружает список с текущей строкой поиска (с первой страницы)."""
+        self.reload()
+
+    def _on_search_key(self, event=None):
+        """Откладывает поиск до паузы в наборе; изменение строки отменяет текущую загрузку."""
+        term = self.get_search_term()
+        if term == self._typed_search_term:
+            return  # Клавиша не изменила строку поиска
+        self._typed_search_term = term
+        # Результат загрузки по прежней строке уже не нужен
+        self._loader.cancel()
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(self.search_delay_ms, self._run_search)
+
+    def _run_search(self):
+        """Выполняет отложенный поиск."""
+        self._search_after_id = None
+        self.search()
+
+    def _has_no_matches(self, search_term):
+        """
+        Проверяет, что строка поиска заведомо ничего не найдет.
+
+        Поиск ищет подстроку, поэтому строка, содержащая строку прошлого поиска
+        без результатов, тоже ничего не найдет, если с тех пор не было записей
+        в БД. Короткие строки ищутся через LIKE (где `%` и `_` - шаблоны),
+        а длинные - через FTS, где это обычные символы, поэтому сужение
+        применяется только к строкам от `FTS_MIN_TERM_LENGTH` символов.
+        """
+        if self._empty_search is None or not search_term:
+            return False
+        empty_term, generation = self._empty_search
+        return (generation == self.db.write_generation
+                and len(empty_term) >= FTS_MIN_TERM_LENGTH
+                and empty_term in search_term)
+
+    def load_data(self, search_term=None):
+        """
+        Загружает количество строк и текущую страницу с учетом поиска.
+
+        Загрузка синхронная (в потоке Tk); для загрузки в фоне см. `reload()`.
+        При смене строки поиска навигация сбрасывается на первую страницу.
+        Если после удаления текущая страница исчезла, открывается последняя.
+        """
+        self._loader.cancel()
+        if self.virtual:
+            search_term = self._prepare_load(search_term)[0]
+            self._window_loader.cancel()
+            self._apply_windows(self._read_windows(
+                search_term, self._reset_windows(search_term), {}, with_count=True), reset=True)
+            return
+        self._apply_page(self._read_page(*self._prepare_load(search_term), with_count=True))
+
+    def load_page(self):
+        """Загружает строки текущей страницы по сохраненному курсору."""
+        self._loader.cancel()
+        self._apply_page(self._read_page(
+            self._paging_search_term, self.current_page, list(self._page_cursors), with_count=False))
+
+    def reload(self, search_term=None):
+        """
+        Загружает и отображает данные в фоне (см. `load_data`).
+
+        Запрос выполняется в пуле потоков, на время загрузки вкладка
+        показывает состояние загрузки. Более новый вызов (например, следующий
+        символ поиска) отменяет незавершенный.
+        """
+        search_term, page, cursors = self._prepare_load(search_term)
+        if self._has_no_matches(search_term):
+            log.debug("Поиск '%s' сужает поиск без результатов - запрос не нужен", search_term)
+            self._loader.cancel()
+            if self.virtual:
+                self._window_loader.cancel()
+                self._reset_windows(search_term)
+                self._apply_windows((0, {}, {}), reset=True)
+                return
+            self._apply_page((1, [], None, 0))
+            self.display_data()
+            return
+        if self.virtual:
+            self._submit_virtual_load(search_term)
+            return
+        self._submit_load(search_term, page, cursors, with_count=True)
+
+    def _prepare_load(self, search_term):
+        """
+        Фиксирует строку поиска загрузки; при ее смене сбрасывает навигацию.
+
+        Returns:
+            tuple: (строка поиска, номер страницы, копия курсоров страниц).
+        """
+        self._loaded_version = self.db.changes.version
+        self._load_generation = self.db.write_generation
+        if search_term is None:
+            search_term = self.get_search_term()
+        if search_term != self._paging_search_term:
+            self._paging_search_term = search_term
+            self.current_page = 1
+            self._page_cursors = [None]
+        return search_term, self.current_page, list(self._page_cursors)
+
+    def _read_page(self, search_term, page, cursors, with_count):
+        """
+        Выполняет запросы загрузки страницы.
+
+        Не обращается к виджетам и не меняет состояние вкладки, поэтому может
+        выполняться в рабочем потоке.
+
+        Args:
+            search_term (str): Строка поиска.
+            page (int): Номер запрошенной страницы.
+            cursors (list): Курсоры начала известных страниц.
+            with_count (bool): Пересчитать количество строк (и скорректировать
+                номер страницы, если она исчезла).
+
+        Returns:
+            tuple: (номер страницы, строки, курсор следующей страницы,
+                количество строк или None, если оно не пересчитывалось).
+        """
+        total = None
+        if with_count:
+            if page == 1:
+                # Первая страница загружается вместе с количеством строк (один запрос),
+                # count_rows берет его из кэша
+                rows, next_cursor = self.fetch_page(search_term, None, self.rows_per_page)
+                return 1, rows, next_cursor, self.count_rows(search_term) or 0
+            total = self.count_rows(search_term) or 0
+            total_pages = (total + self.rows_per_page - 1) // self.rows_per_page
+            page = max(1, min(page, total_pages, len(cursors)))
+        rows, next_cursor = self.fetch_page(search_term, cursors[page - 1], self.rows_per_page)
+        return page, rows, next_cursor, total
+
+    def _apply_page(self, result):
+        """Применяет результат `_read_page` к состоянию вкладки."""
+        page, rows, next_cursor, total = result
+        if total is not None:
+            self._set_total_rows(total)
+        self.current_page = page
+        self.page_data = rows or []
+        # Курсоры следующих страниц могли устареть - оставляем только известный
+        del self._page_cursors[page:]
+        if next_cursor is not None:
+            self._page_cursors.append(next_cursor)
+        log.debug("Загружена страница %s (%s строк)", self.current_page, len(self.page_data))
+
+    def _set_total_rows(self, total):
+        """Сохраняет количество строк и запоминает поиск без результатов."""
+        self.total_rows = total
+        self._empty_search = ((self._paging_search_term, self._load_generation)
+                              if total == 0 and self._paging_search_term else None)
+
+    def _submit_load(self, search_term, page, cursors, with_count):
+        """Запускает фоновую загрузку страницы и показывает состояние загрузки."""
+        self._set_loading()
+        self._loader.submit(
+            lambda: self._read_page(search_term, page, cursors, with_count),
+            self._on_page_loaded, self._on_load_error)
+
+    def _on_page_loaded(self, result):
+        """Применяет и отображает результат фоновой загрузки (поток Tk)."""
+        self._apply_page(result)
+        self.display_data()
+
+    def _on_load_error(self, error):
+        """Обрабатывает ошибку фоновой загрузки: остаются прежние данные."""
+        log.error("Ошибка загрузки данных вкладки: %s", error, exc_info=error)
+        if hasattr(self, "page_label"):
+            self.update_page_label()
+            self.update_buttons_state()
+
+    def _set_loading(self):
+        """Показывает состояние загрузки и блокирует кнопки пагинации."""
+        if not hasattr(self, "page_label"):
+            return
+        self.page_label.configure(text="Загрузка...")
+        for button in (self.prev_button, self.next_button):
+            button.configure(state="disabled", border_width=0, fg_color="#E9ECEF")
+
+    # --- Виртуальный режим ---
+
+    def _read_windows(self, search_term, windows, cursors, with_count):
+        """
+        Читает окна строк виртуальной таблицы.
+
+        Как и `_read_page`, не обращается к виджетам и может выполняться
+        в рабочем потоке. Окно после известного курсора читается keyset-запросом,
+        остальные - через OFFSET.
+
+        Args:
+            search_term (str): Строка поиска.
+            windows (Iterable[int]): Номера окон.
+            cursors (dict[int, tuple]): Курсоры после уже загруженных окон.
+            with_count (bool): Пересчитать количество строк.
+
+        Returns:
+            tuple: (количество строк или None, {номер окна: строки},
+                {номер окна: курсор после окна}).
+        """
+        cursors = dict(cursors)
+        loaded = {}
+        for window in sorted(windows):
+            if window == 0:
+                # Первое окно запрашивается вместе с количеством строк
+                rows, next_cursor = self.fetch_page(search_term, None, self.window_size)
+            elif window - 1 in cursors:
+                rows, next_cursor = self.fetch_page(search_term, cursors[window - 1], self.window_size)
+            else:
+                rows, next_cursor = self.fetch_page(
+                    search_term, None, self.window_size, offset=window * self.window_size)
+            loaded[window] = rows or []
+            if next_cursor is not None:
+                cursors[window] = next_cursor
+        total = (self.count_rows(search_term) or 0) if with_count else None
+        return total, loaded, cursors
+
+    def _submit_virtual_load(self, search_term):
+        """Запускает фоновую перезагрузку виртуальной таблицы (количество и видимые окна)."""
+        self._window_loader.cancel()
+        self._requested_windows = frozenset()
+        self._set_loading()
+        windows = self._reset_windows(search_term)
+        self._loader.submit(
+            lambda: self._read_windows(search_term, windows, {}, with_count=True),
+            lambda result: self._apply_windows(result, reset=True), self._on_load_error)
+
+    def _reset_windows(self, search_term):
+        """
+        Возвращает окна для перезагрузки; при новом поиске прокручивает таблицу в начало.
+
+        Args:
+            search_term (str): Строка поиска перезагрузки.
+
+        Returns:
+            list[int]: Номера окон для загрузки.
+        """
+        if search_term == self._windows_search_term:
+            return self._needed_windows()
+        self._windows_search_term = search_term
+        self._visible_range = None
+        try:
+            self.table.see(0, 0, redraw=False)
+        except Exception:
+            pass  # Пустая таблица
+        return list(range(VIRTUAL_PREFETCH_WINDOWS + 1))
+
+    def _apply_windows(self, result, reset=False):
+        """
+        Применяет результат `_read_windows` к таблице (поток Tk).
+
+        Args:
+            result (tuple): Результат `_read_windows`.
+            reset (bool, optional): Данные перезагружены целиком - прежние окна
+                устарели и очищаются.
+        """
+        total, loaded, cursors = result
+        if reset:
+            if total != self.total_rows or self.table.total_rows() != total:
+                self.table.set_sheet_data(
+                    data=[self._blank_row() for _ in range(total)], redraw=False, verify=False)
+            else:
+                for window in self._windows:
+                    if window not in loaded:
+                        self._clear_window(window)
+            self._windows.clear()
+            self._window_cursors = {}
+        if total is not None:
+            self._set_total_rows(total)
+        self._window_cursors.update(cursors)
+        for window, rows in loaded.items():
+            self._store_window(window, rows)
+        self._evict_windows()
+        self.table.refresh()
+        self.update_page_label()
+        log.debug("Загружены окна %s (всего строк %s)", sorted(loaded), self.total_rows)
+        self._schedule_scroll_check()
+        self._request_windows()
+
+    def _on_windows_loaded(self, result):
+        """Применяет окна, загруженные при прокрутке (поток Tk)."""
+        self._requested_windows = frozenset()
+        self._apply_windows(result)
+
+    def _blank_row(self):
+        """Пустая строка таблицы (по числу заголовков)."""
+        return [""] * len(self.table.headers())
+
+    def _store_window(self, window, rows):
+        """Записывает строки окна в таблицу и в кэш окон."""
+        start = window * self.window_size
+        total_rows = self.table.total_rows()
+        for offset, row in enumerate(rows):
+            if start + offset >= total_rows:
+                break
+            for column, value in enumerate(self.display_row(row)):
+                self.table.set_cell_data(start + offset, column, value, redraw=False)
+        self._windows[window] = rows
+        self._windows.move_to_end(window)
+
+    def _clear_window(self, window):
+        """Очищает строки окна в таблице."""
+        start = window * self.window_size
+        end = min(start + self.window_size, self.table.total_rows())
+        blank = self._blank_row()
+        for row_index in range(start, end):
+            for column, value in enumerate(blank):
+                self.table.set_cell_data(row_index, column, value, redraw=False)
+
+    def _evict_windows(self):
+        """Вытесняет давно не видимые окна сверх `VIRTUAL_CACHE_WINDOWS` (кроме нужных сейчас)."""
+        needed = set(self._needed_windows())
+        limit = max(VIRTUAL_CACHE_WINDOWS, len(needed))
+        for window in list(self._windows):
+            if len(self._windows) <= limit:
+                break
+            if window in needed:
+                continue
+            del self._windows[window]
+            self._clear_window(window)
+
+    def _needed_windows(self):
+        """Номера окон видимой области и соседних окон (`VIRTUAL_PREFETCH_WINDOWS`)."""
+        start, end = self._visible_rows()
+        first = start // self.window_size - VIRTUAL_PREFETCH_WINDOWS
+        last = end // self.window_size + VIRTUAL_PREFETCH_WINDOWS
+        if self.total_rows:
+            last = min(last, (self.total_rows - 1) // self.window_size)
+        return list(range(max(0, first), max(0, last) + 1))
+
+    def _visible_rows(self):
+        """Первая и последняя видимые строки таблицы."""
+        table = getattr(self, "table", None)
+        try:
+            start, end = table.visible_rows
+        except Exception:
+            return 0, self.window_size - 1
+        return start, max(start, end)
+
+    def _request_windows(self):
+        """Загружает в фоне недостающие окна видимой области."""
+        if not self.virtual or self._loader.pending:
+            return  # Перезагрузка загрузит видимые окна сама
+        needed = self._needed_windows()
+        for window in needed:
+            if window in self._windows:
+                self._windows.move_to_end(window)
+        missing = frozenset(window for window in needed if window not in self._windows)
+        if not missing or (self._window_loader.pending and missing == self._requested_windows):
+            return
+        self._requested_windows = missing
+        search_term, cursors = self._paging_search_term, dict(self._window_cursors)
+        self._window_loader.submit(
+            lambda: self._read_windows(search_term, missing, cursors, with_count=False),
+            self._on_windows_loaded, self._on_load_error)
+
+    def _schedule_scroll_check(self):
+        """Планирует проверку видимой области (пока вкладка отображается)."""
+        if self._scroll_after_id is None and self._shown:
+            self._scroll_after_id = self.after(VIRTUAL_SCROLL_POLL_MS, self._check_scroll)
+
+    def _check_scroll(self):
+        """Запрашивает окна, если видимая область таблицы изменилась."""
+        self._scroll_after_id = None
+        if not self.winfo_exists() or not self._shown:
+            return
+        visible = self._visible_rows()
+        if visible != self._visible_range:
+            self._visible_range = visible
+            self._request_windows()
+        self._schedule_scroll_check()
+
+    def _on_db_changes(self, changes):
+        """
+        Обработчик журнала изменений: планирует перезагрузку текущей страницы.
+
+        Вызывается в потоке, подтвердившем изменения (для записей из интерфейса -
+        главном потоке Tk).
+
+        Args:
+            changes (list[Change]): Изменения таблиц `change_entities`.
+        """
+        self._changed_version = max(self._changed_version, changes[-1].version)
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self._refresh_from_changes)
+
+    def _refresh_from_changes(self):
+        """Перезагружает страницу, если изменения не учтены более поздней загрузкой."""
+        self._refresh_pending = False
+        if not self.winfo_exists() or not self._shown or self._changed_version <= self._loaded_version:
+            return
+        log.debug("Обновление списка по журналу изменений (версия %s)", self._changed_version)
+        self.reload()
+
+    def on_show(self):
+        """Вызывается при повторном показе вкладки: перезагружает данные, если они устарели."""
+        self._shown = True
+        if self.virtual:
+            self._schedule_scroll_check()
+        if self._changed_version > self._loaded_version:
+            log.debug("Вкладка %s устарела (версия %s), перезагрузка",
+                      type(self).__name__, self._changed_version)
+            self.reload()
+
+    def on_hide(self):
+        """Вызывается при скрытии вкладки: обновления по журналу откладываются до показа."""
+        self._shown = False
+        if self._scroll_after_id is not None:
+            self.after_cancel(self._scroll_after_id)
+            self._scroll_after_id = None
+
+    def destroy(self):
+        """Отписывается от журнала изменений, отменяет загрузку и уничтожает вкладку."""
+        self.db.changes.unsubscribe(self._on_db_changes)
+        self._loader.close()
+        self._window_loader.close()
+        for after_id in (self._search_after_id, self._scroll_after_id):
+            if after_id is not None:
+                self.after_cancel(after_id)
+        self._search_after_id = self._scroll_after_id = None
+        super().destroy()
+
     @abstractmethod
     def display_data(self, search_term=None):
         """
@@ -110,9 +642,13 @@ class BaseTableFrame(ctk.CTkFrame, ABC):
         self.page_label = ctk.CTkLabel(self.pagination_frame, text="Страница 1 / 1",
                                        font=("Arial", 16, "bold"), text_color="#000000")
 
-        self.prev_button.pack(side="left", padx=(0, 5))
-        self.page_label.pack(side="left", padx=5)
-        self.next_button.pack(side="left", padx=(5, 0))
+        if self.virtual:
+            # Страницы не нужны: строки подгружаются при прокрутке
+            self.page_label.pack(side="left", padx=5)
+        else:
+            self.prev_button.pack(side="left", padx=(0, 5))
+            self.page_label.pack(side="left", padx=5)
+            self.next_button.pack(side="left", padx=(5, 0))
 
         # !!! Очень важно: конфигурируем grid, чтобы таблица растягивалась !!!
         self.table_wrapper.grid_rowconfigure(0, weight=1)
@@ -120,18 +656,22 @@ class BaseTableFrame(ctk.CTkFrame, ABC):
 
     def prev_page(self):
         """Переходит на предыдущую страницу."""
-        if self.current_page > 1:
-            self.current_page -= 1
-            self.display_data()
+        if self.current_page > 1 and not self._loader.pending:
+            self._submit_load(self._paging_search_term, self.current_page - 1,
+                              list(self._page_cursors), with_count=False)
 
     def next_page(self):
         """Переходит на следующую страницу."""
-        if self.current_page < self.get_total_pages():
-            self.current_page += 1
-            self.display_data()
+        if (self.current_page < self.get_total_pages() and len(self._page_cursors) > self.current_page
+                and not self._loader.pending):
+            self._submit_load(self._paging_search_term, self.current_page + 1,
+                              list(self._page_cursors), with_count=False)
 
     def update_page_label(self):
         """Обновляет метку с номером текущей страницы и общим количеством страниц."""
+        if self.virtual:
+            self.page_label.configure(text=f"Строк: {self.total_rows}")
+            return
         total_pages = self.get_total_pages()
         if total_pages == 0:
             self.page_label.configure(text="Страница 1 / 1")
@@ -145,6 +685,8 @@ class BaseTableFrame(ctk.CTkFrame, ABC):
 
     def update_buttons_state(self):
         """Обновляет состояние кнопок пагинации."""
+        if self.virtual:
+            return
         if self.current_page == 1:
             self.prev_button.configure(
                 state="disabled", border_width=0, fg_color="#E9ECEF")
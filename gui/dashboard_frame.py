@@ -26,12 +26,19 @@ class DashboardFrame(ctk.CTkFrame):
     с ключевыми показателями и визуализациями.
     """
 
+    # Таблицы, изменения которых меняют показатели дашборда
+    change_entities = ("Employees", "EmployeeEvents", "Departments", "Positions",
+                       "Genders", "States", "Events")
+
     def __init__(self, master, db):
         super().__init__(master, fg_color=MAIN_BG_COLOR)
         self.db = db
+        # Версия журнала изменений и дата, на которые загружены показатели
+        self._loaded_version = 0
+        self._loaded_date: datetime.date | None = None
         # Инициализируем репозитории
-        self.employee_repo = EmployeeRepository(self.db)
-        self.event_repo = EmployeeEventRepository(self.db)
+        self.employee_repo = EmployeeRepository(self.db, self.db.read_only())
+        self.event_repo = EmployeeEventRepository(self.db, self.db.read_only())
 
         # --- Настройка стиля matplotlib с увеличенными шрифтами ---
         try:
@@ -139,20 +146,22 @@ class DashboardFrame(ctk.CTkFrame):
     def load_dashboard_data(self):
         """Загружает все данные для дашборда и обновляет виджеты."""
         log.info("Загрузка данных для дашборда...")
+        self._loaded_version = self.db.changes.version
+        self._loaded_date = datetime.date.today()
         try:
-            # --- Загрузка данных для KPI ---
-            total_employees = self.employee_repo.get_active_employee_count()
-            hired_count = self.event_repo.get_event_count_last_days(
+            # --- Загрузка данных для KPI (из сводных таблиц) ---
+            total_employees = self.employee_repo.get_active_headcount()
+            hired_count = self.event_repo.get_event_count_last_days_summary(
                 "Прием", 30)
-            fired_count = self.event_repo.get_event_count_last_days(
+            fired_count = self.event_repo.get_event_count_last_days_summary(
                 "Увольнение", 30)
 
             # --- Загрузка данных для Графиков ---
-            dept_data = self.employee_repo.get_employees_count_by_department()
-            pos_data = self.employee_repo.get_employees_count_by_position(
+            dept_data = self.employee_repo.get_headcount_by_department()
+            pos_data = self.employee_repo.get_headcount_by_position(
                 limit=7)  # Топ 7 должностей
-            birth_dates = self.employee_repo.get_active_employee_birth_dates()
-            gender_data = self.employee_repo.get_gender_distribution()
+            age_counts = self.employee_repo.get_headcount_by_age()
+            gender_data = self.employee_repo.get_headcount_by_gender()
 
             # --- Обновление KPI ---
             self.total_employees_label.configure(text=str(total_employees))
@@ -162,7 +171,7 @@ class DashboardFrame(ctk.CTkFrame):
             # --- Создание/Обновление Графиков ---
             self._create_department_pie_chart(dept_data)
             self._create_position_bar_chart(pos_data)
-            self._create_age_histogram(birth_dates)
+            self._create_age_histogram(age_counts)
             self._create_gender_pie_chart(gender_data)
 
             log.info("Данные для дашборда успешно загружены и отображены.")
@@ -180,6 +189,20 @@ class DashboardFrame(ctk.CTkFrame):
             self._display_error_in_frame(self.age_chart_frame)
             self._display_error_in_frame(self.gender_chart_frame)
 
+    def on_show(self):
+        """
+        Вызывается при повторном показе вкладки (кэш вкладок `MainWindow`).
+
+        Дашборд перерисовывается, только если с момента загрузки изменились
+        таблицы `change_entities` или сменилась дата (показатели за 30 дней).
+        """
+        if self._loaded_date == datetime.date.today():
+            changes = self.db.changes.changes_since(self._loaded_version, self.change_entities)
+            if changes is not None and not changes:
+                log.debug("Данные дашборда актуальны, перерисовка не нужна.")
+                return
+        self.load_dashboard_data()
+
     def _clear_frame(self, frame):
         """Очищает фрейм от всех дочерних виджетов."""
         for widget in frame.winfo_children():
@@ -288,27 +311,24 @@ class DashboardFrame(ctk.CTkFrame):
             log.exception("Ошибка при создании графика по должностям")
             self._display_error_in_frame(self.pos_chart_frame)
 
-    def _create_age_histogram(self, birth_dates):
-        """Создает гистограмму распределения по возрасту."""
+    def _create_age_histogram(self, age_counts):
+        """
+        Создает гистограмму распределения по возрасту.
+
+        Args:
+            age_counts (list[tuple[int, int]]): Возраст (полных лет) с количеством сотрудников.
+        """
         self._clear_frame(self.age_chart_frame)
-        if not birth_dates:
+        if not age_counts:
             self._display_no_data_in_frame(self.age_chart_frame)
             return
 
         ages = []
-        today = datetime.date.today()
-        for date_str in birth_dates:
-            try:
-                birth_date = datetime.datetime.strptime(
-                    date_str, "%Y-%m-%d").date()
-                age = today.year - birth_date.year - \
-                    ((today.month, today.day) < (birth_date.month, birth_date.day))
-                if age >= 18:
-                    ages.append(age)
-            except (ValueError, TypeError):
-                log.warning(
-                    f"Некорректная дата рождения '{date_str}' при расчете возраста.")
-                continue
+        weights = []
+        for age, count in age_counts:
+            if age >= 18:
+                ages.append(age)
+                weights.append(count)
 
         if not ages:
             self._display_no_data_in_frame(self.age_chart_frame)
@@ -326,7 +346,7 @@ class DashboardFrame(ctk.CTkFrame):
                 bins.append(bins[-1]+bin_step)
 
             n, bins_ret, patches = ax.hist(
-                ages, bins=bins, color=ACCENT_COLOR, edgecolor='white', rwidth=0.9)
+                ages, bins=bins, weights=weights, color=ACCENT_COLOR, edgecolor='white', rwidth=0.9)
             ax.set_xlabel('Возраст', fontsize=12)  # Увеличен шрифт
             ax.set_ylabel('Количество сотрудников',
                           fontsize=12)  # Увеличен шрифт
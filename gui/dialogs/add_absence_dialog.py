@@ -594,10 +594,8 @@ class AddAbsenceDialog(ctk.CTkToplevel):
                 "Успех", "Запись об отсутствии успешно добавлена.")
             log.info("Запись об отсутствии успешно добавлена через диалог.")
             # Обновляем данные в родительском фрейме (AbsencesFrame)
-            if self.master and hasattr(self.master, 'load_data'):
-                self.master.load_data()
-            if self.master and hasattr(self.master, 'display_data'):
-                self.master.display_data()
+            if self.master and hasattr(self.master, 'reload'):
+                self.master.reload()
             self.destroy()  # Закрываем диалог
         else:
             # Ошибка на уровне БД
@@ -235,10 +235,8 @@ class AddUserDialog(ctk.CTkToplevel):
                 "Успех", f"Пользователь '{validated_data['login']}' успешно добавлен.")
             log.info(f"Пользователь '{validated_data['login']}' добавлен.")
             # Обновляем данные в родительском фрейме (UsersFrame)
-            if self.master and hasattr(self.master, 'load_data'):
-                self.master.load_data()
-            if self.master and hasattr(self.master, 'display_data'):
-                self.master.display_data()
+            if self.master and hasattr(self.master, 'reload'):
+                self.master.reload()
             self.destroy()  # Закрываем диалог
         else:
             messagebox.showerror(
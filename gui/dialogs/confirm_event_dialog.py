@@ -4,7 +4,6 @@ from config import *
 import datetime
 from tkinter import messagebox
 import logging
-import db.queries as q
 
 log = logging.getLogger(__name__)
 
@@ -21,6 +20,9 @@ class ConfirmEventDialog(ctk.CTkToplevel):
         self.position_id = position_id      # Может быть None
         self.master_window = master  # Ссылка на EditEmployeeDialog
         self.confirmed = False  # Добавляем атрибут-флаг
+        # Параметры события для insert_event; запись выполняет вызывающий диалог
+        # в одной транзакции с обновлением сотрудника.
+        self.event_data = None
 
         self.title(event_type)
         self.geometry("500x300")  # Или другой подходящий размер
@@ -94,7 +96,7 @@ class ConfirmEventDialog(ctk.CTkToplevel):
 
         event_date = datetime.date.today().strftime("%Y-%m-%d")
 
-        success = self.employee_event_repository.insert_event(
+        self.event_data = (
             self.personnel_number,
             event_id,
             event_date,
@@ -102,36 +104,27 @@ class ConfirmEventDialog(ctk.CTkToplevel):
             self.position_id,
             reason
         )
-
-        if success:
-            messagebox.showinfo(
-                "Успех", f"Событие '{self.event_type}' успешно зарегистрировано.")
-            log.info(
-                f"Кадровое событие {self.event_type} успешно зарегистрировано, таб.номер {self.personnel_number}")
-            self.confirmed = True  # Устанавливаем флаг
-            self.destroy()
-            if self.master_window and hasattr(self.master_window, "display_data"):
-                self.master_window.display_data()
-        else:
-            messagebox.showerror(
-                "Ошибка", f"Не удалось зарегистрировать событие '{self.event_type}'.")
-            log.error(
-                f"Ошибка регистрации кадрового события {self.event_type} таб.номер {self.personnel_number}")
+        log.info(
+            f"Кадровое событие {self.event_type} подтверждено, таб.номер {self.personnel_number}")
+        self.confirmed = True  # Устанавливаем флаг
+        self.destroy()
 
     def was_confirmed(self):
         """Возвращает True, если пользователь нажал 'Подтвердить', иначе False."""
         return self.confirmed
 
+    def get_event_data(self):
+        """
+        Возвращает параметры подтвержденного события для insert_event
+        (personnel_number, event_id, event_date, department_id, position_id, reason)
+        или None, если событие не подтверждено.
+        """
+        return self.event_data
+
     def cancel(self):
         """Закрываем диалог без подтверждения."""
         self.destroy()
 
     def get_event_id(self, event_name):
-        """Вспомогательный метод для получения ID события по названию."""
-        print(
-            f"Type of self.employee_event_repository: {type(self.employee_event_repository)}")
-        print(
-            f"Type of self.employee_event_repository.db: {type(self.employee_event_repository.db)}")
-        event = self.employee_event_repository.db.fetch_one(
-            q.GET_EVENT_ID_BY_NAME, (event_name,))
-        return event[0] if event else None
+        """Вспомогательный метод для получения ID события по названию (из кэша справочников)."""
+        return self.employee_event_repository.db.references.get_id("Events", event_name)
@@ -441,10 +441,8 @@ class EditAbsenceDialog(ctk.CTkToplevel):
         if success:
             messagebox.showinfo("Успех", "Запись обновлена.")
             log.info(f"ID={self.absence_id} обновлен.")
-            if self.master and hasattr(self.master, 'load_data'):
-                self.master.load_data()
-            if self.master and hasattr(self.master, 'display_data'):
-                self.master.display_data()
+            if self.master and hasattr(self.master, 'reload'):
+                self.master.reload()
             self.destroy()
         else:
             messagebox.showerror("Ошибка", "Не удалось обновить запись.")
@@ -5,6 +5,7 @@ import re
 import datetime
 from tkinter import messagebox
 import logging
+import sqlite3
 from db.employee_repository import EmployeeRepository
 from db.employee_event_repository import EmployeeEventRepository
 import db.queries as q
@@ -447,6 +448,7 @@ class EditEmployeeDialog(ctk.CTkToplevel):
         # --- Конец валидации ---
 
         update_employee_data = True
+        event_data = None  # Параметры кадрового события, если оно требуется
 
         # --- Определение кадрового события и открытие диалога подтверждения ---
         old_state = self.employee_data[8]
@@ -493,6 +495,8 @@ class EditEmployeeDialog(ctk.CTkToplevel):
             #  Проверяем, было ли подтверждено событие.
             if not dialog.was_confirmed():  # Изменено
                 update_employee_data = False
+            else:
+                event_data = dialog.get_event_data()
 
         # --- Обновление данных сотрудника (если не было отмены) ---
         if update_employee_data:
@@ -512,12 +516,28 @@ class EditEmployeeDialog(ctk.CTkToplevel):
                 log.error("Не найдены ID в справочниках")
                 return
 
-            success = self.employee_repository.update_employee(
-                personnel_number, lastname, firstname, middlename, birth_date_str,
-                gender_id, position_id, department_id, state_id
-            )
+            # Событие и изменение сотрудника записываются атомарно, одним commit
+            success = False
+            try:
+                with self.employee_repository.db.transaction():
+                    event_saved = True
+                    if event_data:
+                        event_saved = self.employee_event_repository.insert_event(
+                            *event_data)
+                    if event_saved:
+                        success = self.employee_repository.update_employee(
+                            personnel_number, lastname, firstname, middlename, birth_date_str,
+                            gender_id, position_id, department_id, state_id
+                        )
+            except sqlite3.Error as e:
+                log.exception(
+                    f"Ошибка транзакции при обновлении сотрудника {personnel_number}: {e}")
+                success = False
 
             if success:
+                if event_data:
+                    log.info(
+                        f"Кадровое событие '{event_type}' зарегистрировано, таб.номер {personnel_number}")
                 messagebox.showinfo("Успех", "Данные сотрудника обновлены!")
                 log.info(f"Данные сотрудника {personnel_number} обновлены")
                 self.destroy()  # Закрываем диалог редактирования
@@ -660,17 +680,3 @@ class EditEmployeeDialog(ctk.CTkToplevel):
         """
         log.debug("Закрытие диалога EditEmployeeDialog без сохранения")
         self.destroy()
-
-    def insert_event(self, personnel_number, event_id, event_date, department_id, position_id, reason=None):
-        """Добавляет запись о кадровом событии."""
-
-        log.debug(
-            f"Добавление кадрового события: personnel_number={personnel_number}, event_id={event_id}, event_date={event_date}, department_id={department_id}, position_id={position_id}, reason={reason}")
-
-        params = (personnel_number, event_id, event_date,
-                  department_id, position_id, reason)
-        result = self.db.execute_query(
-            q.INSERT_EMPLOYEE_EVENT, params)  # !!! ЗАПРОС НИЖЕ!!!
-
-        log.debug(f"Результат добавления кадрового события: {result}")  # !!!
-        return result
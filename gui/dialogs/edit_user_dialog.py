@@ -274,10 +274,8 @@ class EditUserDialog(ctk.CTkToplevel):
             messagebox.showinfo(
                 "Успех", f"Данные пользователя успешно обновлены.")
             log.info(f"Данные пользователя ID={self.user_id} обновлены.")
-            if self.master and hasattr(self.master, 'load_data'):
-                self.master.load_data()
-            if self.master and hasattr(self.master, 'display_data'):
-                self.master.display_data()
+            if self.master and hasattr(self.master, 'reload'):
+                self.master.reload()
             self.destroy()
         else:
             messagebox.showerror(
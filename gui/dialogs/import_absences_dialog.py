@@ -10,6 +10,7 @@ import codecs  # Для utf-8-sig
 import re  # Для валидации
 import datetime  # Для валидации и определения дня недели
 from db.absence_repository import AbsenceRepository  # Импортируем наш репозиторий
+from db.date_codes import time_to_minutes
 import os
 
 log = logging.getLogger(__name__)
@@ -134,15 +135,15 @@ class ImportAbsencesDialog(ctk.CTkToplevel):  # Наследуемся от CTkT
                             f"Ошибки обработки файлов: {total_errors}")
 
         # Обновляем данные в родительском фрейме
-        if self.master_frame and hasattr(self.master_frame, "load_data"):
-            self.master_frame.load_data()
-        if self.master_frame and hasattr(self.master_frame, "display_data"):
-            self.master_frame.display_data()
+        if self.master_frame and hasattr(self.master_frame, "reload"):
+            self.master_frame.reload()
 
     def process_csv(self, file_path):
         """ Обрабатывает CSV файл. Возвращает (added, skipped, errors). """
         log.info(f"Обработка CSV: {file_path}")
         added, skipped = 0, 0
+        valid_rows = []  # Параметры прошедших валидацию строк
+        seen_keys = set()  # (Таб.№, дата) уже принятых строк файла
         # Проверяем наличие в нижнем регистре
         required_headers = {"personnelnumber",
                             "absencedate", "fullday", "reason"}
@@ -164,10 +165,14 @@ class ImportAbsencesDialog(ctk.CTkToplevel):  # Наследуемся от CTkT
                     # Переводим ключи строки в нижний регистр для унификации
                     row_lower = {k.lower().strip(): v for k,
                                  v in row.items() if k}
-                    if self.validate_and_insert_absence_row(row_lower, f"CSV строка {line_num}"):
-                        added += 1
+                    params = self.validate_absence_row(
+                        row_lower, f"CSV строка {line_num}", seen_keys)
+                    if params:
+                        valid_rows.append(params)
                     else:
                         skipped += 1  # Ошибка валидации или дубликат = пропуск
+            added, failed = self.insert_valid_rows(valid_rows)
+            skipped += failed
         except FileNotFoundError:
             messagebox.showerror("Ошибка", f"Файл не найден: {file_path}")
             return 0, 0, 1
@@ -182,6 +187,8 @@ class ImportAbsencesDialog(ctk.CTkToplevel):  # Наследуемся от CTkT
         """ Обрабатывает XML файл. Возвращает (added, skipped, errors). """
         log.info(f"Обработка XML: {file_path}")
         added, skipped = 0, 0
+        valid_rows = []
+        seen_keys = set()
         try:
             tree = ET.parse(file_path)
             root = tree.getroot()
@@ -200,10 +207,14 @@ class ImportAbsencesDialog(ctk.CTkToplevel):  # Наследуемся от CTkT
                     value = child.text.strip() if child.text else ""
                     row_data[tag_lower] = value
 
-                if self.validate_and_insert_absence_row(row_data, f"XML запись #{index + 1}"):
-                    added += 1
+                params = self.validate_absence_row(
+                    row_data, f"XML запись #{index + 1}", seen_keys)
+                if params:
+                    valid_rows.append(params)
                 else:
                     skipped += 1
+            added, failed = self.insert_valid_rows(valid_rows)
+            skipped += failed
         except ET.ParseError as e:
             messagebox.showerror(
                 "Ошибка XML", f"Ошибка разбора XML файла '{os.path.basename(file_path)}':\n{e}")
@@ -218,11 +229,25 @@ class ImportAbsencesDialog(ctk.CTkToplevel):  # Наследуемся от CTkT
             return added, skipped, 1
         return added, skipped, 0
 
-    def validate_and_insert_absence_row(self, row_data, source_info=""):
+    def insert_valid_rows(self, valid_rows):
         """
-        Валидирует данные из строки (словаря) и вставляет в БД.
-        Возвращает True при успехе, False при ошибке/пропуске.
-        Логирует детали ошибок.
+        Вставляет прошедшие валидацию записи одной пакетной операцией.
+        Возвращает (добавлено, пропущено из-за ошибок БД).
+        """
+        if not valid_rows:
+            return 0, 0
+        added, failed = self.repository.insert_absences_bulk(valid_rows)
+        for _, params, error in failed:
+            log.error(
+                f"Импорт: Не удалось добавить запись для '{params[0]}' на '{params[1]}': {error}")
+        return added, len(failed)
+
+    def validate_absence_row(self, row_data, source_info="", seen_keys=None):
+        """
+        Валидирует данные из строки (словаря).
+        Возвращает кортеж параметров для insert_absences_bulk или None при ошибке/пропуске.
+        seen_keys - множество (Таб.№, дата) уже принятых строк импорта
+        для отсева дубликатов внутри файла. Логирует детали ошибок.
         """
         # 1. Извлечение и базовая проверка наличия
         pn = row_data.get('personnelnumber', '').strip()
@@ -237,13 +262,13 @@ class ImportAbsencesDialog(ctk.CTkToplevel):  # Наследуемся от CTkT
         if not (pn and date_str and fullday_raw and reason):
             log.warning(
                 f"Импорт пропущен ({source_info}): Не заполнены обязательные поля (PersonnelNumber, AbsenceDate, FullDay, Reason). Данные: {row_data}")
-            return False
+            return None
 
         # 2. Валидация табельного номера (просто что цифры, существование проверим позже)
         if not pn.isdigit():
             log.warning(
                 f"Импорт пропущен ({source_info}): Некорректный PersonnelNumber '{pn}'. Должен содержать только цифры.")
-            return False
+            return None
 
         # 3. Валидация и парсинг даты
         try:
@@ -252,7 +277,7 @@ class ImportAbsencesDialog(ctk.CTkToplevel):  # Наследуемся от CTkT
         except ValueError:
             log.warning(
                 f"Импорт пропущен ({source_info}): Некорректный формат AbsenceDate '{date_str}'. Ожидается ГГГГ-ММ-ДД.")
-            return False
+            return None
 
         # 4. Парсинг FullDay
         full_day = -1  # Невалидное значение
@@ -263,7 +288,7 @@ class ImportAbsencesDialog(ctk.CTkToplevel):  # Наследуемся от CTkT
         else:
             log.warning(
                 f"Импорт пропущен ({source_info}): Некорректное значение FullDay '{fullday_raw}'. Ожидается 0/1/True/False/Да/Нет.")
-            return False
+            return None
 
         # 5. Валидация времени (если FullDay=0)
         start_time_final = None
@@ -274,25 +299,19 @@ class ImportAbsencesDialog(ctk.CTkToplevel):  # Наследуемся от CTkT
             if not (start_t and end_t):
                 log.warning(
                     f"Импорт пропущен ({source_info}): Для FullDay=0 не указаны StartTime и/или EndTime.")
-                return False
+                return None
             time_pattern = r"^([01]\d|2[0-3]):([0-5]\d)$"
             if not re.match(time_pattern, start_t) or not re.match(time_pattern, end_t):
                 log.warning(
                     f"Импорт пропущен ({source_info}): Некорректный формат StartTime ('{start_t}') или EndTime ('{end_t}'). Ожидается ЧЧ:ММ.")
-                return False
-            try:
-                t1 = datetime.datetime.strptime(start_t, "%H:%M").time()
-                t2 = datetime.datetime.strptime(end_t, "%H:%M").time()
-                if t1 >= t2:
-                    log.warning(
-                        f"Импорт пропущен ({source_info}): EndTime ('{end_t}') должен быть позже StartTime ('{start_t}').")
-                    return False
-                start_time_final = start_t
-                end_time_final = end_t
-            except ValueError:  # На всякий случай
+                return None
+            # Формат проверен выше - сравниваем минуты от полуночи
+            if time_to_minutes(start_t) >= time_to_minutes(end_t):
                 log.warning(
-                    f"Импорт пропущен ({source_info}): Ошибка сравнения времени '{start_t}' - '{end_t}'.")
-                return False
+                    f"Импорт пропущен ({source_info}): EndTime ('{end_t}') должен быть позже StartTime ('{start_t}').")
+                return None
+            start_time_final = start_t
+            end_time_final = end_t
             schedule_id_final = None  # Ручной ввод времени -> ScheduleID=None
 
         # 6. Проверка существования сотрудника и получение его графика (если FullDay=1)
@@ -300,7 +319,7 @@ class ImportAbsencesDialog(ctk.CTkToplevel):  # Наследуемся от CTkT
         if not position_id:
             log.warning(
                 f"Импорт пропущен ({source_info}): Сотрудник с PersonnelNumber '{pn}' не найден или не удалось определить его должность.")
-            return False
+            return None
 
         # 7. Получение ScheduleID и времени для FullDay=1 / Проверка времени для FullDay=0
         working_hours_info = None
@@ -314,7 +333,7 @@ class ImportAbsencesDialog(ctk.CTkToplevel):  # Наследуемся от CTkT
             # Можно решить, пропускать ли запись или нет. Пока пропустим.
             log.warning(
                 f"Импорт пропущен ({source_info}): Ошибка получения графика работы для сотрудника '{pn}'.")
-            return False
+            return None
 
         if full_day == 1:
             if working_hours_info:
@@ -322,64 +341,47 @@ class ImportAbsencesDialog(ctk.CTkToplevel):  # Наследуемся от CTkT
                 if w_start == "00:00" and w_end == "00:00":
                     log.warning(
                         f"Импорт пропущен ({source_info}): Попытка добавить отсутствие 'Полный день' на выходной ({absence_date}) для сотрудника '{pn}'.")
-                    return False
+                    return None
                 start_time_final = w_start
                 end_time_final = w_end
                 schedule_id_final = s_id
             else:
                 log.warning(
                     f"Импорт пропущен ({source_info}): Не найден график работы для сотрудника '{pn}' на {absence_date} для установки 'Полный день'.")
-                return False
+                return None
         elif full_day == 0:  # Дополнительная проверка времени на вхождение в график
             if working_hours_info:
                 _, w_start, w_end = working_hours_info
-                try:
-                    abs_s = datetime.datetime.strptime(
-                        start_time_final, "%H:%M").time()
-                    abs_e = datetime.datetime.strptime(
-                        end_time_final, "%H:%M").time()
-                    w_s = datetime.datetime.strptime(w_start, "%H:%M").time()
-                    w_e = datetime.datetime.strptime(w_end, "%H:%M").time()
-                    if not (w_s <= abs_s < abs_e <= w_e):
-                        log.warning(
-                            f"Импорт пропущен ({source_info}): Время '{start_time_final}-{end_time_final}' выходит за график '{w_start}-{w_end}' для сотрудника '{pn}' на {absence_date}.")
-                        return False
+                w_s = time_to_minutes(w_start)
+                w_e = time_to_minutes(w_end)
                 # Если w_start/w_end оказались невалидными (хотя не должны)
-                except ValueError:
+                if w_s is None or w_e is None:
                     log.warning(
                         f"Импорт пропущен ({source_info}): Ошибка сравнения импортируемого времени с графиком для '{pn}'.")
-                    return False
+                    return None
+                abs_s = time_to_minutes(start_time_final)
+                abs_e = time_to_minutes(end_time_final)
+                if not (w_s <= abs_s < abs_e <= w_e):
+                    log.warning(
+                        f"Импорт пропущен ({source_info}): Время '{start_time_final}-{end_time_final}' выходит за график '{w_start}-{w_end}' для сотрудника '{pn}' на {absence_date}.")
+                    return None
             else:  # Графика нет, как проверить? Лучше пропустить.
                 log.warning(
                     f"Импорт пропущен ({source_info}): Не найден график для проверки времени '{start_time_final}-{end_time_final}' для сотрудника '{pn}'.")
-                return False
+                return None
 
         # 8. Проверка на дубликат (сотрудник + дата)
         if self.repository.absence_exists(pn, date_str):
             log.warning(
                 f"Импорт пропущен ({source_info}): Запись об отсутствии для сотрудника '{pn}' на дату '{date_str}' уже существует.")
-            return False
+            return None
 
-        # 9. Если все проверки пройдены, вставляем запись
-        try:
-            success = self.repository.insert_absence(
-                personnel_number=pn,
-                absence_date=date_str,
-                full_day=full_day,
-                start_time=start_time_final,  # Эти значения уже определены
-                end_time=end_time_final,
-                reason=reason,
-                schedule_id=schedule_id_final  # Может быть None
-            )
-            if success:
-                log.info(
-                    f"Импорт ({source_info}): Успешно добавлена запись для '{pn}' на '{date_str}'.")
-                return True
-            else:
-                log.error(
-                    f"Импорт ({source_info}): Не удалось добавить запись для '{pn}' на '{date_str}' (ошибка репозитория).")
-                return False
-        except Exception as e:
-            log.exception(
-                f"Импорт ({source_info}): Критическая ошибка при вставке записи для '{pn}' на '{date_str}'.")
-            return False
+        if seen_keys is not None:
+            if (pn, date_str) in seen_keys:
+                log.warning(
+                    f"Импорт пропущен ({source_info}): Повторная запись для сотрудника '{pn}' на дату '{date_str}' в импортируемом файле.")
+                return None
+            seen_keys.add((pn, date_str))
+
+        return (pn, date_str, full_day, start_time_final, end_time_final,
+                reason, schedule_id_final)
@@ -117,17 +117,20 @@ class ImportDialog(ctk.CTkToplevel):
     def process_csv(self, file_path):
         """Обрабатывает CSV-файл."""
         log.info(f"Обработка CSV файла: {file_path}")
-        added_count = 0   # Счетчик добавленных
+        valid_rows = []   # Параметры прошедших валидацию строк
         skipped_count = 0  # счетчик пропущенных
         try:
             with open(file_path, 'r', encoding='utf-8-sig') as file:  # !!!
                 reader = csv.DictReader(file)  # !!!
                 for row in reader:          #
-                    #  Если валидация и вставка прошли успешно, увеличиваем счетчик добавленных.
-                    if self.validate_and_insert_row(row):
-                        added_count += 1
+                    #  Валидные строки копим и вставляем одной пачкой.
+                    params = self.validate_row(row)
+                    if params:
+                        valid_rows.append(params)
                     else:
                         skipped_count += 1
+            added_count, skipped_in_db = self.insert_valid_rows(valid_rows)
+            skipped_count += skipped_in_db
 
         except Exception as e:
             messagebox.showerror("Ошибка импорта CSV",
@@ -139,14 +142,13 @@ class ImportDialog(ctk.CTkToplevel):
         messagebox.showinfo("Импорт CSV",
                             f"Импорт завершен.\nДобавлено записей: {added_count}\nПропущено записей: {skipped_count}")
 
-        if self.master and hasattr(self.master, "load_data") and hasattr(self.master, "display_data"):
-            self.master.load_data()
-            self.master.display_data()
+        if self.master and hasattr(self.master, "reload"):
+            self.master.reload()
 
     def process_xml(self, file_path):
         """Обрабатывает XML-файл."""
         log.info(f"Обработка XML файла: {file_path}")
-        added_count = 0   # !!!
+        valid_rows = []   # !!!
         skipped_count = 0  # !!!
         try:
             tree = ET.parse(file_path)  # !!!
@@ -165,10 +167,13 @@ class ImportDialog(ctk.CTkToplevel):
                     'DepartmentName': employee.findtext('DepartmentName'),
                     'StateName': employee.findtext('StateName')
                 }
-                if self.validate_and_insert_row(row):  #
-                    added_count += 1  #
+                params = self.validate_row(row)  #
+                if params:
+                    valid_rows.append(params)  #
                 else:
                     skipped_count += 1  #
+            added_count, skipped_in_db = self.insert_valid_rows(valid_rows)
+            skipped_count += skipped_in_db
 
         except Exception as e:
             messagebox.showerror("Ошибка импорта XML",
@@ -178,14 +183,27 @@ class ImportDialog(ctk.CTkToplevel):
 
         messagebox.showinfo("Импорт XML",  # !!!
                             f"Импорт завершен.\nДобавлено записей: {added_count}\nПропущено записей: {skipped_count}")
-        if self.master and hasattr(self.master, "load_data") and hasattr(self.master, "display_data"):
-            self.master.load_data()
-            self.master.display_data()
+        if self.master and hasattr(self.master, "reload"):
+            self.master.reload()
 
-    def validate_and_insert_row(self, row):
+    def insert_valid_rows(self, valid_rows):
         """
-        Валидирует данные строки и вставляет их в базу данных.
-        Возвращает True если успешно, False если ошибка.
+        Вставляет прошедшие валидацию строки одной пакетной операцией.
+        Возвращает (добавлено, пропущено из-за ошибок БД).
+        """
+        if not valid_rows:
+            return 0, 0
+        added_count, failed = self.employee_repository.insert_employees_bulk(
+            valid_rows)
+        for _, params, error in failed:
+            log.error(
+                f"Ошибка при добавлении сотрудника {params[0]} в БД: {error}")  # !!!
+        return added_count, len(failed)
+
+    def validate_row(self, row):
+        """
+        Валидирует данные строки.
+        Возвращает кортеж параметров для вставки, если строка корректна, иначе None.
         """
         personnel_number = row.get('PersonnelNumber', '').strip()
         lastname = row.get('LastName', '').strip()
@@ -200,14 +218,14 @@ class ImportDialog(ctk.CTkToplevel):
         if not all([personnel_number, lastname, firstname, birth_date_str, gender_name, position_name, department_name, state_name]):
             # messagebox.showerror("Ошибка импорта", "Не все обязательные поля заполнены в строке: " + str(row)) # убрал
             log.error(f"Ошибка импорта: Не все поля заполнены. Строка: {row}")
-            return False
+            return None
 
         # Валидация табельного
         if not re.match(r"^\d{1,10}$", personnel_number):
             # messagebox.showerror("Ошибка импорта", f"Некорректный табельный номер {personnel_number}!") # убрал
             log.error(
                 f"Ошибка импорта: Некорректный табельный номер {personnel_number}!")
-            return False
+            return None
 
          # Проверка на дубликат табельного номера
         # !!!
@@ -216,25 +234,25 @@ class ImportDialog(ctk.CTkToplevel):
             #                        f"Сотрудник с табельным номером {personnel_number} уже существует.")
             log.warning(
                 f"Ошибка импорта: дубликат табельного номера {personnel_number}")
-            return False  # Дубликат
+            return None  # Дубликат
 
         # Валидация ФИО (только русские буквы, пробелы, дефисы).
         if not re.match(r"^[а-яА-ЯёЁ -]+$", lastname):
             # messagebox.showerror("Ошибка импорта", "Некорректная фамилия: " + lastname) # убрал
             log.error(f"Ошибка импорта: Некорректная фамилия: {lastname}")
-            return False
+            return None
         if not re.match(r"^[а-яА-ЯёЁ -]+$", firstname):
             # messagebox.showerror("Ошибка импорта", "Некорректное имя: " + firstname)# убрал
             log.error(f"Ошибка импорта: Некорректное имя: {firstname}")
-            return False
+            return None
         if middlename and not re.match(r"^[а-яА-ЯёЁ -]+$", middlename):
             # messagebox.showerror("Ошибка импорта", "Некорректное отчество: " + middlename)# убрал
             log.error(f"Ошибка импорта: Некорректное отчество: {middlename}")
-            return False
+            return None
         if len(lastname) > 50 or len(firstname) > 50 or len(middlename) > 50:
             #   messagebox.showerror("Ошибка","Слишком длинное ФИО в строке: "+ str(row))# убрал
             log.error(f"Ошибка импорта: Слишком длинное ФИО. Строка {row}")
-            return False
+            return None
 
         # Валидация даты рождения.
         try:
@@ -244,7 +262,7 @@ class ImportDialog(ctk.CTkToplevel):
             if birth_date > today:
                 # messagebox.showerror("Ошибка импорта", "Дата рождения не может быть в будущем: "+ birth_date_str)# убрал
                 log.error(f"Ошибка импорта: Дата в будущем {birth_date_str}")
-                return False
+                return None
 
             age = today.year - birth_date.year - \
                 ((today.month, today.day) < (birth_date.month, birth_date.day))
@@ -252,12 +270,12 @@ class ImportDialog(ctk.CTkToplevel):
                 #  messagebox.showerror("Ошибка импорта", "Сотрудник должен быть старше 18 лет: " + birth_date_str)# убрал
                 log.error(
                     f"Ошибка импорта: Сотрудник младше 18 {birth_date_str}")
-                return False
+                return None
 
         except ValueError:
             # messagebox.showerror("Ошибка импорта", "Некорректный формат даты рождения: " + birth_date_str)# убрал
             log.error(f"Ошибка импорта: Некорректная дата {birth_date_str}")
-            return False
+            return None
 
         #  !!! Используем *правильные* репозитории !!!
         gender_id = self.gender_repository.get_by_name(gender_name)
@@ -272,18 +290,7 @@ class ImportDialog(ctk.CTkToplevel):
             # messagebox.showerror("Ошибка импорта", f"Не найдены значения в справочниках для строки: {row}")
             log.error(
                 f"Ошибка импорта: Не найдены ID в справочниках. Строка: {row}")
-            return False
-
-        # !!! self.employee_repository !!!
-        success = self.employee_repository.insert_employee(
-            personnel_number, lastname, firstname, middlename, birth_date_str,
-            gender_id, position_id, department_id, state_id
-        )
-
-        if not success:
-            # messagebox.showerror("Ошибка","Ошибка при добавлении сотрудника в БД (импорт)") # !!!
-            log.error(
-                f"Ошибка при добавлении сотрудника {personnel_number} в БД")  # !!!
-            return False
+            return None
 
-        return True
+        return (personnel_number, lastname, firstname, middlename, birth_date_str,
+                gender_id, position_id, department_id, state_id)
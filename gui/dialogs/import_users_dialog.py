@@ -130,15 +130,15 @@ class ImportUsersDialog(ctk.CTkToplevel):
                             f"Ошибки обработки файлов: {total_errors}")
 
         # Обновляем данные в родительском фрейме UsersFrame
-        if self.master_frame and hasattr(self.master_frame, "load_data"):
-            self.master_frame.load_data()
-        if self.master_frame and hasattr(self.master_frame, "display_data"):
-            self.master_frame.display_data()
+        if self.master_frame and hasattr(self.master_frame, "reload"):
+            self.master_frame.reload()
 
     def process_csv(self, file_path):
         """Обрабатывает CSV файл с пользователями. Возвращает (added, skipped, errors)."""
         log.info(f"Обработка CSV пользователей: {file_path}")
         added, skipped = 0, 0
+        valid_rows = []  # Параметры прошедших валидацию строк
+        seen_logins = set()  # Логины уже принятых строк файла
         # Обязательные поля (в нижнем регистре)
         required_headers = {"login", "password", "rolename"}
         # Опциональные поля
@@ -166,11 +166,15 @@ class ImportUsersDialog(ctk.CTkToplevel):
                     # Приводим ключи к нижнему регистру и удаляем пробелы
                     row_data_clean = {
                         k.lower().strip(): v for k, v in row.items() if k}
-                    # Передаем очищенные данные на валидацию и вставку
-                    if self.validate_and_insert_user_row(row_data_clean, f"CSV строка {line_num}"):
-                        added += 1
+                    # Передаем очищенные данные на валидацию
+                    params = self.validate_user_row(
+                        row_data_clean, f"CSV строка {line_num}", seen_logins)
+                    if params:
+                        valid_rows.append(params)
                     else:
                         skipped += 1  # Ошибка валидации или дубликат = пропуск
+            added, failed = self.insert_valid_rows(valid_rows)
+            skipped += failed
         except FileNotFoundError:
             messagebox.showerror("Ошибка", f"Файл не найден: {file_path}")
             return 0, 0, 1
@@ -185,6 +189,8 @@ class ImportUsersDialog(ctk.CTkToplevel):
         """Обрабатывает XML файл с пользователями. Возвращает (added, skipped, errors)."""
         log.info(f"Обработка XML пользователей: {file_path}")
         added, skipped = 0, 0
+        valid_rows = []
+        seen_logins = set()
         try:
             tree = ET.parse(file_path)
             root = tree.getroot()
@@ -203,11 +209,15 @@ class ImportUsersDialog(ctk.CTkToplevel):
                     value = child.text.strip() if child.text else ""
                     row_data[tag_lower] = value
 
-                # Валидация и вставка
-                if self.validate_and_insert_user_row(row_data, f"XML запись #{index + 1}"):
-                    added += 1
+                # Валидация
+                params = self.validate_user_row(
+                    row_data, f"XML запись #{index + 1}", seen_logins)
+                if params:
+                    valid_rows.append(params)
                 else:
                     skipped += 1
+            added, failed = self.insert_valid_rows(valid_rows)
+            skipped += failed
         except ET.ParseError as e:
             messagebox.showerror(
                 "Ошибка XML", f"Ошибка разбора XML файла пользователей '{os.path.basename(file_path)}':\n{e}")
@@ -222,10 +232,26 @@ class ImportUsersDialog(ctk.CTkToplevel):
             return added, skipped, 1
         return added, skipped, 0
 
-    def validate_and_insert_user_row(self, row_data, source_info=""):
+    def insert_valid_rows(self, valid_rows):
         """
-        Валидирует данные пользователя из строки (словаря) и вставляет в БД.
-        Возвращает True при успехе, False при ошибке/пропуске.
+        Вставляет прошедших валидацию пользователей одной пакетной операцией
+        (пароли хешируются внутри insert_users_bulk).
+        Возвращает (добавлено, пропущено из-за ошибок БД).
+        """
+        if not valid_rows:
+            return 0, 0
+        added, failed = self.repository.insert_users_bulk(valid_rows)
+        for _, params, error in failed:
+            log.error(
+                f"Импорт: Не удалось добавить пользователя '{params[0]}': {error}")
+        return added, len(failed)
+
+    def validate_user_row(self, row_data, source_info="", seen_logins=None):
+        """
+        Валидирует данные пользователя из строки (словаря).
+        Возвращает кортеж (login, password, employee_pn, role_id, email)
+        или None при ошибке/пропуске. seen_logins - множество логинов,
+        уже принятых в текущем импорте.
         """
         # 1. Извлечение обязательных полей
         login = row_data.get('login', '').strip()
@@ -243,17 +269,17 @@ class ImportUsersDialog(ctk.CTkToplevel):
         if not (login and password and role_name):
             log.warning(
                 f"Импорт пользователя пропущен ({source_info}): Не заполнены обязательные поля (login, password, rolename). Данные: {row_data}")
-            return False
+            return None
 
         # 4. Валидация логина
         if not re.match(r"^[a-zA-Z0-9_.-]+$", login):
             log.warning(
                 f"Импорт пользователя пропущен ({source_info}): Некорректный формат логина '{login}'.")
-            return False
-        if not self.repository.is_login_unique(login):
+            return None
+        if not self.repository.is_login_unique(login) or (seen_logins is not None and login in seen_logins):
             log.warning(
                 f"Импорт пользователя пропущен ({source_info}): Логин '{login}' уже существует.")
-            return False
+            return None
 
         # 5. Валидация пароля (только на минимальную длину, т.к. требования из ТЗ могут быть строже)
         if len(password) < 8:  # Минимальная проверка для импорта
@@ -262,19 +288,15 @@ class ImportUsersDialog(ctk.CTkToplevel):
             # Рекомендуется сообщить пользователю, что пароль нужно будет сменить
             # Можно либо пропустить, либо создать пользователя с временным/слабым паролем
             # Пропускаем для безопасности
-            return False
+            return None
         # Строгую проверку на цифры/регистр здесь не делаем, чтобы не усложнять импорт
 
-        # 6. Поиск ID роли
-        # Нужен метод в репозитории или загрузка карты ролей при инициализации диалога
-        # Пока сделаем через прямой запрос (менее эффективно)
-        role_result = self.repository.db.fetch_one(
-            "SELECT ID FROM Roles WHERE RoleName = ?", (role_name,))
-        if not role_result:
+        # 6. Поиск ID роли (из кэша справочников, без запроса к БД на каждую строку)
+        role_id = self.repository.db.references.get_id("Roles", role_name)
+        if role_id is None:
             log.warning(
                 f"Импорт пользователя пропущен ({source_info}): Роль '{role_name}' не найдена в базе данных.")
-            return False
-        role_id = role_result[0]
+            return None
 
         # 7. Проверка существования сотрудника (если указан)
         if employee_pn:
@@ -292,25 +314,7 @@ class ImportUsersDialog(ctk.CTkToplevel):
                 f"Импорт пользователя '{login}' ({source_info}): Некорректный формат Email '{email}'. Email не будет сохранен.")
             email = None  # Не сохраняем невалидный email
 
-        # 9. Вставка пользователя (пароль будет хеширован внутри add_user)
-        try:
-            success = self.repository.add_user(
-                login=login,
-                password=password,  # Передаем пароль в открытом виде
-                role_id=role_id,
-                employee_pn=employee_pn,
-                email=email
-            )
-            if success:
-                log.info(
-                    f"Импорт ({source_info}): Успешно добавлен пользователь '{login}'.")
-                return True
-            else:
-                # Ошибка могла произойти на уровне БД (например, constraint)
-                log.error(
-                    f"Импорт ({source_info}): Не удалось добавить пользователя '{login}' (ошибка репозитория/БД).")
-                return False
-        except Exception as e:
-            log.exception(
-                f"Импорт ({source_info}): Критическая ошибка при вставке пользователя '{login}'.")
-            return False
+        if seen_logins is not None:
+            seen_logins.add(login)
+        # 9. Пароль передается в открытом виде, хеширование - в insert_users_bulk
+        return (login, password, employee_pn, role_id, email)
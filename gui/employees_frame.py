@@ -2,7 +2,7 @@
 
 import customtkinter as ctk
 from config import *
-from .utils import load_icon  # load_icon
+from .utils import load_icon, write_xml_stream  # load_icon
 # !!! Sheet больше не импортируется здесь!
 from .dialogs.add_employee_dialog import AddEmployeeDialog
 from .dialogs.edit_employee_dialog import EditEmployeeDialog
@@ -29,6 +29,7 @@ log = logging.getLogger(__name__)
 
 
 class EmployeesFrame(BaseTableFrame):
+    change_entities = ("Employees", "Genders", "Positions", "Departments", "States")
 
     def __init__(self, master, db):
         super().__init__(master, db)  # Вызываем конструктор BaseTableFrame
@@ -39,8 +40,7 @@ class EmployeesFrame(BaseTableFrame):
         self.department_repository = DepartmentRepository(db)  # !!!
         self.db = db
         self.create_widgets()
-        self.load_data()
-        self.display_data()
+        self.reload()
 
     def create_widgets(self):
         """
@@ -165,7 +165,7 @@ class EmployeesFrame(BaseTableFrame):
         )
         self.search_entry.place(
             x=27 + 220 + 27 + 150 + 20 + 180 + 20, y=139)  # Размещение
-        self.search_entry.bind("<KeyRelease>", self.search)
+        self.bind_search(self.search_entry)  # Поиск после паузы в наборе
         # !!! Создаем виджеты таблицы !!!
         self.create_table_widgets()
         # !!!  Заголовки
@@ -173,51 +173,21 @@ class EmployeesFrame(BaseTableFrame):
                             "Пол", "Должность", "Отдел", "Состояние"])
         log.debug("Виджеты EmployeesFrame созданы")
 
-    def load_data(self, search_term=None):
-        """Загружает данные о сотрудниках из базы данных."""
-        log.debug("Загрузка данных для EmployeesFrame")
-        if search_term is None:
-            search_term = self.search_entry.get()
-        #  Используем метод get_employees из *репозитория* (пока это self.repository).
-        self.all_data, self.total_rows = self.repository.get_employees(
-            search_term=search_term)
-        if self.all_data is None:
-            log.warning("get_employees вернул None")
-            self.all_data = []
-            self.total_rows = 0
+    def count_rows(self, search_term):
+        """Возвращает количество сотрудников с учетом поиска."""
+        return self.repository.count_employees(search_term=search_term)
+
+    def fetch_page(self, search_term, after, page_size, offset=0):
+        """Загружает одну страницу сотрудников из базы данных."""
+        return self.repository.get_employees_page(
+            search_term=search_term, after=after, page_size=page_size, offset=offset)
 
     def display_data(self, search_term=None):
         """
-        Отображает данные в таблице с учетом текущей страницы и поискового запроса.
+        Отображает данные текущей страницы в таблице.
         """
         log.debug("Отображение данных (EmployeesFrame)")
-
-        # Если данных нет, загружаем (это произойдет при первом запуске)
-        if not self.all_data:
-            self.load_data()
-
-        # --- ФИЛЬТРАЦИЯ (поиск) ---
-        if search_term is None:  # !!! Явный None!
-            search_term = self.search_entry.get().lower()
-
-        if search_term:
-            filtered_data = []
-            for row in self.all_data:
-                # Проверяем, есть ли search_term в КАКОМ-ЛИБО поле строки.
-                #  Преобразуем все в нижний регистр для регистронезависимого поиска
-                if any(search_term in str(value).lower() for value in row):
-                    filtered_data.append(row)
-            display_data = filtered_data  # Для пагинации.
-            self.total_rows = len(filtered_data)  # Обновляем total_rows!
-
-        else:
-            display_data = self.all_data  # Отображаем все данные.
-            self.total_rows = len(self.all_data)  # Обновляем!
-
-        # --- ПАГИНАЦИЯ ---
-        start_index = (self.current_page - 1) * self.rows_per_page
-        end_index = start_index + self.rows_per_page
-        current_page_data = display_data[start_index:end_index]
+        current_page_data = self.page_data
 
         # --- ОТОБРАЖЕНИЕ ---
         #  Очищаем таблицу (если в ней уже были данные)
@@ -242,8 +212,7 @@ class EmployeesFrame(BaseTableFrame):
         log.info("Открытие диалога добавления сотрудника")
         dialog = AddEmployeeDialog(self, self.repository)
         dialog.wait_window()  # Ждём
-        self.load_data()    #
-        self.display_data()  # после закрытия
+        self.reload()  # после закрытия
 
     def edit_employee(self):
         """Открывает диалог редактирования сотрудника."""
@@ -270,8 +239,7 @@ class EmployeesFrame(BaseTableFrame):
         dialog = EditEmployeeDialog(
             self, self.db, employee_data)  # Передаем данные в
         dialog.wait_window()  # Ждем
-        self.load_data()          # Обновляем
-        self.display_data()
+        self.reload()  # Обновляем
 
     def delete_employee(self):
         """Удаляет выбранного сотрудника."""
@@ -294,24 +262,17 @@ class EmployeesFrame(BaseTableFrame):
                 log.info(
                     f"Сотрудник с табельным номером {personnel_number} удален")
 
-                # --- Корректировка страницы ---
-                self.load_data()  # Обновляем данные
-                total_pages = self.get_total_pages()
-                if self.current_page > total_pages:
-                    self.current_page = max(1, total_pages)
-                # ----------------------------------
-
-                self.display_data()  # Отображаем данные
+                # Обновляем данные (reload сам скорректирует номер страницы)
+                self.reload()
             else:
                 messagebox.showerror(
                     "Ошибка", "Не удалось удалить сотрудника.")
                 log.error(
                     f"Не удалось удалить сотрудника с табельным номером {personnel_number}")
 
-    def search(self, event):
-        if self.current_page != 1:
-            self.current_page = 1
-        self.display_data()
+    def search(self, event=None):
+        # Фильтрация выполняется в БД, reload сбрасывает страницу на первую
+        self.reload()
 
     def import_data(self):
         """
@@ -323,15 +284,23 @@ class EmployeesFrame(BaseTableFrame):
                               self.position_repository, self.state_repository,
                               self.department_repository)
         dialog.wait_window()
-        self.load_data()
-        self.display_data()
+        self.reload()
 
     def export_data(self):
         """Экспортирует данные в CSV и XML."""
         log.info("Экспорт данных о сотрудниках")
 
-        data, _ = self.repository.get_employees()
-        if not data:
+        # Данные читаются потоково (дважды: для CSV и для XML), без загрузки таблицы в память
+        try:
+            probe = self.repository.iter_employees()
+            has_data = next(probe, None) is not None
+            probe.close()
+        except Exception as e:
+            messagebox.showerror(
+                "Ошибка экспорта", f"Не удалось получить данные: {e}")
+            log.exception(f"Ошибка чтения данных для экспорта: {e}")
+            return
+        if not has_data:
             messagebox.showinfo("Экспорт", "Нет данных для экспорта.")
             log.info("Нет данных для экспорта")  # !!!
             return
@@ -353,7 +322,7 @@ class EmployeesFrame(BaseTableFrame):
                 ]
                 writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
                 writer.writeheader()
-                for row in data:
+                for row in self.repository.iter_employees():
                     #  Преобразуем в словарь
                     row_dict = {
                         "PersonnelNumber": row[0],
@@ -376,10 +345,9 @@ class EmployeesFrame(BaseTableFrame):
             return
 
         # --- Экспорт в XML ---
-        try:
-            root = ET.Element("Employees")
-            for row in data:  # Перебираем
-                employee = ET.SubElement(root, "Employee")
+        def employee_elements():
+            for row in self.repository.iter_employees():  # Перебираем
+                employee = ET.Element("Employee")
                 ET.SubElement(employee, "PersonnelNumber").text = str(row[0])
                 ET.SubElement(employee, "LastName").text = row[1]
                 ET.SubElement(employee, "FirstName").text = row[2]
@@ -390,10 +358,10 @@ class EmployeesFrame(BaseTableFrame):
                 ET.SubElement(employee, "PositionName").text = row[6]   #
                 ET.SubElement(employee, "DepartmentName").text = row[7]
                 ET.SubElement(employee, "StateName").text = row[8]    #
+                yield employee
 
-            tree = ET.ElementTree(root)
-            ET.indent(tree, space="  ")
-            tree.write(xml_filename, encoding="utf-8", xml_declaration=True)
+        try:
+            write_xml_stream(xml_filename, "Employees", employee_elements())
             log.info(f"Данные экспортированы в XML: {xml_filename}")
 
         except Exception as e:
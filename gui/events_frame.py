@@ -5,7 +5,7 @@ import logging
 from .base_table_frame import BaseTableFrame  # Импортируем базовый класс
 # Импортируем репозиторий
 from db.employee_event_repository import EmployeeEventRepository
-from .utils import load_icon  # !!! Импортируем загрузчик иконок
+from .utils import load_icon, write_xml_stream  # !!! Импортируем загрузчик иконок
 import os  # !!! Для работы с путями
 import datetime  # !!! Для временных меток
 import codecs  # !!! Для корректной записи CSV в UTF-8 с BOM
@@ -23,13 +23,14 @@ class EventsFrame(BaseTableFrame):
     Стилизован под EmployeesFrame.
     """
 
+    change_entities = ("EmployeeEvents", "Employees", "Events", "Positions", "Departments")
+
     def __init__(self, master, db):
         super().__init__(master, db, table_height=350)
         self.repository = EmployeeEventRepository(db)
         self.db = db
         self.create_widgets()
-        self.load_data()
-        self.display_data()
+        self.reload()
 
     def create_widgets(self):
         """
@@ -91,7 +92,7 @@ class EventsFrame(BaseTableFrame):
         )
         self.search_entry.place(
             x=search_entry_x_coordinate, y=search_entry_y_coordinate)
-        self.search_entry.bind("<KeyRelease>", self.search)
+        self.bind_search(self.search_entry)  # Поиск после паузы в наборе
 
         # --- Таблица и пагинация ---
         self.create_table_widgets()
@@ -108,41 +109,23 @@ class EventsFrame(BaseTableFrame):
 
         log.debug("Виджеты EventsFrame созданы (с кнопкой Экспорт)")
 
-    def load_data(self, search_term=None):
-        """ Загружает данные о кадровых событиях из репозитория. """
-        log.debug(
-            f"Загрузка данных кадровых событий (search_term: {search_term})")
-        if search_term is None:
-            search_term = self.search_entry.get().strip()
-
-        # Запрашиваем данные с учетом поиска для корректного отображения total_rows
-        self.all_data, self.total_rows = self.repository.get_events(
-            search_term=search_term)
-
-        if self.all_data is None:
-            log.warning(
-                "EventsFrame.load_data: Репозиторий вернул None, устанавливаем пустой список.")
-            self.all_data = []
-            self.total_rows = 0
-        else:
-            # Заменяем None на пустые строки для tksheet
-            processed_data = []
-            for row in self.all_data:
-                processed_row = ["" if item is None else item for item in row]
-                processed_data.append(processed_row)
-            self.all_data = processed_data
-            log.debug(
-                f"EventsFrame.load_data: Загружено {self.total_rows} строк событий.")
+    def count_rows(self, search_term):
+        """ Возвращает количество кадровых событий с учетом поиска. """
+        return self.repository.count_events(search_term=search_term)
+
+    def fetch_page(self, search_term, after, page_size, offset=0):
+        """ Загружает одну страницу кадровых событий из репозитория. """
+        rows, next_cursor = self.repository.get_events_page(
+            search_term=search_term, after=after, page_size=page_size, offset=offset)
+        # Заменяем None на пустые строки для tksheet
+        return [["" if item is None else item for item in row] for row in rows], next_cursor
 
     def display_data(self, search_term=None):
-        """ Отображает данные кадровых событий в таблице с учетом пагинации. """
+        """ Отображает загруженную страницу кадровых событий в таблице. """
         log.debug(
             f"Отображение данных кадровых событий (Страница: {self.current_page}, Поиск: '{search_term or self.search_entry.get().strip()}')")
 
-        # Пагинация применяется к self.all_data, которые уже загружены (и потенциально отфильтрованы)
-        start_index = (self.current_page - 1) * self.rows_per_page
-        end_index = start_index + self.rows_per_page
-        current_page_data = self.all_data[start_index:end_index]
+        current_page_data = self.page_data
 
         # Очистка таблицы
         num_cols = len(self.table_headers)  # Используем сохраненные заголовки
@@ -162,29 +145,34 @@ class EventsFrame(BaseTableFrame):
     def search(self, event=None):
         """ Обработчик события ввода в поле поиска. """
         log.debug(f"Событие поиска: '{self.search_entry.get()}'")
-        self.current_page = 1
-        self.load_data()      # Перезагружаем данные с учетом поиска
-        self.display_data()   # Отображаем отфильтрованные и обрезанные пагинацией данные
+        self.reload()  # Перезагружаем и отображаем первую страницу с учетом поиска
 
     # !!! НОВЫЙ МЕТОД ЭКСПОРТА !!!
     def export_data(self):
         """Экспортирует все кадровые события в CSV и XML."""
         log.info("Экспорт данных кадровых событий")
 
-        # Получаем ВСЕ данные, игнорируя текущий поиск и пагинацию в UI
-        all_events_data, _ = self.repository.get_events(
-            search_term=None)  # Передаем None, чтобы получить всё
+        # Получаем ВСЕ данные, игнорируя текущий поиск и пагинацию в UI.
+        # Строки читаются потоково (отдельно для CSV и XML), таблица целиком в память не попадает.
+        try:
+            probe = self.repository.iter_events(search_term=None)
+            has_data = next(probe, None) is not None
+            probe.close()
+        except Exception as e:
+            messagebox.showerror(
+                "Ошибка экспорта", f"Не удалось получить данные событий: {e}")
+            log.exception(f"Ошибка чтения событий для экспорта: {e}")
+            return
 
-        if not all_events_data:
+        if not has_data:
             messagebox.showinfo("Экспорт", "Нет данных для экспорта.")
             log.info("Нет данных событий для экспорта")
             return
 
-        # Заменяем None на пустые строки перед экспортом
-        export_ready_data = []
-        for row in all_events_data:
-            processed_row = ["" if item is None else item for item in row]
-            export_ready_data.append(processed_row)
+        def export_ready_data():
+            # Заменяем None на пустые строки перед экспортом
+            for row in self.repository.iter_events(search_term=None):
+                yield ["" if item is None else item for item in row]
 
         export_dir = "export"
         now = datetime.datetime.now()
@@ -213,6 +201,7 @@ class EventsFrame(BaseTableFrame):
                                  for key in fieldnames_keys_ordered]
 
         # --- Экспорт в CSV ---
+        csv_export_successful = False
         try:
             # Используем codecs для BOM
             with codecs.open(csv_filename, "w", "utf-8-sig") as csvfile:
@@ -221,7 +210,7 @@ class EventsFrame(BaseTableFrame):
                 # Записываем русские заголовки
                 writer.writerow(fieldnames_ru_ordered)
                 # Записываем все подготовленные строки
-                writer.writerows(export_ready_data)
+                writer.writerows(export_ready_data())
             log.info(f"Данные событий экспортированы в CSV: {csv_filename}")
 
         except Exception as e:
@@ -235,17 +224,17 @@ class EventsFrame(BaseTableFrame):
 
         # --- Экспорт в XML ---
         xml_export_successful = False  # Изначально неуспешен
-        try:
-            root = ET.Element("EmployeeEvents")  # Корневой элемент
-            for row_list in export_ready_data:
-                event_elem = ET.SubElement(root, "Event")
+        def event_elements():
+            for row_list in export_ready_data():
+                event_elem = ET.Element("Event")
                 for i, key in enumerate(fieldnames_keys_ordered):
                     # Используем английские названия как имена тегов
                     ET.SubElement(event_elem, key).text = str(row_list[i])
+                yield event_elem
 
-            tree = ET.ElementTree(root)
-            ET.indent(tree, space="  ")  # Форматируем для читаемости
-            tree.write(xml_filename, encoding="utf-8", xml_declaration=True)
+        try:
+            # Корневой элемент EmployeeEvents, элементы пишутся по одному
+            write_xml_stream(xml_filename, "EmployeeEvents", event_elements())
             log.info(f"Данные событий экспортированы в XML: {xml_filename}")
             xml_export_successful = True  # Отмечаем успех
 
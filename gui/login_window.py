@@ -5,8 +5,7 @@ import logging
 from db.user_repository import UserRepository
 # Импортируем цвета, шрифты и утилиты
 from config import *  # MAIN_BG_COLOR, LEFT_PANEL_BG_COLOR, LABEL_TEXT_COLOR, BUTTON_TEXT_COLOR, ACCENT_COLOR, DEFAULT_FONT, BOLD_FONT, BUTTON_HOVER_COLOR
-from .utils import load_icon, relative_to_assets
-from PIL import Image  # Нужен PIL для загрузки логотипа
+from .utils import clear_icon_cache, load_icon
 
 log = logging.getLogger(__name__)
 
@@ -45,8 +44,7 @@ class LoginWindow(ctk.CTk):
 
         # --- Логотип ---
         try:
-            logo_image = Image.open(relative_to_assets("image_2.png"))
-            logo_ctk = ctk.CTkImage(logo_image, size=(64, 64))
+            logo_ctk = load_icon("image_2.png", size=(64, 64))
             logo_label = ctk.CTkLabel(center_frame, image=logo_ctk, text="")
             logo_label.pack(pady=(0, 15))
         except Exception as e:
@@ -177,3 +175,8 @@ class LoginWindow(ctk.CTk):
         """Обработчик закрытия окна."""
         log.info("Окно входа закрывается.")
         self.destroy()
+
+    def destroy(self):
+        """Уничтожает окно; иконки этого корня больше нельзя использовать."""
+        super().destroy()
+        clear_icon_cache()
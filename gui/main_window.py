@@ -15,10 +15,11 @@ import logging
 import threading
 import time
 import colorsys
+from collections import OrderedDict
 from tkinter import messagebox
 
 import customtkinter as ctk
-from PIL import Image, ImageTk
+from PIL import ImageTk
 
 from config import *  # Константы конфигурации
 from db.database import Database
@@ -26,7 +27,8 @@ from db.user_repository import UserRepository
 from db.role_repository import RoleRepository
 
 # Импорт утилит и фреймов вкладок
-from .utils import load_icon, relative_to_assets
+from .utils import load_icon, load_image
+from .background import shutdown_executor
 from .dashboard_frame import DashboardFrame
 from .employees_frame import EmployeesFrame
 from .events_frame import EventsFrame
@@ -64,6 +66,7 @@ class MainWindow(ctk.CTkFrame):
         8. Инициализирует атрибуты для хранения виджетов (кнопки, фреймы).
         9. Вызывает `create_widgets()` для создания элементов интерфейса.
         10. Отображает начальную вкладку (`DashboardFrame`).
+        11. Запускает периодическую проверку журнала изменений (изменения других процессов).
 
         Args:
             master (ctk.CTk): Родительский виджет (корневое окно CustomTkinter).
@@ -125,6 +128,8 @@ class MainWindow(ctk.CTkFrame):
         self.active_rectangle_label: ctk.CTkLabel | None = None  # Маркер активной кнопки
         self.content_frame: ctk.CTkFrame | None = None  # Контейнер для вкладок
         self.current_frame: ctk.CTkFrame | None = None  # Текущая отображаемая вкладка
+        # Созданные вкладки (класс, аргументы) -> фрейм; порядок - от давно открытой к последней
+        self._frame_cache: OrderedDict[tuple, ctk.CTkFrame] = OrderedDict()
 
         # --- 9. Создание виджетов интерфейса ---
         self.create_widgets()
@@ -136,6 +141,10 @@ class MainWindow(ctk.CTkFrame):
             log.error(
                 "Content frame не был создан, начальная вкладка не отображена.")
 
+        # --- 11. Проверка журнала изменений ---
+        if CHANGE_POLL_INTERVAL_MS > 0:
+            self.after(CHANGE_POLL_INTERVAL_MS, self.poll_changes)
+
     def _get_role_id_safe(self, role_name: str) -> int | None:
         """
         Безопасно получает ID роли по её названию из репозитория.
@@ -252,8 +261,7 @@ class MainWindow(ctk.CTkFrame):
         title_label.pack()
         self.title_label = title_label  # Сохраняем ссылку для RGB
         try:
-            logo_img = Image.open(relative_to_assets("image_2.png"))
-            logo_photo = ImageTk.PhotoImage(logo_img)
+            logo_photo = ImageTk.PhotoImage(load_image("image_2.png"))
             logo_label = ctk.CTkLabel(
                 left_frame, image=logo_photo, text="", bg_color="white")
             logo_label.image = logo_photo  # Сохраняем ссылку на изображение
@@ -314,8 +322,7 @@ class MainWindow(ctk.CTkFrame):
         # Аватар
         try:
             # TODO: Использовать image_1.png?
-            avatar_img = Image.open(relative_to_assets("user.png"))
-            avatar_photo = ctk.CTkImage(avatar_img, size=AVATAR_SIZE)
+            avatar_photo = load_icon("user.png", size=AVATAR_SIZE)
             avatar_label = ctk.CTkLabel(
                 user_info_frame, image=avatar_photo, text="")
             avatar_label.image = avatar_photo
@@ -588,12 +595,19 @@ class MainWindow(ctk.CTkFrame):
 
     def clear_content_frame(self):
         """
-        Удаляет все виджеты из основной области контента (`self.content_frame`).
+        Очищает основную область контента (`self.content_frame`).
+
+        Вкладки из кэша только скрываются, остальные виджеты (сообщения об
+        ошибках и т.п.) удаляются.
         """
         log.debug("Очистка области контента (content_frame)...")
         if hasattr(self, 'content_frame') and self.content_frame and self.content_frame.winfo_exists():
+            if self.current_frame is not None:
+                self._hide_frame(self.current_frame)
+            cached_ids = {id(frame) for frame in self._frame_cache.values()}
             for widget in self.content_frame.winfo_children():
-                widget.destroy()
+                if id(widget) not in cached_ids:
+                    widget.destroy()
             log.debug("Область контента очищена.")
         else:
             log.warning("Попытка очистить несуществующий content_frame.")
@@ -603,8 +617,10 @@ class MainWindow(ctk.CTkFrame):
         """
         Отображает экземпляр указанного класса фрейма в области контента.
 
-        Сначала очищает область контента, затем создает и упаковывает
-        новый экземпляр фрейма.
+        Уже созданная вкладка берется из кэша и показывается снова (ее
+        `on_show()` обновляет данные, только если они устарели); иначе
+        создается новый экземпляр. Давно не открывавшиеся вкладки сверх
+        `FRAME_CACHE_SIZE` уничтожаются.
         Обрабатывает возможные ошибки при создании фрейма.
 
         Args:
@@ -627,6 +643,19 @@ class MainWindow(ctk.CTkFrame):
             return
 
         self.clear_content_frame()
+        cache_key = (frame_class, args)
+        cached_frame = self._frame_cache.get(cache_key)
+        if cached_frame is not None and cached_frame.winfo_exists():
+            self._frame_cache.move_to_end(cache_key)
+            self.current_frame = cached_frame
+            self.current_frame.pack(fill="both", expand=True)
+            on_show = getattr(self.current_frame, "on_show", None)
+            if on_show is not None:
+                on_show()
+            log.info(f"Фрейм {frame_name} отображен из кэша.")
+            return
+        self._frame_cache.pop(cache_key, None)
+
         try:
             # Создаем экземпляр нужного фрейма
             self.current_frame = frame_class(
@@ -644,6 +673,51 @@ class MainWindow(ctk.CTkFrame):
                 error_label = ctk.CTkLabel(self.content_frame, text=f"Ошибка загрузки\n{frame_name}",
                                            font=("Arial", 18), text_color="red")
                 error_label.place(relx=0.5, rely=0.5, anchor="center")
+            return
+        if FRAME_CACHE_SIZE > 0:
+            self._frame_cache[cache_key] = self.current_frame
+            self._evict_frames()
+
+    def _hide_frame(self, frame: ctk.CTkFrame):
+        """
+        Скрывает вкладку; вкладка не из кэша уничтожается.
+
+        Args:
+            frame (ctk.CTkFrame): Отображаемая вкладка.
+        """
+        if not frame.winfo_exists():
+            return
+        if not any(cached is frame for cached in self._frame_cache.values()):
+            frame.destroy()
+            return
+        frame.pack_forget()
+        on_hide = getattr(frame, "on_hide", None)
+        if on_hide is not None:
+            on_hide()
+
+    def _evict_frames(self):
+        """Уничтожает давно не открывавшиеся вкладки сверх `FRAME_CACHE_SIZE`."""
+        while len(self._frame_cache) > FRAME_CACHE_SIZE:
+            cache_key, frame = self._frame_cache.popitem(last=False)
+            if frame is self.current_frame:
+                # Отображаемая вкладка не вытесняется
+                self._frame_cache[cache_key] = frame
+                continue
+            log.debug(f"Вкладка {cache_key[0].__name__} удалена из кэша.")
+            if frame.winfo_exists():
+                frame.destroy()
+
+    def poll_changes(self):
+        """
+        Периодически читает журнал изменений БД.
+
+        Свои изменения рассылаются сразу после commit; проверка нужна, чтобы
+        вкладки и кэши узнавали об изменениях из других процессов.
+        """
+        if not self.winfo_exists():
+            return
+        self.db.changes.poll()
+        self.after(CHANGE_POLL_INTERVAL_MS, self.poll_changes)
 
     # --- Метод закрытия окна ---
 
@@ -662,6 +736,9 @@ class MainWindow(ctk.CTkFrame):
             # Опционально: можно подождать немного, чтобы поток успел завершиться
             # if self.rgb_thread and self.rgb_thread.is_alive():
             #     time.sleep(0.1)
+            # Останавливаем фоновую загрузку и ждем выполняющиеся запросы:
+            # их соединения закрывает db.close()
+            shutdown_executor(wait=True)
             # Закрываем соединение с БД, если оно открыто
             if self.db:
                 self.db.close()
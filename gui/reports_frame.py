@@ -19,6 +19,7 @@ import codecs
 
 from db.employee_event_repository import EmployeeEventRepository
 from db.absence_repository import AbsenceRepository
+from db.date_codes import day_to_date
 # !!! Импорт нового виджета !!!
 from .widgets.date_picker import DatePickerWidget
 
@@ -43,8 +44,8 @@ class ReportsFrame(ctk.CTkFrame):
     def __init__(self, master, db):
         super().__init__(master, fg_color=MAIN_BG_COLOR)
         self.db = db
-        self.event_repo = EmployeeEventRepository(self.db)
-        self.absence_repo = AbsenceRepository(self.db)
+        self.event_repo = EmployeeEventRepository(self.db, self.db.read_only())
+        self.absence_repo = AbsenceRepository(self.db, self.db.read_only())
         self.report_data_cache = {}
         self.create_widgets()
 
@@ -230,63 +231,6 @@ class ReportsFrame(ctk.CTkFrame):
             self._show_error_in_widget(graph_cont)
             self._show_error_in_widget(table_cont)
 
-    def _calculate_total_absence_time(self, raw_data):
-        """ Рассчитывает суммарное время отсутствия в часах. """
-        # ... (Код расчета БЕЗ ИЗМЕНЕНИЙ) ...
-        log.debug(f"Расчет сумм времени для {len(raw_data)} записей.")
-        employee_totals = {}
-        schedule_cache = {}
-        DEFAULT_WORKDAY_MINUTES = 8 * 60
-        for row in raw_data:
-            try:
-                pn, name, pos_id, date_str, full_day, start_t, end_t, _ = row
-                absence_date = datetime.datetime.strptime(
-                    date_str, '%Y-%m-%d').date()
-                duration_minutes = 0
-                if full_day == 1:
-                    day_id = absence_date.isoweekday()
-                    key = (pos_id, day_id)
-                    wk_m = schedule_cache.get(key, Ellipsis)
-                    if wk_m is Ellipsis:
-                        info = self.absence_repo.get_working_hours(
-                            pos_id, day_id)
-                        wk_m = None
-                        if info:
-                            _, w_s, w_e = info
-                            if w_s != "00:00" or w_e != "00:00":
-                                try:
-                                    t_s = datetime.datetime.strptime(
-                                        w_s, '%H:%M')
-                                    t_e = datetime.datetime.strptime(
-                                        w_e, '%H:%M')
-                                    delta = (t_e-t_s).total_seconds()/60
-                                    wk_m = delta if delta > 0 else None
-                                except ValueError:
-                                    pass
-                            else:
-                                wk_m = 0  # Выходной
-                        schedule_cache[key] = wk_m
-                    duration_minutes = wk_m if wk_m is not None else DEFAULT_WORKDAY_MINUTES
-                elif start_t and end_t:
-                    try:
-                        t_s = datetime.datetime.strptime(start_t, '%H:%M')
-                        t_e = datetime.datetime.strptime(end_t, '%H:%M')
-                        duration_minutes = max(0, (t_e-t_s).total_seconds()/60)
-                    except ValueError:
-                        duration_minutes = 0
-                if duration_minutes > 0:
-                    if pn not in employee_totals:
-                        employee_totals[pn] = {
-                            "name": name, "total_minutes": 0}
-                    employee_totals[pn]["total_minutes"] += duration_minutes
-            except Exception as e:
-                log.exception(f"Ошибка строки {row}: {e}")
-        result = [(pn, data["name"], round(data["total_minutes"]/60, 2))
-                  for pn, data in employee_totals.items()]
-        result.sort(key=lambda i: i[2], reverse=True)
-        log.info(f"Расчет сумм ОК: {len(result)}")
-        return result
-
     def _generate_dismissal_widgets(self, start_date, end_date, grouping_type, graph_cont, table_cont):
         """ Генерирует ЛИНЕЙНЫЙ график и таблицу увольнений. """
         log.debug(
@@ -296,16 +240,16 @@ class ReportsFrame(ctk.CTkFrame):
         has_data = False
         start_str = start_date.strftime('%Y-%m-%d')
         end_str = end_date.strftime('%Y-%m-%d')
-        try:  # Получаем данные графика
+        try:  # Получаем данные графика (ключи периодов - целые числа)
             if grouping_type == "По дням":
                 graph_data = self.event_repo.get_dismissal_counts_by_day(
-                    start_str, end_str)
+                    start_date, end_date)
             elif grouping_type == "По годам":
                 graph_data = self.event_repo.get_dismissal_counts_by_year(
-                    start_str, end_str)
+                    start_date, end_date)
             else:
                 graph_data = self.event_repo.get_dismissal_counts_by_month(
-                    start_str, end_str)
+                    start_date, end_date)
         except Exception as e:
             log.exception(...)
             self._show_error_in_widget(graph_cont)
@@ -316,7 +260,8 @@ class ReportsFrame(ctk.CTkFrame):
             log.exception(...)
             self._show_error_in_widget(table_cont)
 
-        self.report_data_cache["dismissal_graph"] = graph_data
+        self.report_data_cache["dismissal_graph"] = self._format_period_keys(
+            graph_data, grouping_type)
         self.report_data_cache["dismissal_table"] = table_data
         for w in graph_cont.winfo_children():
             w.destroy()
@@ -333,19 +278,19 @@ class ReportsFrame(ctk.CTkFrame):
                 fs = 8
                 title_lbl = grouping_type
                 if grouping_type == "По дням":
-                    x_labels = [datetime.datetime.strptime(
-                        i[0], '%Y-%m-%d').strftime('%d.%m.%y') for i in graph_data]
+                    x_labels = [day_to_date(i[0]).strftime('%d.%m.%y')
+                                for i in graph_data]
                     rot = 45
                     fs = 7
                     title_lbl = "по Дням"
                 elif grouping_type == "По годам":
-                    x_labels = [i[0] for i in graph_data]
+                    x_labels = [str(i[0]) for i in graph_data]
                     rot = 0
                     fs = 9
                     title_lbl = "по Годам"
                 else:
-                    x_labels = [datetime.datetime.strptime(
-                        i[0]+'-01', '%Y-%m-%d').strftime('%b %y') for i in graph_data]
+                    x_labels = [datetime.date(i[0] // 100, i[0] % 100, 1).strftime('%b %y')
+                                for i in graph_data]
                     title_lbl = "по Месяцам"
 
                 fig = Figure(figsize=(7.5, 4.8), dpi=95)
@@ -404,16 +349,34 @@ class ReportsFrame(ctk.CTkFrame):
                 self._show_no_data_in_widget(table_cont)
         return has_data
 
+    def _format_period_keys(self, graph_data, grouping_type):
+        """
+        Переводит целочисленные ключи периодов в строки для экспорта.
+
+        Args:
+            graph_data (list[tuple[int, int]] | None): (ключ периода, количество).
+            grouping_type (str): Группировка ("По дням", "По месяцам", "По годам").
+
+        Returns:
+            list[tuple[str, int]] | None: Периоды ГГГГ-ММ-ДД, ГГГГ-ММ или ГГГГ.
+        """
+        if not graph_data:
+            return graph_data
+        if grouping_type == "По дням":
+            return [(day_to_date(key).isoformat(), count) for key, count in graph_data]
+        if grouping_type == "По годам":
+            return [(str(key), count) for key, count in graph_data]
+        return [(f"{key // 100:04d}-{key % 100:02d}", count) for key, count in graph_data]
+
     def _generate_absence_widgets(self, start_date, end_date, graph_cont, table_cont):
         """ Генерирует столбчатый график и таблицу сумм отсутствий. """
         log.debug(f"Генерация отсутствий: {start_date} - {end_date}")
         calculated_data = []
         has_data = False
         try:
-            raw_data = self.absence_repo.get_raw_absence_data(
+            # Суммы уже посчитаны в AbsenceDailyMinutes - один запрос за период
+            calculated_data = self.absence_repo.get_absence_hours_by_employee(
                 str(start_date), str(end_date))  # Передаем строки
-            if raw_data:
-                calculated_data = self._calculate_total_absence_time(raw_data)
         except Exception as e:
             log.exception("Ошибка данных/расчета")
             self._show_error_in_widget(graph_cont)
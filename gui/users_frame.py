@@ -30,6 +30,8 @@ class UsersFrame(BaseTableFrame):
     # ID_COLUMN_INDEX больше не нужен для скрытия, но оставляем для информации
     ID_COLUMN_INDEX = 0
 
+    change_entities = ("Users", "Roles", "Employees")
+
     def __init__(self, master, db, current_user_id):
         """
         Инициализатор фрейма управления пользователями.
@@ -58,9 +60,8 @@ class UsersFrame(BaseTableFrame):
         # Создаем все виджеты интерфейса
         self.create_widgets()
         # Загружаем данные из репозитория
-        self.load_data()
-        # Отображаем первую страницу данных
-        self.display_data()
+        # Загружаем и отображаем первую страницу (в фоне)
+        self.reload()
 
         # Скрытие колонки ID теперь не выполняется
 
@@ -135,7 +136,7 @@ class UsersFrame(BaseTableFrame):
         )
         self.search_entry.place(x=search_entry_x, y=search_entry_y)
         # Привязываем обработчик поиска к событию отпускания клавиши
-        self.search_entry.bind("<KeyRelease>", self.search)
+        self.bind_search(self.search_entry)  # Поиск после паузы в наборе
 
         # --- Создаем виджеты таблицы и пагинации из базового класса ---
         self.create_table_widgets()
@@ -154,26 +155,18 @@ class UsersFrame(BaseTableFrame):
 
         log.debug("Виджеты UsersFrame созданы")
 
-    def load_data(self, search_term=None):
+    def count_rows(self, search_term):
         """
-        Загружает данные пользователей из репозитория с учетом поиска.
-        Обновляет self.all_data и self.total_rows.
+        Возвращает количество пользователей с учетом поиска.
         """
-        log.debug(
-            f"Загрузка данных пользователей (search_term: {search_term})")
-        if search_term is None:
-            search_term = self.search_entry.get().strip()
-        # Запрос к репозиторию возвращает данные включая ID первым столбцом
-        self.all_data, self.total_rows = self.repository.get_users(
-            search_term=search_term)
-        # Обработка случая, если репозиторий вернул None
-        if self.all_data is None:
-            log.warning(
-                "UsersFrame.load_data: Репозиторий вернул None, устанавливаем пустой список.")
-            self.all_data = []
-            self.total_rows = 0
-        log.debug(
-            f"UsersFrame.load_data: Загружено {self.total_rows} строк пользователей.")
+        return self.repository.count_users(search_term=search_term)
+
+    def fetch_page(self, search_term, after, page_size, offset=0):
+        """
+        Загружает одну страницу пользователей (ID первым столбцом).
+        """
+        return self.repository.get_users_page(
+            search_term=search_term, after=after, page_size=page_size, offset=offset)
 
     def display_data(self):
         """
@@ -182,11 +175,8 @@ class UsersFrame(BaseTableFrame):
         log.debug(
             f"Отображение данных пользователей (Страница: {self.current_page})")
 
-        # 1. Вычисляем индексы строк для текущей страницы
-        start_index = (self.current_page - 1) * self.rows_per_page
-        end_index = start_index + self.rows_per_page
-        # 2. Получаем срез данных для текущей страницы (включая ID)
-        current_page_display_data = self.all_data[start_index:end_index]
+        # 1-2. Строки текущей страницы (включая ID) уже загружены (load_data/reload)
+        current_page_display_data = self.page_data
         num_display_rows = len(current_page_display_data)
         # 3. Определяем количество колонок по заголовкам
         num_display_cols = len(self.visible_table_headers)
@@ -243,12 +233,9 @@ class UsersFrame(BaseTableFrame):
         """
         search_query = self.search_entry.get().strip()
         log.debug(f"Событие поиска пользователей: '{search_query}'")
-        # Сбрасываем на первую страницу при новом поиске
-        self.current_page = 1
-        # Загружаем данные, отфильтрованные на уровне SQL
-        self.load_data(search_term=search_query)
-        # Отображаем результат
-        self.display_data()
+        # Загружаем и отображаем данные, отфильтрованные на уровне SQL
+        # (при новом поиске открывается первая страница)
+        self.reload(search_term=search_query)
 
     def get_selected_user_id(self):
         """
@@ -264,21 +251,18 @@ class UsersFrame(BaseTableFrame):
         # Берем индекс первой (и единственной, т.к. single_select) строки
         selected_row_index_in_view = list(selected_rows_indices)[0]
 
-        # Рассчитываем реальный индекс в полном списке данных self.all_data
-        actual_data_index = (self.current_page - 1) * \
-            self.rows_per_page + selected_row_index_in_view
-
-        # Проверяем валидность рассчитанного индекса
-        if 0 <= actual_data_index < len(self.all_data):
-            # ID пользователя находится в первом столбце (индекс 0) списка self.all_data
-            user_id = self.all_data[actual_data_index][self.ID_COLUMN_INDEX]
+        # Строка данных текущей страницы (или загруженного окна в виртуальном режиме)
+        row = self.get_row(selected_row_index_in_view)
+        if row is not None:
+            # ID пользователя находится в первом столбце (индекс 0) строки
+            user_id = row[self.ID_COLUMN_INDEX]
             log.debug(
-                f"Выбрана строка в таблице: {selected_row_index_in_view}, Индекс в данных: {actual_data_index}, User ID={user_id}")
+                f"Выбрана строка в таблице: {selected_row_index_in_view}, User ID={user_id}")
             return user_id
         else:
             # Логируем ошибку, если индекс оказался некорректным
             log.error(
-                f"Ошибка: Неверный индекс данных ({actual_data_index}) для выбранной строки ({selected_row_index_in_view})")
+                f"Ошибка: Неверный индекс выбранной строки ({selected_row_index_in_view})")
             return None
 
     def add_user(self):
@@ -288,8 +272,7 @@ class UsersFrame(BaseTableFrame):
         dialog = AddUserDialog(self, self.repository)
         dialog.wait_window()  # Ждем закрытия диалога
         # Перезагружаем и отображаем данные после возможного добавления
-        self.load_data()
-        self.display_data()
+        self.reload()
 
     def edit_user(self):
         """Открывает диалог редактирования для выбранного пользователя."""
@@ -308,8 +291,7 @@ class UsersFrame(BaseTableFrame):
                                 user_id, self.current_user_id)
         dialog.wait_window()  # Ждем закрытия диалога
         # Перезагружаем и отображаем данные после возможного редактирования
-        self.load_data()
-        self.display_data()
+        self.reload()
 
     def delete_user(self):
         """Удаляет выбранного пользователя с проверками безопасности."""
@@ -365,21 +347,10 @@ class UsersFrame(BaseTableFrame):
             if self.repository.delete_user(user_id):
                 messagebox.showinfo("Успех", "Пользователь удален.")
                 log.info(f"User ID={user_id} удален.")
-                # --- Корректировка пагинации и обновление таблицы ---
-                current_total = self.total_rows  # Запоминаем старое общее количество
+                # --- Обновление таблицы ---
                 # Перезагружаем данные с учетом текущего фильтра поиска
-                self.load_data(search_term=self.search_entry.get().strip())
-                new_total_pages = self.get_total_pages()  # Вычисляем новое кол-во страниц
-                # Корректируем номер текущей страницы, если она стала недействительной
-                if self.current_page > new_total_pages > 0:
-                    self.current_page = new_total_pages
-                elif current_total > 0 and self.total_rows == 0:  # Если удалили последнего
-                    self.current_page = 1
-                # Если удалили последнюю запись на странице (и это не первая страница)
-                elif self.current_page > 1 and (current_total - 1) % self.rows_per_page == 0 and self.total_rows < current_total:
-                    self.current_page -= 1
-                # Отображаем данные на скорректированной странице
-                self.display_data()
+                # (номер страницы скорректируется, если она исчезла)
+                self.reload(search_term=self.search_entry.get().strip())
                 # -------------------------------------------------
             else:
                 # Если репозиторий вернул ошибку
@@ -397,8 +368,7 @@ class UsersFrame(BaseTableFrame):
         dialog = ImportUsersDialog(self, self.repository)
         dialog.wait_window()  # Ждем закрытия диалога
         # Перезагружаем и отображаем данные после возможного импорта
-        self.load_data()
-        self.display_data()
+        self.reload()
 
     def export_users(self):
         """Экспортирует данные пользователей (БЕЗ ПАРОЛЕЙ) в CSV и XML."""
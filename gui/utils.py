@@ -3,8 +3,25 @@ from pathlib import Path
 from PIL import Image
 import customtkinter as ctk
 from config import ASSETS_PATH  # !!!
+import atexit
 import logging
 import logging.handlers
+import queue
+import threading
+import xml.etree.ElementTree as ET
+
+log = logging.getLogger(__name__)
+
+# Фоновые потоки записи логов (QueueListener), запущенные configure_logging
+_log_listeners: list[logging.handlers.QueueListener] = []
+
+# Кэш изображений из assets: декодированные PIL-изображения по имени файла
+# и готовые CTkImage по (имя, размер). Изображения из кэша не изменяются.
+# CTkImage хранит PhotoImage, созданные в текущем корневом окне, поэтому кэш
+# CTkImage сбрасывается при уничтожении корня (clear_icon_cache), а PIL-кэш - нет.
+_images: dict[str, Image.Image] = {}
+_icons: dict[tuple[str, tuple[int, int]], ctk.CTkImage] = {}
+_images_lock = threading.Lock()
 
 
 def relative_to_assets(path: str) -> Path:
@@ -20,10 +37,36 @@ def relative_to_assets(path: str) -> Path:
     return ASSETS_PATH / Path(path)
 
 
+def load_image(name: str) -> Image.Image:
+    """
+    Возвращает декодированное изображение из папки assets (с кэшированием).
+
+    Файл читается и декодируется один раз; повторные вызовы возвращают
+    тот же объект, поэтому изменять его нельзя.
+
+    Args:
+        name (str): Имя файла изображения (например, "image.png").
+
+    Returns:
+        Image.Image: Загруженное изображение.
+    """
+    with _images_lock:
+        img = _images.get(name)
+    if img is not None:
+        return img
+    img = Image.open(relative_to_assets(name))
+    img.load()  # Декодирует данные и закрывает файл
+    with _images_lock:
+        return _images.setdefault(name, img)
+
+
 def load_icon(name: str, size=(24, 24)):
     """
     Загружает иконку из папки assets и возвращает объект CTkImage.
 
+    Объект кэшируется по (имени, размеру) и используется всеми виджетами
+    с той же иконкой в текущем корневом окне (см. `clear_icon_cache`).
+
     Args:
         name (str): Имя файла иконки (например, "icon.png").
         size (tuple): Размер иконки (ширина, высота).
@@ -31,13 +74,106 @@ def load_icon(name: str, size=(24, 24)):
     Returns:
         CTkImage: Объект CTkImage для использования в customtkinter.
     """
-    img = Image.open(relative_to_assets(name))
-    return ctk.CTkImage(img, size=size)
+    key = (name, tuple(size))
+    icon = _icons.get(key)
+    if icon is None:
+        icon = _icons[key] = ctk.CTkImage(load_image(name), size=key[1])
+    return icon
 
 
-def configure_logging(log_level, log_format, log_file, max_log_size, backup_count, logger_name=None,):
+def clear_icon_cache() -> None:
+    """
+    Сбрасывает кэш CTkImage (вызывается при уничтожении корневого окна).
+
+    PhotoImage, созданные CTkImage, принадлежат интерпретатору Tcl корня
+    и исчезают вместе с ним; следующее окно создает иконки заново
+    из кэша декодированных изображений.
+    """
+    _icons.clear()
+
+
+def prewarm_images() -> threading.Thread:
+    """
+    Загружает все изображения из папки assets в кэш в фоновом потоке.
+
+    В потоке только читаются и декодируются файлы; CTkImage создаются
+    при первом обращении в потоке интерфейса.
+
+    Returns:
+        threading.Thread: Запущенный поток загрузки.
+    """
+    def worker():
+        for path in sorted(ASSETS_PATH.glob("*.png")):
+            try:
+                load_image(path.name)
+            except OSError as e:
+                log.warning(
+                    "Не удалось загрузить изображение %s: %s", path.name, e)
+        log.debug("Изображения assets загружены в кэш")
+
+    thread = threading.Thread(target=worker, name="prewarm-images", daemon=True)
+    thread.start()
+    return thread
+
+
+def write_xml_stream(file_path, root_tag: str, elements, space: str = "  ") -> int:
+    """
+    Записывает XML-файл поэлементно, не строя дерево целиком в памяти.
+
+    Формат совпадает с `ET.ElementTree(root)` + `ET.indent(tree, space)` +
+    `tree.write(..., encoding="utf-8", xml_declaration=True)`.
+
+    Args:
+        file_path: Путь к создаваемому файлу.
+        root_tag (str): Имя корневого тега.
+        elements (Iterable[ET.Element]): Дочерние элементы корня.
+        space (str): Строка отступа одного уровня.
+
+    Returns:
+        int: Количество записанных элементов.
+    """
+    count = 0
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(f"<?xml version='1.0' encoding='utf-8'?>\n<{root_tag}>")
+        for element in elements:
+            ET.indent(element, space=space, level=1)
+            f.write(f"\n{space}")
+            f.write(ET.tostring(element, encoding="unicode"))
+            count += 1
+        f.write(f"\n</{root_tag}>")
+    return count
+
+
+def _attach_queue_listener(logger: logging.Logger, handlers) -> None:
+    """
+    Подключает к логгеру QueueHandler, а реальные обработчики (файл, консоль)
+    переносит в фоновый поток QueueListener, чтобы запись не блокировала UI.
+    """
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    if not _log_listeners:
+        atexit.register(stop_logging)
+    _log_listeners.append(listener)
+
+
+def stop_logging():
+    """
+    Останавливает фоновые потоки логирования, дописывая оставшиеся в очереди записи.
+    Повторный вызов безопасен.
+    """
+    while _log_listeners:
+        _log_listeners.pop().stop()
+
+
+def configure_logging(log_level, log_format, log_file, max_log_size, backup_count, logger_name=None,
+                      module_levels=None):
     """
      Настраивает логгер.
+     Записи попадают в очередь (QueueHandler), а в файл и консоль их пишет
+     фоновый поток (QueueListener).
      Args:
          logger_name (str, optional):  Имя логгера.  Если None, настраивается корневой логгер.
          log_level: Уровень логирования
@@ -45,6 +181,7 @@ def configure_logging(log_level, log_format, log_file, max_log_size, backup_coun
          log_file: Куда сохранять
          max_log_size: Макс размер
          backup_count: Сколько хранить старых логов
+         module_levels (dict, optional): Уровни отдельных модулей {имя логгера: уровень}
 
      Returns:
          logging.Logger: Настроенный объект логгера.
@@ -53,6 +190,12 @@ def configure_logging(log_level, log_format, log_file, max_log_size, backup_coun
     logger = logging.getLogger(logger_name)
     logger.setLevel(log_level)
 
+    for name, level in (module_levels or {}).items():
+        try:
+            logging.getLogger(name).setLevel(level)
+        except (ValueError, TypeError):
+            logger.warning("Некорректный уровень логирования %r для %s", level, name)
+
     # Если уже есть хэндлеры, то выходим, не добавляя новые,
     # нужно для случая, когда мы вызываем, configure_logging несколько раз из разных мест.
     if logger.hasHandlers():
@@ -65,11 +208,37 @@ def configure_logging(log_level, log_format, log_file, max_log_size, backup_coun
         encoding='utf-8'  # !!! encoding
     )
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
 
     #  Обработчик для консоли
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
 
+    _attach_queue_listener(logger, (file_handler, console_handler))
+
+    return logger
+
+
+def configure_slow_query_log(log_file, log_format, max_log_size, backup_count):
+    """
+     Подключает отдельный файл для журнала медленных SQL-запросов.
+     Записи логгера `db.slow_queries` продолжают попадать и в основной лог.
+     Args:
+         log_file: Куда сохранять
+         log_format: Формат
+         max_log_size: Макс размер
+         backup_count: Сколько хранить старых логов
+
+     Returns:
+         logging.Logger: Логгер медленных запросов.
+     """
+    logger = logging.getLogger("db.slow_queries")
+    # Повторный вызов не должен дублировать файловый обработчик
+    if logger.handlers:
+        return logger
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_log_size, backupCount=backup_count,
+        encoding='utf-8'
+    )
+    file_handler.setFormatter(logging.Formatter(log_format))
+    _attach_queue_listener(logger, (file_handler,))
     return logger
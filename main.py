@@ -9,9 +9,11 @@ import customtkinter as ctk
 from gui.main_window import MainWindow
 from gui.login_window import LoginWindow
 from db.database import Database
-from config import DATABASE_PATH, LOG_LEVEL, LOG_FORMAT, LOG_FILE, MAX_LOG_SIZE, BACKUP_COUNT
+from db.migrator import apply_migrations
+from config import (DATABASE_PATH, LOG_LEVEL, LOG_LEVELS, LOG_FORMAT, LOG_FILE, MAX_LOG_SIZE,
+                    BACKUP_COUNT, SLOW_QUERY_LOG_FILE, QUERY_STATS_FILE, PREWARM_IMAGES)
 import logging
-from gui.utils import configure_logging
+from gui.utils import configure_logging, configure_slow_query_log, prewarm_images, stop_logging
 import tkinter as tk
 from tkinter import messagebox
 
@@ -22,8 +24,13 @@ def main():
     """Основная функция запуска приложения."""
     # --- Настройка логирования ---
     configure_logging(LOG_LEVEL, LOG_FORMAT, LOG_FILE,
-                      MAX_LOG_SIZE, BACKUP_COUNT)
+                      MAX_LOG_SIZE, BACKUP_COUNT, module_levels=LOG_LEVELS)
+    configure_slow_query_log(SLOW_QUERY_LOG_FILE, LOG_FORMAT,
+                             MAX_LOG_SIZE, BACKUP_COUNT)
     log.info("Запуск приложения")
+    # Иконки декодируются в фоне, пока подключается БД и открывается окно входа
+    if PREWARM_IMAGES:
+        prewarm_images()
 
     # --- Инициализация базы данных ---
     db = Database()
@@ -41,6 +48,20 @@ def main():
             print(f"Не удалось показать сообщение об ошибке БД: {e}")
         return
 
+    # --- Обновление схемы БД (миграции) ---
+    if not apply_migrations(db):
+        log.critical("Не удалось обновить схему базы данных. Завершение работы.")
+        try:
+            root = tk.Tk()
+            root.withdraw()
+            messagebox.showerror("Критическая ошибка",
+                                 "Не удалось обновить схему базы данных!")
+            root.destroy()
+        except Exception as e:
+            print(f"Не удалось показать сообщение об ошибке БД: {e}")
+        db.close()
+        return
+
     # --- Запуск окна входа ---
     login_root = LoginWindow(db)
     login_root.mainloop()
@@ -59,8 +80,11 @@ def main():
         log.info("Вход не выполнен или окно входа закрыто. Завершение работы.")
 
     # --- Завершение работы ---
+    if QUERY_STATS_FILE:
+        db.dump_stats(QUERY_STATS_FILE)
     db.close()
     log.info("Приложение завершило работу.")
+    stop_logging()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,31 @@
+# tests/conftest.py
+"""
+Общие фикстуры тестов: временная база со схемой, начальными данными и миграциями.
+"""
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from db.database import Database  # noqa: E402
+from db.migrator import apply_migrations  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    """База во временном каталоге: create_tables.sql, insert_data.sql и все миграции."""
+    path = tmp_path / "personnel.db"
+    conn = sqlite3.connect(path)
+    for script in ("create_tables.sql", "insert_data.sql"):
+        conn.executescript((ROOT / "db" / script).read_text(encoding="utf-8"))
+    conn.close()
+
+    database = Database(str(path), pooled=False)
+    assert apply_migrations(database)
+    database.changes.poll()
+    yield database
+    database.close()
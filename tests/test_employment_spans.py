@@ -0,0 +1,35 @@
+# tests/test_employment_spans.py
+"""
+Периоды работы (EmploymentSpans): добавление событий задним числом и полный пересчет.
+"""
+import db.queries as q
+from db.employee_event_repository import EmployeeEventRepository
+
+SPANS = """
+    SELECT EmployeePersonnelNumber, HireDate, DismissalDate, DismissalReason, PositionID, DepartmentID
+    FROM EmploymentSpans ORDER BY EmployeePersonnelNumber, HireDate, DismissalDate
+"""
+
+
+def test_backdated_events_match_rebuild(db):
+    repository = EmployeeEventRepository(db)
+    hire = db.references.get_id("Events", q.EVENT_HIRE)
+    dismissal = db.references.get_id("Events", q.EVENT_DISMISSAL)
+
+    # Повторный прием без увольнения, затем увольнение между приемами задним числом
+    assert repository.insert_event("12345", hire, "2020-01-01", 3, 5)
+    assert repository.insert_event("12345", hire, "2022-01-01", 3, 5)
+    assert repository.insert_event("12345", dismissal, "2021-06-30", 3, 5, "по соглашению")
+    # Увольнение добавлено раньше приема, к которому относится
+    assert repository.insert_event("54321", dismissal, "2023-05-31", 4, 7, "собственное желание")
+    assert repository.insert_event("54321", hire, "2023-01-01", 4, 7)
+
+    incremental = db.fetch_all(SPANS)
+    assert incremental == [
+        ("12345", "2020-01-01", "2021-06-30", "по соглашению", 5, 3),
+        ("12345", "2022-01-01", None, None, 5, 3),
+        ("54321", "2023-01-01", "2023-05-31", "собственное желание", 7, 4),
+    ]
+
+    assert repository.rebuild_employment_spans()
+    assert db.fetch_all(SPANS) == incremental
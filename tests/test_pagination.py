@@ -0,0 +1,49 @@
+# tests/test_pagination.py
+"""
+Постраничная навигация по курсору для событий и отсутствий с пустыми датами.
+"""
+import pytest
+
+from db.absence_repository import AbsenceRepository
+from db.employee_event_repository import EmployeeEventRepository
+
+PN = "12345"
+
+
+@pytest.fixture
+def undated_db(db):
+    """База с датированными и недатированными событиями и отсутствиями."""
+    for date in ("2024-01-10", "2024-02-10", None, "2024-03-10", None, None):
+        assert db.execute_query(
+            "INSERT INTO EmployeeEvents (EmployeePersonnelNumber, EventID, EventDate, Reason) "
+            "VALUES (?, 3, ?, 'перевод')", (PN, date))
+        assert db.execute_query(
+            "INSERT INTO Absences (EmployeePersonnelNumber, AbsenceDate, FullDay, Reason) "
+            "VALUES (?, ?, 1, 'болезнь')", (PN, date))
+    return db
+
+
+def walk(fetch_page, page_size):
+    """Читает все страницы по курсору и возвращает строки."""
+    rows, after = fetch_page(page_size=page_size)
+    while after is not None:
+        page, after = fetch_page(after=after, page_size=page_size)
+        rows += page
+    return rows
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 4])
+def test_events_pages_include_undated_rows(undated_db, page_size):
+    repository = EmployeeEventRepository(undated_db)
+    rows = walk(repository.get_events_page, page_size)
+    assert len(rows) == repository.count_events() == 6
+    assert [row[0] for row in rows][-3:] == [None, None, None]
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 4])
+def test_absences_pages_include_undated_rows(undated_db, page_size):
+    repository = AbsenceRepository(undated_db)
+    rows = walk(repository.get_absences_page, page_size)
+    assert len(rows) == repository.count_absences() == 6
+    assert len({row[0] for row in rows}) == 6  # ID не повторяются
+    assert [row[3] for row in rows][-3:] == ["", "", ""]